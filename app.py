@@ -2,23 +2,25 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
-from flask import make_response
-import os, hashlib
-from tempfile import TemporaryDirectory
-
-# ==== imports (add extract_linkedin, extract_phone) ====
-from core.extract import extract_text, extract_email, extract_exact_section, extract_linkedin, extract_phone
-from core.preprocess import preprocess_text
-from core.tf_idf import compute_tfidf
-from core.similarity import cosine_similarity
+import hmac
+from flask import make_response, Response
+from werkzeug.http import is_resource_modified
+import os
+
+# ==== imports ====
+from core.resume_detail import detail_cache, text_window
+from core.jobs import enqueue_job, enqueue_batch_job, get_job, start_workers
+from core import metrics
 from database.db_connect import (
-    get_connection,
-    insert_document,
-    get_document_by_filename,   # NEW
+    db_connection,
+    get_run_results,
+    RUN_RESULT_SORTS,
 )
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-change-me")
+# Largest request body accepted (413 past it); asgi.py enforces it while receiving
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
 
 # ---------------- Utilities ----------------
 def is_pdf_upload(file_storage) -> bool:
@@ -42,20 +44,16 @@ def login_required(view):
     return wrapper
 
 def find_user_by_email(email: str):
-    conn = get_connection()
-    try:
+    with db_connection() as conn:
         cur = conn.cursor(dictionary=True)
         cur.execute(
             "SELECT id, company_name, email, password_hash FROM users WHERE email=%s",
             (email,)
         )
         return cur.fetchone()
-    finally:
-        conn.close()
 
 def create_user(company_name: str, email: str, password: str):
-    conn = get_connection()
-    try:
+    with db_connection() as conn:
         cur = conn.cursor()
         cur.execute(
             "INSERT INTO users (company_name, email, password_hash) VALUES (%s, %s, %s)",
@@ -63,13 +61,12 @@ def create_user(company_name: str, email: str, password: str):
         )
         conn.commit()
         return cur.lastrowid
-    finally:
-        conn.close()
 
 # ---------------- Routes ----------------
 @app.route("/")
 def home():
-    last_results = session.get("last_results", [])
+    job = current_job() if session.get("user_id") else None
+    last_results = page_results(job, 5)[0] if job else []
     is_logged_in = bool(session.get("user_id"))
     return render_template("home.html", is_logged_in=is_logged_in, last_results=last_results)
 
@@ -146,206 +143,252 @@ def logout():
 def actual_calculation():
     return render_template("actual_calculation.html")
 
-# ===== JD headings to boost at 1.5× =====
-JD_HEADINGS_FOR_BOOST = [
-    "Responsibilities", "Duties", "Role Overview",
-    "Requirements", "Must-Have Skills", "Qualifications",
-    "Preferred Skills", "Good to Have", "Bonus Points For",
-    "Who You Are", "Ideal Candidate",
-    "What We Offer", "Benefits", "Perks",
-]
-
-def collect_jd_priority_terms(jd_raw_text: str):
-    """Grab content under the specified JD headings and return preprocessed tokens."""
-    picked_sections = []
-    for h in JD_HEADINGS_FOR_BOOST:
-        sec = extract_exact_section(jd_raw_text, h)
-        if sec:
-            picked_sections.append(sec)
-    if not picked_sections:
-        return set()
-    priority_clean = preprocess_text("\n".join(picked_sections))
-    return set(priority_clean.split())
-
 @app.route("/process", methods=["POST"])
 @login_required
 def process():
     """
-    Per-run policy:
-      - Detect duplicates only within THIS run.
-      - Do not compute similarity for duplicates (display '—').
-      - Block if the same PDF is uploaded as both JD and Resume.
-      - Similarity is 0..1 (rounded to 2 decimals).
+    Validate the uploads and enqueue a screening job (see core.jobs / core.screening
+    for the per-run policy). Browsers are redirected to /results, which polls the
+    job; API clients asking for JSON get the job id back immediately.
     """
-    results, errors = [], []
+    with metrics.trace("process_request", user_id=session.get("user_id")):
+        return _process()
 
-    with TemporaryDirectory() as _:
-        # --- JD: presence + signature check ---
+def _process():
+    # --- JD: presence + signature check ---
+    with metrics.timed("upload_parse"):   # first access parses the multipart body
         jd_file = request.files.get("jd_file")
-        if not jd_file:
-            flash("Job description file missing.", "error")
-            return redirect(url_for("actual_calculation"))
-
-        if not is_pdf_upload(jd_file):
-            flash("Uploaded job description is not a valid PDF.", "error")
-            return redirect(url_for("actual_calculation"))
-
-        jd_bytes = jd_file.read()
-        jd_file.stream.seek(0)
-        jd_text = extract_text(jd_bytes)
-        jd_cleaned = preprocess_text(jd_text)
-        insert_document("job_description.pdf", "job", jd_text, jd_cleaned)
-
-        jd_tokens = jd_cleaned.split()
-        jd_priority_terms = collect_jd_priority_terms(jd_text)
-        jd_hash = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
-
-        # --- Resumes (per-run de-dupe) ---
-        resume_files = request.files.getlist("resume_files")
-        if not resume_files:
-            flash("Please upload at least one resume PDF.", "error")
-            return redirect(url_for("actual_calculation"))
-
-        seen_hashes_run = {}   # hash -> first filename
-        uniques = []           # to score once
-
-        for rf in resume_files:
-            filename = (rf.filename or "Unknown").strip()
-
-            if not is_pdf_upload(rf):
-                errors.append(f"'{filename}' is not a valid PDF and was skipped.")
-                continue
-
-            file_bytes = rf.read()
-            rf.stream.seek(0)
-
-            raw_text = extract_text(file_bytes)
-            cleaned_text = preprocess_text(raw_text)
-            raw_hash = hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
-            email = extract_email(raw_text)
-
-            # (2) Block JD==Resume same PDF
-            if raw_hash == jd_hash:
-                errors.append(f"'{filename}' was skipped because it is the SAME PDF as the uploaded JD.")
-                continue
-
-            # In-run duplicate check
-            if raw_hash in seen_hashes_run:
-                # (3) mark duplicate; DO NOT score
-                results.append({
-                    "name": filename,
-                    "email": email,
-                    "duplicate": f"Duplicate of {seen_hashes_run[raw_hash]}",
-                    "score": None,         # <- not computed
-                    "raw_hash": raw_hash,
-                })
-                continue
-
-            # First time in this run
-            seen_hashes_run[raw_hash] = filename
-            insert_document(filename, "resume", raw_text, cleaned_text)  # optional persistence
-
-            results.append({
-                "name": filename,
-                "email": email,
-                "duplicate": "—",
-                "score": None,            # filled later
-                "raw_hash": raw_hash,
-            })
-            uniques.append({
-                "filename": filename,
-                "raw_hash": raw_hash,
-                "tokens": cleaned_text.split(),
-            })
-
-                # --- In-memory scoring for THIS RUN ONLY ---
-        if uniques:
-            all_docs = [jd_tokens] + [u["tokens"] for u in uniques]
-            tfidf_vectors, all_terms = compute_tfidf(
-                all_docs,
-                boost_terms=jd_priority_terms,
-                boost_factor=1.5
-            )
-            job_vec = tfidf_vectors[0]
-            resume_vecs = tfidf_vectors[1:]
-
-            hash_to_score = {}
-            for i, u in enumerate(uniques):
-                s = cosine_similarity(job_vec, resume_vecs[i], all_terms)
-                hash_to_score[u["raw_hash"]] = round(float(s), 2)
-
-            # assign scores to non-duplicates
-            for row in results:
-                if row.get("duplicate") == "—":
-                    row["score"] = hash_to_score.get(row["raw_hash"], None)
-
-        # === IMPORTANT: rank by similarity (desc), duplicates last ===
-        def sort_key(r):
-            # scored rows first (flag 0), duplicates (None) later (flag 1)
-            is_dup_flag = 0 if r.get("score") is not None else 1
-            score = r.get("score") if r.get("score") is not None else -1.0
-            return (is_dup_flag, -score)
-
-        results.sort(key=sort_key)
-
-        # S.N reflects ranked order
-        for i, r in enumerate(results, start=1):
-            r["sn"] = i
-            r.pop("raw_hash", None)
-
-        session["last_results"] = results
-        session["last_errors"] = errors
-        return redirect(url_for("results"))
+    if not jd_file:
+        flash("Job description file missing.", "error")
+        return redirect(url_for("actual_calculation"))
+
+    if not is_pdf_upload(jd_file):
+        flash("Uploaded job description is not a valid PDF.", "error")
+        return redirect(url_for("actual_calculation"))
+
+    # --- Resumes ---
+    resume_files = request.files.getlist("resume_files")
+    if not resume_files:
+        flash("Please upload at least one resume PDF.", "error")
+        return redirect(url_for("actual_calculation"))
+
+    with metrics.timed("enqueue"):
+        job_id = enqueue_job(session.get("user_id"), jd_file, resume_files, is_pdf_upload)
+    # Only the run id lives in the (cookie) session; rows are read back per page
+    session.pop("job_id", None)
+    session["run_id"] = job_id
+
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({"ok": True, "job_id": job_id,
+                        "status_url": url_for("api_job_status", job_id=job_id)}), 202
+    return redirect(url_for("results"))
+
+
+def current_job():
+    """The session's latest screening run (job), if it belongs to the logged-in user."""
+    run_id = session.get("run_id")
+    if not run_id:
+        return None
+    job = get_job(run_id)
+    if not job or job["user_id"] != session.get("user_id"):
+        return None
+    return job
+
+
+def page_results(job, limit, sort="rank", after=None):
+    """
+    One page of a run's ranking, keyset-paginated on S.N.
+
+    Finished runs are read from the run store with LIMIT; partial rankings of a
+    running job (or a run that could not be stored) are paged from the job row.
+
+    Args:
+        limit: page size
+        sort: "rank" (S.N order) or "name"
+        after: S.N of the last row on the previous page
+
+    Returns:
+        (rows, next_after): next_after is None on the last page
+    """
+    limit = max(0, limit)
+    if job["run_stored"]:
+        rows = get_run_results(job["id"], limit + 1, sort=sort, after_sn=after)
+    else:
+        rows = job["results"]
+        if sort == "name":
+            rows = sorted(rows, key=lambda r: (r["name"], r["sn"]))
+        if after is not None:
+            pos = next((i for i, r in enumerate(rows) if r["sn"] == after), None)
+            rows = rows[pos + 1:] if pos is not None else []
+        rows = rows[:limit + 1]
+
+    next_after = rows[limit - 1]["sn"] if limit and len(rows) > limit else None
+    return rows[:limit], next_after
+
+
+def _int_arg(name, default=None):
+    try:
+        return int(request.args.get(name, ""))
+    except ValueError:
+        return default
 
 
 @app.route("/results")
 @login_required
 def results():
-    # ?top=10 -> show first N rows by S.N (S.N preserves upload order)
-    try:
-        selected_top = int(request.args.get("top", "10"))
-    except ValueError:
-        selected_top = 10
+    # ?top=N -> page size (a LIMIT); ?after=<S.N> -> next page; ?sort=rank|name
+    selected_top = _int_arg("top", 10)
+    after = _int_arg("after")
+    sort = request.args.get("sort", "rank")
+    if sort not in RUN_RESULT_SORTS:
+        sort = "rank"
 
-    all_rows = session.get("last_results", [])
-    # Already in S.N order (from /process). Just slice:
-    trimmed = all_rows[:max(0, selected_top)]
+    job = current_job()
+    rows, next_after = page_results(job, selected_top, sort, after) if job else ([], None)
 
     return render_template(
         "results.html",
-        results=trimmed,
-        errors=session.get("last_errors", []),
-        selected_top=selected_top
+        results=rows,
+        errors=job["errors"] if job else [],
+        selected_top=selected_top,
+        sort=sort,
+        after=after,
+        next_after=next_after,
+        job=job,
     )
 
 
+# --------- Screening job API (progress polling) ---------
+def _job_for_user(job_id):
+    job = get_job(job_id)
+    if not job or job["user_id"] != session.get("user_id"):
+        return None
+    return job
+
+@app.get("/api/jobs/<job_id>")
+@login_required
+def api_job_status(job_id):
+    job = _job_for_user(job_id)
+    if not job:
+        return jsonify({"ok": False, "error": "Job not found"}), 404
+    return jsonify({
+        "ok": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "files_total": job["files_total"],
+        "files_extracted": job["files_extracted"],
+        "files_scored": job["files_scored"],
+        "error": job["error"],
+    })
+
+@app.get("/api/jobs/<job_id>/results")
+@login_required
+def api_job_results(job_id):
+    job = _job_for_user(job_id)
+    if not job:
+        return jsonify({"ok": False, "error": "Job not found"}), 404
+    if job["kind"] == "batch":
+        # {"jds": [{"name", "ranking"}], "resumes": [...], "errors": [...]} once done
+        return jsonify({"ok": True, "job_id": job["id"], "status": job["status"],
+                        "partial": job["status"] != "done", **(job["results"] or {})})
+    top = _int_arg("top", 0)
+    sort = request.args.get("sort", "rank")
+    if sort not in RUN_RESULT_SORTS:
+        return jsonify({"ok": False, "error": "Unknown sort"}), 400
+    # No ?top -> every row (a run never has more rows than uploaded files)
+    limit = top if top > 0 else job["files_total"]
+    rows, next_after = page_results(job, limit, sort, _int_arg("after"))
+    return jsonify({
+        "ok": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "partial": job["status"] != "done",
+        "results": rows,
+        "next_after": next_after,
+        "errors": job["errors"],
+    })
+
+@app.post("/api/batch_jobs")
+@login_required
+def api_batch_job():
+    """
+    Rank one resume set against several JDs (jd_files + resume_files uploads).
+    Poll /api/jobs/<id>; the results endpoint then returns per-JD rankings and
+    each resume's best-matching JD.
+    """
+    jd_files = [f for f in request.files.getlist("jd_files") if f]
+    resume_files = request.files.getlist("resume_files")
+    if not jd_files:
+        return jsonify({"ok": False, "error": "Upload at least one job description PDF"}), 400
+    if not resume_files:
+        return jsonify({"ok": False, "error": "Upload at least one resume PDF"}), 400
+
+    job_id = enqueue_batch_job(session.get("user_id"), jd_files, resume_files, is_pdf_upload)
+    return jsonify({"ok": True, "job_id": job_id,
+                    "status_url": url_for("api_job_status", job_id=job_id)}), 202
+
+
+# --------- Metrics (Prometheus text format) ---------
+@app.get("/metrics")
+def prometheus_metrics():
+    if not metrics.METRICS_ENABLED:
+        return jsonify({"ok": False, "error": "Metrics are disabled"}), 404
+    # Scrapers send METRICS_TOKEN as a bearer token; without one configured, sign in
+    if metrics.METRICS_TOKEN:
+        sent = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        allowed = hmac.compare_digest(sent.encode(), metrics.METRICS_TOKEN.encode())
+    else:
+        allowed = bool(session.get("user_id"))
+    if not allowed:
+        return Response("Unauthorized\n", status=401, mimetype="text/plain",
+                        headers={"WWW-Authenticate": "Bearer"} if metrics.METRICS_TOKEN else None)
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 # --------- (1) Resume Detail API (for modal) ---------
 @app.get("/api/resume_detail")
 @login_required
 def api_resume_detail():
+    """
+    Contact fields and text of the latest resume stored as ?file=<name>.
+
+    ?offset=<chars>&limit=<chars> return a slice of the text (truncated=true
+    when more follows). Responses carry an ETag and Last-Modified, so repeat
+    opens revalidate with a 304 instead of re-sending the text.
+    """
     filename = (request.args.get("file") or "").strip()
     if not filename:
         return jsonify({"ok": False, "error": "Missing 'file' parameter"}), 400
 
-    doc = get_document_by_filename(filename, "resume")
-    if not doc:
+    detail = detail_cache.get(filename)
+    if not detail:
         return jsonify({"ok": False, "error": "Resume not found"}), 404
 
-    raw_text = doc["raw_text"] or ""
-    info = {
-        "email": extract_email(raw_text) or "",
-        "phone": extract_phone(raw_text) or "",
-        "linkedin": extract_linkedin(raw_text) or "",
-    }
-
-    return jsonify({
-        "ok": True,
-        "filename": filename,
-        "email": info["email"],
-        "phone": info["phone"],
-        "linkedin": info["linkedin"],
-        "text": raw_text
-    })
+    if not is_resource_modified(request.environ, etag=detail["etag"], last_modified=detail["last_modified"]):
+        response = Response(status=304)
+    else:
+        offset = _int_arg("offset", 0)
+        text, truncated = text_window(detail["text"], offset, _int_arg("limit"))
+        response = jsonify({
+            "ok": True,
+            "filename": filename,
+            "email": detail["email"],
+            "phone": detail["phone"],
+            "linkedin": detail["linkedin"],
+            "text": text,
+            "text_length": len(detail["text"]),
+            "offset": max(0, offset),
+            "truncated": truncated,
+        })
+    response.set_etag(detail["etag"])
+    if detail["last_modified"]:
+        response.last_modified = detail["last_modified"]
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 if __name__ == "__main__":
+    # Jobs queued before the server started (or left by a dead worker) run right away;
+    # under the debug reloader only the serving child process runs workers
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_workers()
     app.run(debug=True)
@@ -0,0 +1,189 @@
+# asgi.py
+"""
+ASGI entry point: the Flask app behind an upload-spooling ASGI bridge.
+
+    uvicorn asgi:application --workers 2        (or hypercorn, daphne, ...)
+
+Under a WSGI server a worker is held for the whole request, including the time
+a recruiter's browser takes to send a large multipart upload. Here the request
+body is received on the event loop, which handles any number of slow uploads at
+once, and spooled to disk past ASGI_SPOOL_MEMORY bytes. Only a complete request
+reaches the Flask app, in a thread pool of ASGI_THREADS (default DB_POOL_SIZE,
+so requests never queue for a pooled MySQL connection inside a thread).
+Werkzeug then parses the multipart body from the spool file. A body larger
+than the app's MAX_CONTENT_LENGTH is refused with 413 as soon as its
+Content-Length (or the bytes received so far) exceeds it, before it fills the
+spool.
+
+The blocking work stays off the loop: the upload parse, the mysql.connector
+pool round trips of /results and /api/resume_detail, and saving uploads into the
+job directory all run in those threads. Extraction and scoring never run in a
+request; /process only enqueues a job (core.jobs, whose workers use the
+extraction process pool of core.extract_pool).
+
+Responses are small (HTML pages, JSON) and are buffered whole before sending.
+The job workers (core.jobs) start with the server's lifespan startup event, not
+on import.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app
+from core.jobs import start_workers
+from database.db_connect import DB_POOL_SIZE
+
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", str(DB_POOL_SIZE)))
+# Request bodies larger than this are spooled to a temporary file
+ASGI_SPOOL_MEMORY = int(os.environ.get("ASGI_SPOOL_MEMORY", str(1024 * 1024)))
+ASGI_SPOOL_DIR = os.environ.get("ASGI_SPOOL_DIR") or None
+
+
+class ClientDisconnected(Exception):
+    pass
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class WsgiBridge:
+    """ASGI application running a WSGI app on complete, disk-spooled requests."""
+
+    def __init__(self, wsgi_app, threads=ASGI_THREADS, spool_memory=ASGI_SPOOL_MEMORY, spool_dir=ASGI_SPOOL_DIR,
+                 max_body=None):
+        self.wsgi_app = wsgi_app
+        # Default: the Flask app's MAX_CONTENT_LENGTH (None: unlimited)
+        self.max_body = max_body if max_body is not None else getattr(wsgi_app, "config", {}).get("MAX_CONTENT_LENGTH")
+        self.spool_memory = spool_memory
+        self.spool_dir = spool_dir
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi-wsgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        try:
+            body, size = await self._spool_body(scope, receive)
+        except ClientDisconnected:
+            return
+        except BodyTooLarge:
+            await send({
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"connection", b"close")],
+            })
+            await send({"type": "http.response.body", "body": b"Request body too large.\n"})
+            return
+        try:
+            environ = self._environ(scope, body, size)
+            loop = asyncio.get_running_loop()
+            status, headers, content = await loop.run_in_executor(self.executor, self._call_wsgi, environ)
+        finally:
+            body.close()
+
+        await send({
+            "type": "http.response.start",
+            "status": int(status.split(" ", 1)[0]),
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        })
+        await send({"type": "http.response.body", "body": content})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Each server worker process runs its share of the job queue from the start
+                start_workers()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _spool_body(self, scope, receive):
+        """Receive the whole request body into a spooled temporary file; returns (file, size)."""
+        if self.max_body is not None:
+            for name, value in scope.get("headers", []):
+                if name.lower() == b"content-length" and value.isdigit() and int(value) > self.max_body:
+                    raise BodyTooLarge()
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_memory, dir=self.spool_dir)
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                raise ClientDisconnected()
+            chunk = message.get("body", b"")
+            if chunk:
+                size += len(chunk)
+                if self.max_body is not None and size > self.max_body:
+                    body.close()
+                    raise BodyTooLarge()
+                body.write(chunk)   # page-cache write; small next to the network wait per chunk
+            more = message.get("more_body", False)
+        body.seek(0)
+        return body, size
+
+    @staticmethod
+    def _environ(scope, body, size):
+        """WSGI environ for an ASGI http scope (PEP 3333)."""
+        server = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1] or 80),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "CONTENT_LENGTH": str(size),   # chunked uploads included: the body is complete
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        if scope.get("client"):
+            environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = scope["client"][0], str(scope["client"][1])
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name == "CONTENT_LENGTH":
+                continue
+            key = name if name == "CONTENT_TYPE" else f"HTTP_{name}"
+            if key in environ:
+                value = environ[key] + ("; " if key == "HTTP_COOKIE" else ",") + value
+            environ[key] = value
+        return environ
+
+    def _call_wsgi(self, environ):
+        """Run the WSGI app (in a pool thread); returns (status, headers, body bytes)."""
+        response = {}
+        content = []
+
+        def start_response(status, headers, exc_info=None):
+            # Nothing is sent before the app returns, so an error response simply replaces the first
+            response["status"], response["headers"] = status, headers
+            return content.append
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    content.append(chunk)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return response["status"], response["headers"], b"".join(content)
+
+
+application = WsgiBridge(app)
@@ -0,0 +1,104 @@
+# benchmarks/corpus.py
+"""
+Synthetic, seeded resume / JD corpora for the benchmarks: plain text shaped
+like real resumes (headings, action verbs, compound skills, contact lines)
+and minimal single-font PDFs built from that text.
+"""
+
+import random
+
+SKILLS = [
+    "python", "java", "c++", "c#", ".net", "node.js", "javascript", "typescript", "react",
+    "angular", "flask", "django", "spring", "sql", "mysql", "postgresql", "mongodb", "redis",
+    "docker", "kubernetes", "aws", "azure", "gcp", "terraform", "ci/cd", "git", "github",
+    "html5", "css", "machine learning", "data science", "pandas", "numpy", "tensorflow",
+    "pytorch", "spark", "hadoop", "kafka", "airflow", "tableau", "excel", "powerpoint",
+    "linux", "bash", "rest", "graphql", "microservices", "agile", "scrum", "jira",
+]
+VERBS = [
+    "developed", "created", "built", "designed", "implemented", "executed", "managed",
+    "led", "supervised", "analyzed", "evaluated", "deployed", "released", "collaborated",
+    "coordinated", "achieved", "resolved", "fixed", "optimized", "migrated", "automated",
+]
+OBJECTS = [
+    "services", "pipelines", "dashboards", "APIs", "models", "reports", "platforms",
+    "applications", "databases", "workflows", "integrations", "tests", "features",
+]
+FILLER = [
+    "the", "and", "with", "for", "a", "team", "of", "in", "using", "across", "new",
+    "customer", "internal", "scalable", "reliable", "high", "traffic", "data", "cloud",
+]
+JD_SECTIONS = ["Role Overview", "Responsibilities", "Requirements", "Preferred Skills", "Benefits"]
+
+def _sentence(rng, skills):
+    words = [rng.choice(VERBS), rng.choice(FILLER), rng.choice(OBJECTS), rng.choice(FILLER)]
+    words += rng.sample(skills, k=min(len(skills), rng.randint(1, 3)))
+    words += [rng.choice(FILLER) for _ in range(rng.randint(2, 8))]
+    return " ".join(words).capitalize() + "."
+
+def make_resume(rng, i):
+    """One resume's text; each candidate gets a random skill profile."""
+    skills = rng.sample(SKILLS, k=rng.randint(5, 15))
+    lines = [
+        f"Candidate {i}",
+        f"candidate{i}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        f"linkedin.com/in/candidate-{i}",
+        "Summary",
+        _sentence(rng, skills),
+        "Experience",
+    ]
+    lines += [_sentence(rng, skills) for _ in range(rng.randint(6, 30))]
+    lines += ["Skills", ", ".join(skills), "Education", "B.Sc. Computer Science"]
+    return "\n".join(lines)
+
+def make_jd(rng):
+    """A job description using the headings collect_jd_priority_terms boosts."""
+    skills = rng.sample(SKILLS, k=10)
+    lines = ["Senior Software Engineer"]
+    for heading in JD_SECTIONS:
+        lines.append(heading)
+        lines += [_sentence(rng, skills) for _ in range(rng.randint(2, 5))]
+    return "\n".join(lines)
+
+def make_corpus(n_resumes, seed=0):
+    """(jd_text, [(filename, resume_text), ...]) - identical for the same arguments."""
+    rng = random.Random(seed)
+    jd = make_jd(rng)
+    return jd, [(f"resume_{i:06d}.pdf", make_resume(rng, i)) for i in range(n_resumes)]
+
+def make_pdf(text, lines_per_page=45):
+    """Minimal valid PDF (Helvetica, one text object per page) containing `text`."""
+    lines = text.split("\n")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # 1: catalog, 2: pages, 3: font, then a (page, contents) pair per page
+    objs = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_lines in pages:
+        ops = ["BT /F1 10 Tf 50 760 Td 14 TL"]
+        for ln in page_lines:
+            ln = ln.encode("latin-1", "replace").decode("latin-1")
+            ln = ln.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({ln}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        page_no, contents_no = len(objs) + 1, len(objs) + 2
+        kids.append(f"{page_no} 0 R")
+        objs.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % contents_no
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objs[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return out
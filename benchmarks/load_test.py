@@ -0,0 +1,190 @@
+# benchmarks/load_test.py
+"""
+Concurrent-request load test against a running server.
+
+    # before: synchronous WSGI workers
+    gunicorn -w 4 -b :8000 app:app
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --clients 32 --upload-rate 256k --out wsgi.json
+
+    # after: the ASGI bridge (asgi.py)
+    uvicorn asgi:application --workers 4 --port 8001
+    python -m benchmarks.load_test --url http://127.0.0.1:8001 --clients 32 --upload-rate 256k --out asgi.json
+
+Each client loops for --duration seconds over a weighted mix of /process
+uploads (a JD plus --resumes synthetic resume PDFs, sent at --upload-rate bytes
+per second to model recruiters on slow links), /results pages and
+/api/resume_detail lookups. The report has throughput and latency percentiles
+per endpoint; compare the read endpoints' latency under upload load between the
+two servers. Requests are signed in as --user-id with the session cookie the
+server would issue (FLASK_SECRET_KEY must match the server's).
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from benchmarks.corpus import make_corpus, make_pdf
+
+DEFAULT_MIX = "process=1,results=4,detail=4"
+UPLOAD_CHUNK = 16 * 1024
+
+
+def _size(text):
+    """'256k' / '2m' / '1000' -> bytes."""
+    text = text.strip().lower()
+    scale = {"k": 1024, "m": 1024 * 1024}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+def session_cookie(user_id):
+    from app import app
+    value = app.session_interface.get_signing_serializer(app).dumps({"user_id": user_id})
+    return f"{app.config['SESSION_COOKIE_NAME']}={value}"
+
+def multipart_upload(n_resumes, seed):
+    """(content type, body, resume names) of a /process form: jd_file plus n_resumes resume_files."""
+    from werkzeug.test import EnvironBuilder
+    jd_text, resumes = make_corpus(n_resumes, seed)
+    environ = EnvironBuilder(method="POST", data={
+        "jd_file": (io.BytesIO(make_pdf(jd_text)), "jd.pdf"),
+        "resume_files": [(io.BytesIO(make_pdf(text)), name) for name, text in resumes],
+    }).get_environ()
+    return environ["CONTENT_TYPE"], environ["wsgi.input"].read(), [name for name, _ in resumes]
+
+
+class Client:
+    """One simulated recruiter; plain HTTP/1.1, a new connection per request."""
+
+    def __init__(self, url, cookie, upload, upload_rate, timeout):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.cookie = cookie
+        self.content_type, self.body, self.names = upload
+        self.upload_rate = upload_rate
+        self.timeout = timeout
+
+    async def request(self, method, path, body=b"", headers=()):
+        """Returns the response status (0 on a connection error or timeout)."""
+        try:
+            return await asyncio.wait_for(self._request(method, path, body, headers), self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            return 0
+
+    async def _request(self, method, path, body, headers):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                    f"Cookie: {self.cookie}", "Accept: application/json", "Connection: close",
+                    f"Content-Length: {len(body)}", *headers]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            for start in range(0, len(body), UPLOAD_CHUNK):
+                chunk = body[start:start + UPLOAD_CHUNK]
+                writer.write(chunk)
+                await writer.drain()
+                if self.upload_rate:
+                    await asyncio.sleep(len(chunk) / self.upload_rate)
+            await writer.drain()
+            status_line = await reader.readline()
+            await reader.read()   # headers and body, until the server closes
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+
+    async def process(self):
+        return await self.request("POST", "/process", self.body, [f"Content-Type: {self.content_type}"])
+
+    async def results(self):
+        return await self.request("GET", "/results?top=10")
+
+    async def detail(self):
+        return await self.request("GET", f"/api/resume_detail?file={random.choice(self.names)}&limit=20000")
+
+
+async def run_load(clients, mix, duration):
+    """Run every client for `duration` seconds; returns {endpoint: [(status, seconds), ...]}."""
+    endpoints, weights = zip(*mix.items())
+    samples = {name: [] for name in endpoints}
+    deadline = time.monotonic() + duration
+
+    async def loop(client, rng):
+        while time.monotonic() < deadline:
+            name = rng.choices(endpoints, weights)[0]
+            start = time.perf_counter()
+            status = await getattr(client, name)()
+            samples[name].append((status, time.perf_counter() - start))
+
+    await asyncio.gather(*(loop(c, random.Random(i)) for i, c in enumerate(clients)))
+    return samples
+
+def summarize(samples, seconds):
+    def pct(values, q):
+        return round(values[min(len(values) - 1, int(q * len(values)))], 4) if values else None
+
+    report = {}
+    for name, rows in samples.items():
+        latencies = sorted(s for _, s in rows)
+        report[name] = {
+            "requests": len(rows),
+            "per_sec": round(len(rows) / seconds, 2),
+            "errors": sum(1 for status, _ in rows if status == 0 or status >= 500),
+            "statuses": {str(k): v for k, v in sorted(Counter(status for status, _ in rows).items())},
+            "p50": pct(latencies, 0.50),
+            "p95": pct(latencies, 0.95),
+            "max": round(latencies[-1], 4) if latencies else None,
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load test for the screening web tier.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent simulated recruiters")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--resumes", type=int, default=20, help="resume PDFs per /process upload")
+    parser.add_argument("--upload-rate", default="0", help="per-client upload bytes/s, e.g. 256k (0 = unthrottled)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout (seconds)")
+    parser.add_argument("--user-id", type=int, default=1, help="user the session cookie signs in")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    mix = {}
+    for part in args.mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("process", "results", "detail"):
+            parser.error(f"unknown endpoint in --mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+
+    upload = multipart_upload(args.resumes, args.seed)
+    cookie = session_cookie(args.user_id)
+    clients = [Client(args.url, cookie, upload, _size(args.upload_rate), args.timeout) for _ in range(args.clients)]
+
+    start = time.monotonic()
+    samples = asyncio.run(run_load(clients, mix, args.duration))
+    elapsed = time.monotonic() - start
+
+    report = {
+        "meta": {"url": args.url, "clients": args.clients, "duration": round(elapsed, 2), "mix": mix,
+                 "upload_bytes": len(upload[1]), "upload_rate": _size(args.upload_rate)},
+        "endpoints": summarize(samples, elapsed),
+    }
+    for name, row in report["endpoints"].items():
+        print(f"{name:>8} {row['requests']:>6} req {row['per_sec']:>8.2f}/s  p50 {row['p50']}s  "
+              f"p95 {row['p95']}s  max {row['max']}s  errors {row['errors']}", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
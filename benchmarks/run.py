@@ -0,0 +1,379 @@
+# benchmarks/run.py
+"""
+Benchmark harness for the screening pipeline.
+
+    python -m benchmarks.run --sizes 10,100,1000 --out bench.json
+    python -m benchmarks.run --sizes 10,100,1000 --baseline benchmarks/baseline.json
+    python -m benchmarks.run --sizes 10,100 --save-baseline benchmarks/baseline.json
+
+Each stage runs once per corpus size on a seeded synthetic corpus
+(benchmarks.corpus). Wall time is measured without tracing; peak Python heap
+(tracemalloc) is measured in a second, traced run unless --no-memory is given.
+Work done in extraction worker processes is not visible to tracemalloc.
+token_lists / token_ids compare the heap held by a tokenized resume pool as
+str lists and as interned token ids (core.interner).
+
+Stages whose cost grows too fast for big corpora (PDF parsing, the pure-Python
+rank_resumes_simple, the full /process path) are capped by --max-pdfs and
+--max-simple; sizes above the cap are reported as skipped.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import cached_property
+
+# The /process stage drives jobs synchronously; keep everything out of ./instance
+_TMP = tempfile.mkdtemp(prefix="resume-bench-")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("JOB_DB_PATH", os.path.join(_TMP, "jobs.db"))
+os.environ.setdefault("JOB_DIR", os.path.join(_TMP, "jobs"))
+os.environ.setdefault("RESUME_INDEX_PATH", os.path.join(_TMP, "resume_index.db"))
+
+from benchmarks.corpus import make_corpus, make_pdf
+from core.extract import extract_text
+from core.preprocess import preprocess_text, reset_preprocessor
+from core.tf_idf import compute_tfidf, compute_tfidf_matrix
+from core.interner import TermInterner, term_interner
+from core.similarity import cosine_similarity, cosine_similarity_batch
+from core.ranking import rank_resumes_simple
+
+DEFAULT_SIZES = "10,100,1000"
+REGRESSION_TOLERANCE = 0.20   # slower than baseline by more than 20% -> regression
+
+
+class Corpus:
+    """Inputs for one corpus size, built lazily and outside the timed sections."""
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.jd_text, self.resumes = make_corpus(size, seed)
+
+    @cached_property
+    def jd_pdf(self):
+        return make_pdf(self.jd_text)
+
+    @cached_property
+    def pdfs(self):
+        return [make_pdf(text) for _, text in self.resumes]
+
+    @cached_property
+    def cleaned(self):
+        return [preprocess_text(self.jd_text)] + [preprocess_text(t) for _, t in self.resumes]
+
+    @cached_property
+    def all_docs(self):
+        return [c.split() for c in self.cleaned]
+
+    @cached_property
+    def encoded_docs(self):
+        return [term_interner.encode(doc) for doc in self.all_docs]
+
+    @cached_property
+    def tfidf(self):
+        return compute_tfidf(self.all_docs, boost_terms=set(self.all_docs[0]), boost_factor=1.5)
+
+    @cached_property
+    def tfidf_matrix(self):
+        return compute_tfidf_matrix(self.all_docs, boost_terms=set(self.all_docs[0]), boost_factor=1.5)[0]
+
+
+# ---------------- Stages ----------------
+# Each stage: prepare(corpus) (untimed) -> run() (timed) returning the number of items processed
+
+def stage_extract_text(corpus):
+    pdfs = corpus.pdfs
+    def run():
+        for pdf in pdfs:
+            extract_text(pdf)
+        return len(pdfs)
+    return run
+
+def stage_preprocess_text(corpus):
+    texts = [corpus.jd_text] + [t for _, t in corpus.resumes]
+    def run():
+        reset_preprocessor()   # cold token memo, as in a fresh worker
+        for text in texts:
+            preprocess_text(text)
+        return len(texts)
+    return run
+
+def stage_compute_tfidf(corpus):
+    docs = corpus.all_docs
+    def run():
+        compute_tfidf(docs, boost_terms=set(docs[0]), boost_factor=1.5)
+        return len(docs)
+    return run
+
+def stage_compute_tfidf_ids(corpus):
+    docs, boost_terms = corpus.encoded_docs, set(corpus.all_docs[0])
+    def run():
+        compute_tfidf_matrix(docs, boost_terms=boost_terms, boost_factor=1.5)
+        return len(docs)
+    return run
+
+# Memory held by a tokenized resume pool: peak_bytes is the cost of keeping every document
+def stage_token_lists(corpus):
+    cleaned = corpus.cleaned
+    def run():
+        docs = [text.split() for text in cleaned]
+        return len(docs)
+    return run
+
+def stage_token_ids(corpus):
+    cleaned = corpus.cleaned
+    def run():
+        interner = TermInterner()   # cold, as in a fresh worker
+        docs = [interner.encode_text(text) for text in cleaned]
+        return len(docs)
+    return run
+
+def stage_cosine_similarity(corpus):
+    vectors, top_terms = corpus.tfidf
+    def run():
+        for vec in vectors[1:]:
+            cosine_similarity(vectors[0], vec, top_terms)
+        return len(vectors) - 1
+    return run
+
+def stage_cosine_similarity_batch(corpus):
+    matrix = corpus.tfidf_matrix
+    def run():
+        cosine_similarity_batch(matrix[0], matrix[1:])
+        return matrix.shape[0] - 1
+    return run
+
+def stage_rank_resumes_simple(corpus):
+    jd, resumes = corpus.jd_text, corpus.resumes
+    def run():
+        rank_resumes_simple(jd, resumes)
+        return len(resumes)
+    return run
+
+def stage_process(corpus):
+    client, store = _process_client()
+    jd_pdf, pdfs, names = corpus.jd_pdf, corpus.pdfs, [name for name, _ in corpus.resumes]
+    def run():
+        from core import jobs
+        with store.installed():
+            data = {
+                "jd_file": (io.BytesIO(jd_pdf), "jd.pdf"),
+                "resume_files": [(io.BytesIO(pdf), name) for pdf, name in zip(pdfs, names)],
+            }
+            resp = client.post("/process", data=data, content_type="multipart/form-data",
+                               headers={"Accept": "application/json"})
+            assert resp.status_code == 202, resp.status_code
+            jobs.run_job(*jobs._claim_next())
+            assert client.get("/results?top=10").status_code == 200
+        return len(pdfs)
+    return run
+
+# name -> (stage, cap attribute on the CLI args or None)
+STAGES = {
+    "extract_text": (stage_extract_text, "max_pdfs"),
+    "preprocess_text": (stage_preprocess_text, None),
+    "compute_tfidf": (stage_compute_tfidf, None),
+    "compute_tfidf_ids": (stage_compute_tfidf_ids, None),
+    "token_lists": (stage_token_lists, None),
+    "token_ids": (stage_token_ids, None),
+    "cosine_similarity": (stage_cosine_similarity, None),
+    "cosine_similarity_batch": (stage_cosine_similarity_batch, None),
+    "rank_resumes_simple": (stage_rank_resumes_simple, "max_simple"),
+    "process": (stage_process, "max_pdfs"),
+}
+
+
+# ---------------- In-memory DB stand-in for /process ----------------
+class InMemoryStore:
+    """Replaces the MySQL-backed calls made on the /process path with dicts."""
+
+    def __init__(self):
+        self.documents = {}
+        self.runs = {}
+
+    def insert_document(self, file_name, doc_type, raw_text, cleaned_text, bytes_hash=None):
+        self.documents.setdefault(raw_text, (file_name, doc_type, cleaned_text, bytes_hash))
+
+    def insert_documents_bulk(self, docs):
+        inserted = [d for d in docs if d["raw_text"] not in self.documents]
+        for d in docs:
+            self.insert_document(d["file_name"], d["type"], d["raw_text"], d["cleaned_text"], d.get("bytes_hash"))
+        return inserted, [d for d in docs if d not in inserted]
+
+    def save_run(self, run_id, user_id, results, errors):
+        self.runs[run_id] = results
+
+    def get_run_results(self, run_id, limit, sort="rank", after_sn=None, min_score=None):
+        rows = self.runs.get(run_id, [])
+        if sort == "name":
+            rows = sorted(rows, key=lambda r: (r["name"], r["sn"]))
+        return [r for r in rows if after_sn is None or r["sn"] > after_sn][:limit]
+
+    @contextmanager
+    def installed(self):
+        import app
+        from core import jobs, screening
+        from core.text_cache import text_cache
+        patches = [
+            (screening, "insert_document", self.insert_document),
+            (screening, "insert_documents_bulk", self.insert_documents_bulk),
+            (jobs, "save_run", self.save_run),
+            (app, "get_run_results", self.get_run_results),
+            (text_cache, "loader", None),
+        ]
+        saved = [(obj, name, getattr(obj, name)) for obj, name, _ in patches]
+        for obj, name, value in patches:
+            setattr(obj, name, value)
+        text_cache.clear()   # every run parses every PDF
+        try:
+            yield self
+        finally:
+            for obj, name, value in saved:
+                setattr(obj, name, value)
+
+def _process_client():
+    import app
+    app.app.config["TESTING"] = True
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+    return client, InMemoryStore()
+
+
+# ---------------- Measurement ----------------
+def measure(run, memory=True):
+    """Time one call of `run`; optionally repeat it under tracemalloc for peak heap."""
+    start = time.perf_counter()
+    items = run()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "items": items,
+        "seconds": round(seconds, 6),
+        "items_per_sec": round(items / seconds, 2) if seconds > 0 else None,
+        "peak_bytes": peak,
+    }
+
+def run_benchmarks(sizes, stages, seed=0, memory=True, caps=None, log=print):
+    caps = caps or {}
+    results = []
+    for size in sizes:
+        corpus = Corpus(size, seed)
+        for name in stages:
+            stage, cap_name = STAGES[name]
+            cap = caps.get(cap_name)
+            if cap is not None and size > cap:
+                results.append({"stage": name, "size": size, "skipped": f"size above --{cap_name.replace('_', '-')}={cap}"})
+                continue
+            row = {"stage": name, "size": size, **measure(stage(corpus), memory)}
+            results.append(row)
+            log(f"{name:>24} n={size:<7} {row['seconds']:>10.4f}s {row['items_per_sec'] or 0:>12.1f}/s"
+                + (f" peak {row['peak_bytes'] / 1e6:.1f} MB" if row["peak_bytes"] is not None else ""))
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Match results to a baseline report by (stage, size).
+
+    Returns:
+        List[dict]: one row per matched stage with time / memory ratios (current / baseline)
+        and a `regression` flag when the time ratio exceeds 1 + tolerance
+    """
+    base = {(r["stage"], r["size"]): r for r in baseline.get("results", []) if "seconds" in r}
+    rows = []
+    for r in results:
+        b = base.get((r["stage"], r["size"]))
+        if b is None or "seconds" not in r or not b["seconds"]:
+            continue
+        time_ratio = r["seconds"] / b["seconds"]
+        mem_ratio = (r["peak_bytes"] / b["peak_bytes"]
+                     if r.get("peak_bytes") and b.get("peak_bytes") else None)
+        rows.append({
+            "stage": r["stage"],
+            "size": r["size"],
+            "time_ratio": round(time_ratio, 3),
+            "memory_ratio": round(mem_ratio, 3) if mem_ratio is not None else None,
+            "regression": time_ratio > 1 + tolerance,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume screening pipeline.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated corpus sizes (10 .. 100000)")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of: " + ", ".join(STAGES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-pdfs", type=int, default=2000, help="largest size for PDF-based stages")
+    parser.add_argument("--max-simple", type=int, default=2000, help="largest size for rank_resumes_simple")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this JSON report")
+    parser.add_argument("--save-baseline", help="also write the report here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any stage regressed")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": run_benchmarks(sizes, stages, args.seed, not args.no_memory,
+                                  {"max_pdfs": args.max_pdfs, "max_simple": args.max_simple}, log),
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            report["comparison"] = compare(report["results"], json.load(fh), args.tolerance)
+        for row in report["comparison"]:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            log(f"{row['stage']:>24} n={row['size']:<7} time x{row['time_ratio']:<7} {flag}")
+        regressions = [row for row in report["comparison"] if row["regression"]]
+
+    text = json.dumps(report, indent=2)
+    for path in filter(None, [args.out, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    if not args.out:
+        print(text)
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
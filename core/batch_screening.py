@@ -0,0 +1,214 @@
+# core/batch_screening.py
+"""
+Multi-JD screening: rank one resume pool against many job descriptions at once.
+
+Resumes are extracted and vectorized once. All JDs and resumes share one
+TF-IDF space (IDF over the resume pool plus every JD, full vocabulary), and the full
+resume x JD score matrix comes from sparse matrix-matrix products. Each JD's
+priority-section terms are still boosted in resumes (1.5x), exactly: the boost
+enters the numerator through the JD side and the boosted resume norms through
+a second product over squared weights. Because IDF is pooled across all JDs,
+scores differ slightly from screening each JD on its own via /process.
+
+    python -m core.batch_screening --jd a.pdf --jd b.pdf --resumes ./pdfs --top 10 --out batch.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from core import metrics
+from core.extract import extract_email
+from core.extract_pool import extract_many, extract_cached, document_row
+from core.minhash import NEAR_DUP_THRESHOLD, LshIndex, minhash_signature
+from core.screening import collect_jd_priority_terms, rejection_message, truncation_message
+from core.similarity import top_k_indices
+from core.interner import term_interner
+from core.tf_idf import count_matrix, idf_vector
+from database.db_connect import insert_documents_bulk
+
+BOOST_FACTOR = 1.5
+
+def score_matrix(jd_docs, resume_docs, jd_priority_terms=None, boost_factor=BOOST_FACTOR, idf_model=None):
+    """
+    Cosine scores of every resume against every JD.
+
+    Args:
+        jd_docs: List[List[str]] tokenized JDs (or core.interner token-id arrays)
+        resume_docs: List[List[str]] tokenized resumes (or token-id arrays)
+        jd_priority_terms: optional List[Set[str]], per JD, terms boosted in resumes
+        idf_model (IdfModel): document frequencies of a resume pool that already
+            includes resume_docs (which may then be any slice of it); the JDs are
+            counted on top
+
+    Returns:
+        np.ndarray: (len(resume_docs) x len(jd_docs)) scores in [0, 1]
+    """
+    n_jds = len(jd_docs)
+    all_docs = list(jd_docs) + list(resume_docs)
+    weights, vocab, terms = count_matrix(all_docs)
+    if not terms or not resume_docs or not n_jds:
+        return np.zeros((len(resume_docs), n_jds))
+
+    rows = np.repeat(np.arange(weights.shape[0]), np.diff(weights.indptr))
+    row_totals = np.asarray(weights.sum(axis=1)).ravel()
+    row_totals[row_totals == 0] = 1.0
+    if idf_model is None:
+        idf = idf_vector(weights)
+    else:
+        jd_df = np.bincount(weights[:n_jds].indices, minlength=len(terms))
+        idf = idf_model.idf(terms, extra_df=jd_df, extra_docs=n_jds)
+    weights.data = (weights.data / row_totals[rows]) * idf[weights.indices]
+
+    jds, resumes = weights[:n_jds], weights[n_jds:]
+
+    # Boost mask per JD (J x V); scaling the JD side by it boosts the shared terms in the dot product
+    mask_rows, mask_cols = [], []
+    for j, priority in enumerate(jd_priority_terms or ()):
+        cols = sorted({vocab[t] for t in priority or () if t in vocab})
+        mask_rows += [j] * len(cols)
+        mask_cols += cols
+    boost = csr_matrix((np.ones(len(mask_rows)), (mask_rows, mask_cols)), shape=(n_jds, len(terms)))
+
+    with metrics.timed("cosine"):
+        jd_side = jds + jds.multiply(boost) * (boost_factor - 1.0)
+        numerator = (resumes @ jd_side.T).toarray()
+
+        # ||boosted resume||^2 = ||r||^2 + (b^2 - 1) * sum of r_t^2 over the JD's boosted terms
+        squared = resumes.multiply(resumes).tocsr()
+        norms_sq = np.asarray(squared.sum(axis=1)) + (boost_factor ** 2 - 1.0) * (squared @ boost.T).toarray()
+        jd_norms = np.sqrt(np.asarray(jds.multiply(jds).sum(axis=1)).ravel())
+
+        denom = np.sqrt(norms_sq) * jd_norms[None, :]
+        scores = np.divide(numerator, denom, out=np.zeros_like(numerator), where=denom > 0)
+    return np.clip(scores, 0.0, 1.0)
+
+def screen_many(jd_sources, resume_payloads, top_k=10, persist=True, progress=None):
+    """
+    Screen one resume set against several JDs (same per-file policy as run_screening:
+    in-run duplicates and near-duplicates are listed but not scored, resumes
+    identical to a JD are skipped).
+
+    Args:
+        jd_sources: list of (jd name, pdf bytes or path)
+        resume_payloads: iterable of (filename, pdf bytes/path, or None if not a valid PDF)
+        top_k: rows per JD ranking (None = all)
+        progress: optional callback(files_extracted)
+
+    Returns:
+        dict: {"jds": [{"name", "ranking": [{"name", "email", "score"}, ...]}],
+               "resumes": [{"name", "email", "best_jd", "best_score", "duplicate"}],
+               "errors": [...]}
+    """
+    errors = []
+    jds = []
+    for name, source in jd_sources:
+        try:
+            jd = extract_cached(source)
+        except Exception:
+            errors.append(f"Job description '{name}' could not be read and was skipped.")
+            continue
+        if jd.truncated:
+            errors.append(truncation_message(name, jd))
+        jds.append({"name": name, "raw_hash": jd.raw_hash, "tokens": term_interner.encode_text(jd.cleaned_text),
+                    "priority": collect_jd_priority_terms(jd.raw_text)})
+    jd_hashes = {jd["raw_hash"] for jd in jds}
+
+    rows, uniques, to_store, seen = [], [], [], {}
+    near_dups = LshIndex(NEAR_DUP_THRESHOLD) if NEAR_DUP_THRESHOLD > 0 else None
+    for count, (filename, extracted, err) in enumerate(extract_many(resume_payloads), start=1):
+        if progress:
+            progress(count)
+        rejected = rejection_message(filename, extracted, err)
+        if rejected:
+            errors.append(rejected)
+            continue
+        if extracted.raw_hash in jd_hashes:
+            errors.append(f"'{filename}' was skipped because it is the SAME PDF as one of the JDs.")
+            continue
+        if extracted.truncated:
+            errors.append(truncation_message(filename, extracted))
+        row = {"name": filename, "email": extract_email(extracted.raw_text),
+               "best_jd": None, "best_score": None, "duplicate": "—"}
+        rows.append(row)
+        if extracted.raw_hash in seen:
+            row["duplicate"] = f"Duplicate of {seen[extracted.raw_hash]}"
+            continue
+        if near_dups is not None:
+            signature = minhash_signature(extracted.cleaned_text.split())
+            original = near_dups.near_duplicate(signature)
+            if original is not None:
+                row["duplicate"] = f"Near-duplicate of {seen[original]}"
+                continue
+            near_dups.add(extracted.raw_hash, signature)   # by content: file names can repeat
+        seen[extracted.raw_hash] = filename
+        uniques.append((row, term_interner.encode_text(extracted.cleaned_text)))
+        to_store.append(document_row(filename, extracted))
+
+    if persist and to_store:
+        try:
+            insert_documents_bulk(to_store)
+        except Exception as err:
+            print("Skipping persistence for this batch:", err)
+
+    scores = score_matrix([jd["tokens"] for jd in jds], [tokens for _, tokens in uniques],
+                          [jd["priority"] for jd in jds])
+
+    report = {"jds": [], "resumes": rows, "errors": errors}
+    for j, jd in enumerate(jds):
+        order, ranked = top_k_indices(scores[:, j], len(uniques) if top_k is None else top_k)
+        report["jds"].append({
+            "name": jd["name"],
+            "ranking": [
+                {"name": uniques[i][0]["name"], "email": uniques[i][0]["email"], "score": round(float(s), 2)}
+                for i, s in zip(order.tolist(), ranked.tolist())
+            ],
+        })
+    if jds:
+        for i, ((row, _), j) in enumerate(zip(uniques, scores.argmax(axis=1).tolist())):
+            row["best_jd"] = jds[j]["name"]
+            row["best_score"] = round(float(scores[i, j]), 2)
+    return report
+
+
+# ---------------- CLI ----------------
+def _pdfs_in(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(".pdf"))
+    return [path]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank one resume set against several job descriptions.")
+    parser.add_argument("--jd", action="append", required=True, help="JD PDF or directory of JD PDFs (repeatable)")
+    parser.add_argument("--resumes", action="append", required=True, help="resume PDF or directory (repeatable)")
+    parser.add_argument("--top", type=int, default=10, help="rows per JD ranking (0 = all)")
+    parser.add_argument("--no-persist", action="store_true", help="do not store resumes in the database")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    jd_paths = [p for arg in args.jd for p in _pdfs_in(arg)]
+    resume_paths = [p for arg in args.resumes for p in _pdfs_in(arg)]
+    report = screen_many(
+        [(os.path.basename(p), p) for p in jd_paths],
+        ((os.path.basename(p), p) for p in resume_paths),
+        top_k=args.top or None,
+        persist=not args.no_persist,
+        progress=lambda n: print(f"\rExtracted {n}/{len(resume_paths)}", end="", file=sys.stderr),
+    )
+    print(file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
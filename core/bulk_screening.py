@@ -0,0 +1,357 @@
+# core/bulk_screening.py
+"""
+Command-line bulk screening: rank a directory, tar or zip archive of resume
+PDFs against one JD without going through the web upload.
+
+    python -m core.bulk_screening jd.pdf ./resumes.tar.gz --out ranking.csv --top 100
+
+Resumes are extracted and preprocessed in the extraction worker pool
+(core.extract_pool, at most EXTRACT_MAX_IN_FLIGHT files in memory) and spooled
+to a SQLite checkpoint file, one row per input in input order, committed every
+CHECKPOINT_EVERY files. A crashed or interrupted run started again with the
+same arguments skips the inputs already in the checkpoint. Scoring then
+streams the spooled resumes in batches against an IdfModel of the whole pool,
+and the ranking is streamed out of the checkpoint in score order, so memory
+stays bounded by the batch size and the vocabulary rather than the corpus.
+
+Same per-file policy as /process (in-run duplicates and near-duplicates are
+listed but not scored,
+a resume identical to the JD is skipped) and the same 1.5x boost of the JD's
+priority sections; IDF covers the full vocabulary (no MAX_FEATURES cut), so
+scores can differ slightly from /process on the same files.
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import tarfile
+import zipfile
+
+from core import metrics
+from core.batch_screening import score_matrix
+from core.extract import extract_email
+from core.extract_pool import extract_many, extract_cached, document_row
+from core.idf_model import IdfModel
+from core.minhash import (NEAR_DUP_THRESHOLD, band_keys, jaccard_estimate, minhash_signature,
+                          pack_signature, unpack_signature)
+from core.screening import collect_jd_priority_terms, rejection_message, truncation_message
+from database.db_connect import insert_documents_bulk
+
+_INSTANCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance")
+CHECKPOINT_DIR = os.environ.get("BULK_CHECKPOINT_DIR", os.path.join(_INSTANCE_DIR, "bulk"))
+# Inputs per checkpoint commit (and per database insert when persisting)
+CHECKPOINT_EVERY = int(os.environ.get("BULK_CHECKPOINT_EVERY", "200"))
+# Resumes scored per sparse product
+SCORE_BATCH_SIZE = int(os.environ.get("BULK_SCORE_BATCH_SIZE", "2048"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS resumes (
+    seq        INTEGER PRIMARY KEY,     -- input position
+    name       TEXT NOT NULL,
+    email      TEXT,
+    raw_hash   TEXT,
+    duplicate  TEXT,                    -- "Duplicate of X" / "Near-duplicate of X"
+    error      TEXT,                    -- why the input was skipped, or that it was truncated
+    tokens     TEXT,                    -- cleaned text (unique resumes only)
+    signature  BLOB,                    -- MinHash signature (unique resumes only)
+    score      REAL
+);
+CREATE INDEX IF NOT EXISTS resumes_hash ON resumes (raw_hash);
+CREATE TABLE IF NOT EXISTS lsh_buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, seq INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS lsh_buckets_key ON lsh_buckets (band, bucket);
+"""
+
+
+# ---------------- Inputs ----------------
+def _looks_like_pdf(payload):
+    if isinstance(payload, bytes):
+        return payload.startswith(b"%PDF")
+    with open(payload, "rb") as fh:
+        return fh.read(5).startswith(b"%PDF")
+
+def iter_sources(source):
+    """
+    Yield (name, load) for every PDF in a directory (walked in sorted order),
+    a tar archive (any compression, streamed) or a zip archive. load() returns
+    a path or the member's bytes and must be called before advancing.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for f in sorted(files):
+                if f.lower().endswith(".pdf"):
+                    path = os.path.join(root, f)
+                    yield os.path.relpath(path, source), (lambda path=path: path)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    yield info.filename, (lambda info=info: zf.read(info))
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, "r|*") as tf:
+            for member in tf:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    yield member.name, (lambda member=member: tf.extractfile(member).read())
+    elif source.lower().endswith(".pdf"):
+        yield os.path.basename(source), (lambda: source)
+    else:
+        raise ValueError(f"{source} is not a directory, tar/zip archive or PDF")
+
+def _payloads(sources, skip):
+    """(name, payload or None if not a PDF) for every input after the first `skip`."""
+    entries = itertools.chain.from_iterable(iter_sources(s) for s in sources)
+    for name, load in itertools.islice(entries, skip, None):
+        payload = load()
+        yield name, payload if _looks_like_pdf(payload) else None
+
+
+# ---------------- Checkpoint ----------------
+def default_checkpoint_path(jd_bytes_hash, sources):
+    key = hashlib.sha256(json.dumps([jd_bytes_hash] + [os.path.abspath(s) for s in sources]).encode()).hexdigest()
+    return os.path.join(CHECKPOINT_DIR, f"{key[:16]}.db")
+
+def open_checkpoint(path, jd_bytes_hash, sources):
+    """Open (or create) a checkpoint; refuses one written for another JD or input set."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    expected = {"jd": jd_bytes_hash, "sources": json.dumps([os.path.abspath(s) for s in sources])}
+    stored = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('jd', 'sources')").fetchall())
+    if stored and stored != expected:
+        conn.close()
+        raise ValueError(f"Checkpoint {path} belongs to a different JD or input set (use --restart)")
+    conn.executemany("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", expected.items())
+    conn.commit()
+    return conn
+
+def _meta(conn, key):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+# ---------------- Passes ----------------
+def spool_resumes(conn, sources, jd, persist=False, workers=None, progress=None):
+    """
+    Extract every input not yet in the checkpoint and record it: unique resumes
+    keep their cleaned text, duplicates and rejected files only their outcome.
+    """
+    done = conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+    pending, to_store = 0, []
+
+    def commit():
+        if persist and to_store:
+            try:
+                insert_documents_bulk(to_store)
+            except Exception as err:
+                print("Skipping persistence for this batch:", err)
+            to_store.clear()
+        conn.commit()
+
+    results = extract_many(_payloads(sources, done), workers=workers)
+    for seq, (filename, extracted, err) in enumerate(results, start=done):
+        row = {"seq": seq, "name": filename, "email": None, "raw_hash": None,
+               "duplicate": None, "error": rejection_message(filename, extracted, err),
+               "tokens": None, "signature": None}
+        if row["error"]:
+            metrics.count("file_rejected")
+        elif extracted.raw_hash == jd.raw_hash:
+            metrics.count("file_same_as_jd")
+            row["error"] = f"'{filename}' was skipped because it is the SAME PDF as the JD."
+        else:
+            row["error"] = truncation_message(filename, extracted)
+            row["email"] = extract_email(extracted.raw_text)
+            row["raw_hash"] = extracted.raw_hash
+            first = conn.execute(
+                "SELECT name FROM resumes WHERE raw_hash = ? AND duplicate IS NULL LIMIT 1", (extracted.raw_hash,)
+            ).fetchone()
+            signature = original = None
+            if not first and NEAR_DUP_THRESHOLD > 0:
+                signature = minhash_signature(extracted.cleaned_text.split())
+                original = _near_duplicate(conn, signature)
+            if first:
+                metrics.count("file_duplicate")
+                row["duplicate"] = f"Duplicate of {first[0]}"
+            elif original:
+                metrics.count("file_near_duplicate")
+                row["duplicate"] = f"Near-duplicate of {original}"
+            else:
+                metrics.count("file_unique")
+                row["tokens"] = extracted.cleaned_text
+                if signature is not None:
+                    row["signature"] = pack_signature(signature)
+                    conn.executemany("INSERT INTO lsh_buckets (band, bucket, seq) VALUES (?, ?, ?)",
+                                     [(band, key, seq) for band, key in band_keys(signature)])
+                to_store.append(document_row(filename, extracted))
+        conn.execute(
+            "INSERT INTO resumes (seq, name, email, raw_hash, duplicate, error, tokens, signature) "
+            "VALUES (:seq, :name, :email, :raw_hash, :duplicate, :error, :tokens, :signature)", row)
+
+        pending += 1
+        if pending >= CHECKPOINT_EVERY:
+            commit()
+            pending = 0
+        if progress:
+            progress("extract", seq + 1, None)
+    commit()
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('spooled', '1')")
+    conn.commit()
+
+def _near_duplicate(conn, signature):
+    """Name of the most similar spooled resume sharing an LSH bucket, if above the threshold."""
+    if signature is None:
+        return None
+    keys = band_keys(signature)
+    where = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(keys))
+    candidates = conn.execute(
+        f"SELECT DISTINCT r.name, r.signature FROM lsh_buckets b JOIN resumes r ON r.seq = b.seq WHERE {where}",
+        [v for key in keys for v in key],
+    ).fetchall()
+    best, best_similarity = None, 0.0
+    for name, blob in candidates:
+        similarity = jaccard_estimate(signature, unpack_signature(blob))
+        if similarity >= NEAR_DUP_THRESHOLD and similarity > best_similarity:
+            best, best_similarity = name, similarity
+    return best
+
+def _unique_batches(conn, batch_size, unscored_only=False):
+    """Keyset-paged (seq, tokens) batches of the unique resumes."""
+    last = -1
+    condition = "AND score IS NULL" if unscored_only else ""
+    while True:
+        batch = conn.execute(
+            f"SELECT seq, tokens FROM resumes WHERE tokens IS NOT NULL AND seq > ? {condition} "
+            "ORDER BY seq LIMIT ?", (last, batch_size),
+        ).fetchall()
+        if not batch:
+            return
+        yield batch
+        last = batch[-1][0]
+
+def score_spooled(conn, jd_tokens, jd_priority_terms, batch_size=SCORE_BATCH_SIZE, progress=None):
+    """Score every unscored unique resume against the JD, with IDF over the whole pool."""
+    model = IdfModel()
+    for batch in _unique_batches(conn, batch_size):
+        for _, tokens in batch:
+            model.add(tokens.split())
+
+    scored = conn.execute("SELECT COUNT(*) FROM resumes WHERE score IS NOT NULL").fetchone()[0]
+    for batch in _unique_batches(conn, batch_size, unscored_only=True):
+        scores = score_matrix([jd_tokens], [tokens.split() for _, tokens in batch], [jd_priority_terms],
+                              idf_model=model)[:, 0]
+        conn.executemany("UPDATE resumes SET score = ? WHERE seq = ?",
+                         zip(scores.tolist(), (seq for seq, _ in batch)))
+        conn.commit()
+        scored += len(batch)
+        if progress:
+            progress("score", scored, model.n_docs)
+
+def ranked_rows(conn, top_k=None, min_score=0.0):
+    """
+    Stream the ranking: scored resumes by score (desc), then, unless top_k is
+    given, the duplicates. Rows are dicts with sn, name, email, duplicate, score.
+    """
+    query = ("SELECT name, email, score FROM resumes WHERE score IS NOT NULL AND score >= ? "
+             "ORDER BY score DESC, seq")
+    params = [min_score]
+    if top_k is not None:
+        query += " LIMIT ?"
+        params.append(top_k)
+    sn = 0
+    for sn, (name, email, score) in enumerate(conn.execute(query, params), start=1):
+        yield {"sn": sn, "name": name, "email": email or "", "duplicate": "—", "score": round(score, 2)}
+    if top_k is None:
+        dups = conn.execute("SELECT name, email, duplicate FROM resumes WHERE duplicate IS NOT NULL ORDER BY seq")
+        for sn, (name, email, label) in enumerate(dups, start=sn + 1):
+            yield {"sn": sn, "name": name, "email": email or "", "duplicate": label, "score": None}
+
+def screen_directory(jd_source, sources, checkpoint=None, restart=False, persist=False, workers=None, progress=None):
+    """
+    Run (or resume) the extract and score passes for `sources` against the JD.
+
+    Args:
+        checkpoint: checkpoint file (default: derived from the JD and the sources)
+        restart: discard an existing checkpoint instead of resuming from it
+
+    Returns:
+        (sqlite3.Connection, str): the completed checkpoint, ready for ranked_rows(), and its path
+    """
+    jd = extract_cached(jd_source)
+    if jd.truncated:
+        print(truncation_message("JD", jd), file=sys.stderr)
+    checkpoint = checkpoint or default_checkpoint_path(jd.bytes_hash, sources)
+    if restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    conn = open_checkpoint(checkpoint, jd.bytes_hash, sources)
+    with metrics.trace("bulk_screening", checkpoint=checkpoint):
+        if _meta(conn, "spooled") != "1":
+            spool_resumes(conn, sources, jd, persist=persist, workers=workers, progress=progress)
+        score_spooled(conn, jd.cleaned_text.split(), collect_jd_priority_terms(jd.raw_text), progress=progress)
+    return conn, checkpoint
+
+
+# ---------------- CLI ----------------
+FIELDS = ["sn", "name", "email", "duplicate", "score"]
+
+def write_rows(rows, out, fmt):
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+    else:
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+def _print_progress(phase, done, total):
+    label = "Extracted" if phase == "extract" else "Scored"
+    print(f"\r{label} {done}" + (f"/{total}" if total else ""), end="", file=sys.stderr, flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank a directory or tar/zip archive of resume PDFs against a JD.")
+    parser.add_argument("jd", help="job description PDF")
+    parser.add_argument("sources", nargs="+", help="directory, .tar[.gz|.bz2|.xz], .zip or PDF")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from --out's extension, else csv")
+    parser.add_argument("--top", type=int, help="only the best N resumes")
+    parser.add_argument("--min-score", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, help="extraction processes (default: EXTRACT_WORKERS)")
+    parser.add_argument("--persist", action="store_true", help="also store the resumes in the database")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: derived from the JD and inputs)")
+    parser.add_argument("--restart", action="store_true", help="discard an existing checkpoint")
+    parser.add_argument("--keep-checkpoint", action="store_true", help="keep the checkpoint after a successful run")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("jsonl" if (args.out or "").lower().endswith((".jsonl", ".json")) else "csv")
+    try:
+        conn, checkpoint = screen_directory(args.jd, args.sources, args.checkpoint, restart=args.restart,
+                                            persist=args.persist, workers=args.workers, progress=_print_progress)
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 2
+    print(file=sys.stderr)
+
+    try:
+        out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+        try:
+            write_rows(ranked_rows(conn, args.top, args.min_score), out, fmt)
+        finally:
+            if args.out:
+                out.close()
+        for (error,) in conn.execute("SELECT error FROM resumes WHERE error IS NOT NULL ORDER BY seq"):
+            print(error, file=sys.stderr)
+    finally:
+        conn.close()
+
+    if not args.keep_checkpoint:
+        os.remove(checkpoint)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
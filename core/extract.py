@@ -1,29 +1,79 @@
+import os
 import re
+import time
 from pypdf import PdfReader
 from io import BytesIO
 
-def extract_text(file_bytes):
-    """Extract text from PDF file bytes."""
-    reader = PdfReader(BytesIO(file_bytes))
-    text = ""
-    for page in reader.pages:
+from core.metrics import timed
+from core.sections import KNOWN_HEADINGS, heading_matcher, parse_sections, segment
+
+# Limits for a single PDF (env-configurable)
+MAX_PDF_PAGES = int(os.environ.get("MAX_PDF_PAGES", "50"))
+MAX_PDF_BYTES = int(os.environ.get("MAX_PDF_BYTES", str(25 * 1024 * 1024)))
+EXTRACT_TIME_BUDGET = float(os.environ.get("EXTRACT_TIME_BUDGET", "30"))
+
+class PdfTooLarge(ValueError):
+    """The PDF is over MAX_PDF_BYTES; nothing was parsed."""
+
+def _open_pdf(source, max_bytes):
+    """Accept bytes, a file path or a binary file object; check size before parsing."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        size, stream = len(source), BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        size, stream = os.path.getsize(source), source
+    else:
+        pos = source.tell()
+        size = source.seek(0, os.SEEK_END) - pos
+        source.seek(pos)
+        stream = source
+    if max_bytes is not None and size > max_bytes:
+        raise PdfTooLarge(f"{size} bytes exceeds the {max_bytes} byte limit")
+    return PdfReader(stream)
+
+def iter_page_texts(source, max_pages=None, max_bytes=None, time_budget=None, notes=None):
+    """
+    Yield the text of each page in order, stopping early after `max_pages`
+    pages or once `time_budget` seconds have been spent. When it stops early,
+    a note such as "truncated at 50 of 80 pages (page limit)" is appended to
+    `notes` (a list), if given.
+    """
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    max_bytes = MAX_PDF_BYTES if max_bytes is None else max_bytes
+    time_budget = EXTRACT_TIME_BUDGET if time_budget is None else time_budget
+
+    deadline = time.monotonic() + time_budget if time_budget else None
+    reader = _open_pdf(source, max_bytes)
+    pages = reader.pages
+    for i, page in enumerate(pages):
+        reason = None
+        if max_pages and i >= max_pages:
+            reason = "page limit"
+        elif deadline is not None and time.monotonic() > deadline:
+            reason = f"{time_budget:g}s time budget"
+        if reason:
+            if notes is not None:
+                notes.append(f"truncated at {i} of {len(pages)} pages ({reason})")
+            break
         page_text = page.extract_text()
         if page_text:
-            text += page_text
-    return text
+            yield page_text
+
+@timed("extract_text")
+def extract_text(file_bytes, max_pages=None, max_bytes=None, time_budget=None, notes=None):
+    """Extract text from a PDF (bytes, path or binary file object); see iter_page_texts for `notes`."""
+    return "".join(iter_page_texts(file_bytes, max_pages, max_bytes, time_budget, notes))
 
 def extract_exact_section(text, section_name):
-    """Extract exact section content by heading using regex."""
-    pattern = rf"(?i){re.escape(section_name)}\s*(.*?)(?=\n[A-Z][^\n]*\n|$)"
-    match = re.search(pattern, text, re.DOTALL)
-    if match:
-        return section_name + '\n' + match.group(1).strip()
-    return ""
+    """Extract exact section content by heading (see core.sections)."""
+    if section_name in KNOWN_HEADINGS:
+        return segment(text).section(section_name)
+    return parse_sections(text, heading_matcher(section_name)).section(section_name)
 
 def boost_resume_sections(text):
     """Boost skills and experience sections for similarity scoring."""
-    skills = extract_exact_section(text, "skills")
-    experience = extract_exact_section(text, "experience")
+    sections = segment(text)
+    skills = sections.section("skills")
+    experience = sections.section("experience")
     boosted_text = text + " " + (skills * 2) + " " + (experience * 2)
     return boosted_text
 
@@ -59,3 +109,11 @@ def extract_phone(text):
         if len(digits) >= 10:
             return candidate.strip()
     return ""
+
+# Stored per document at ingest (documents.email / phone / linkedin), sized to the columns
+CONTACT_FIELD_LIMITS = {"email": 255, "phone": 64, "linkedin": 255}
+
+def extract_contacts(text):
+    """Email, phone and LinkedIn URL of a document ('' when absent), for the contact columns."""
+    found = {"email": extract_email(text), "phone": extract_phone(text), "linkedin": extract_linkedin(text)}
+    return {k: v[:CONTACT_FIELD_LIMITS[k]] for k, v in found.items()}
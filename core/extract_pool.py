@@ -0,0 +1,277 @@
+# core/extract_pool.py
+"""
+Parallel extraction stage for uploads: extract_text + preprocess_text + hashing
+run in a long-lived process pool (one per process, started on first use and
+stopped at exit), results come back in upload order. Files already seen
+(same upload bytes) are served from core.text_cache without parsing.
+"""
+
+import atexit
+import hashlib
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+from core import metrics
+from core.extract import extract_text
+from core.preprocess import preprocess_text
+from core.text_cache import text_cache, file_bytes_hash
+
+# Configuration (env): workers <= 1 runs inline in the request thread
+EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+EXTRACT_TIMEOUT = float(os.environ.get("EXTRACT_TIMEOUT", "30"))
+EXTRACT_MAX_IN_FLIGHT = int(os.environ.get("EXTRACT_MAX_IN_FLIGHT", str(max(1, EXTRACT_WORKERS) * 2)))
+# Worker start method: the callers are multi-threaded (job workers, web threads), where
+# fork can copy a lock some other thread holds; forkserver/spawn start from a clean process
+EXTRACT_START_METHOD = os.environ.get(
+    "EXTRACT_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+# truncated: extract_text's note when it stopped early (page limit or time budget), else None
+Extracted = namedtuple("Extracted", ["raw_text", "cleaned_text", "raw_hash", "bytes_hash", "truncated"],
+                       defaults=(None,))
+
+class ExtractionTimeout(Exception):
+    """A file did not finish extracting within the per-file timeout."""
+
+def extract_and_clean(source, bytes_hash=None):
+    """Worker body: PDF bytes or path -> Extracted(raw_text, cleaned_text, sha256 of raw_text, bytes_hash, note)."""
+    notes = []
+    raw_text = extract_text(source, notes=notes)
+    cleaned_text = preprocess_text(raw_text)
+    raw_hash = hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+    return Extracted(raw_text, cleaned_text, raw_hash, bytes_hash, notes[0] if notes else None)
+
+def _extract_in_worker(source, bytes_hash):
+    """Pool entry point: also returns the worker's stage timings for metrics.replay."""
+    with metrics.capture() as stages:
+        extracted = extract_and_clean(source, bytes_hash)
+    return extracted, stages
+
+def _from_cache(cache, bytes_hash):
+    entry = cache.get(bytes_hash) if cache is not None else None
+    if cache is not None:
+        metrics.count("text_cache_hit" if entry else "text_cache_miss")
+    return Extracted(*entry, bytes_hash) if entry else None
+
+def _remember(cache, extracted):
+    # Truncated text is not cached: every run re-reads the file and reports the truncation
+    if cache is not None and not extracted.truncated:
+        cache.put(extracted.bytes_hash, extracted.raw_text, extracted.cleaned_text, extracted.raw_hash)
+    return extracted
+
+def extract_cached(source, cache=text_cache):
+    """Single-file extract_and_clean that goes through the content-hash cache."""
+    bytes_hash = file_bytes_hash(source)
+    return _from_cache(cache, bytes_hash) or _remember(cache, extract_and_clean(source, bytes_hash))
+
+def document_row(file_name, extracted, doc_type="resume"):
+    """
+    insert_documents_bulk row for an extraction. A truncated one is stored
+    without its bytes_hash, so the text cache never serves it (without its note).
+    """
+    return {"file_name": file_name, "type": doc_type, "raw_text": extracted.raw_text,
+            "cleaned_text": extracted.cleaned_text,
+            "bytes_hash": None if extracted.truncated else extracted.bytes_hash}
+
+# ---------------- Worker pool ----------------
+# Each task reports (task id, wall-clock start) here when a worker picks it up
+_task_started = None
+
+def _init_worker(started):
+    global _task_started
+    _task_started = started
+
+def _run_task(task_id, source, bytes_hash):
+    _task_started.put((task_id, time.time()))
+    return _extract_in_worker(source, bytes_hash)
+
+
+class _WorkerPool:
+    """
+    A long-lived process pool shared by every extract_many call of this process,
+    started on first use and only replaced when a task overruns its timeout.
+    Callers holding tasks of a replaced pool resubmit them (see `generation`).
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.generation = 0
+        self._pool = None
+        self._started = None
+        self._starts = {}     # task id -> when a worker picked it up
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, args):
+        """Queue one (source, bytes_hash); returns (task id, AsyncResult, pool generation)."""
+        with self._lock:
+            if self._pool is None:
+                context = multiprocessing.get_context(EXTRACT_START_METHOD)
+                if EXTRACT_START_METHOD == "forkserver":
+                    # Workers fork from a server that already imported the extraction stack
+                    context.set_forkserver_preload(["core.extract_pool"])
+                self._started = context.SimpleQueue()
+                self._pool = context.Pool(processes=self.workers, initializer=_init_worker,
+                                          initargs=(self._started,))
+            task_id = next(self._ids)
+            return task_id, self._pool.apply_async(_run_task, (task_id, *args)), self.generation
+
+    def started_at(self, task_id):
+        """When a worker picked the task up (time.time()), or None while it is still queued."""
+        with self._lock:
+            while self._started is not None and not self._started.empty():
+                started_id, at = self._started.get()
+                self._starts[started_id] = at
+            return self._starts.get(task_id)
+
+    def forget(self, task_id):
+        with self._lock:
+            self._starts.pop(task_id, None)
+
+    def replace(self, generation):
+        """Terminate the pool (killing a stuck worker) unless another caller already replaced it."""
+        with self._lock:
+            if generation != self.generation or self._pool is None:
+                return
+            metrics.count("extract_pool_restart")
+            self._pool.terminate()
+            self._pool, self._started = None, None
+            self._starts.clear()
+            self.generation += 1
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+            self._pool, self._started = None, None
+            self.generation += 1
+
+
+_pools = {}   # worker count -> _WorkerPool
+_pools_lock = threading.Lock()
+
+def _worker_pool(workers):
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = _WorkerPool(workers)
+        return _pools[workers]
+
+@atexit.register
+def shutdown_pools():
+    """Stop every extraction pool of this process (run at exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+# Seconds between checks while a caller waits for a task
+_POLL = 0.05
+
+def _wait(pool, task, timeout):
+    """
+    Result of a submitted task. The timeout runs from when a worker picked the
+    task up, so time spent queued behind other files does not count. A task of a
+    pool replaced meanwhile is resubmitted.
+
+    Raises:
+        multiprocessing.TimeoutError: the task ran for longer than `timeout`
+    """
+    task_id, job, generation, args = task
+    while True:
+        job.wait(_POLL)
+        if job.ready():
+            pool.forget(task_id)
+            return job.get()
+        if generation != pool.generation:
+            pool.forget(task_id)
+            task_id, job, generation = pool.submit(args)
+            task[:] = [task_id, job, generation, args]
+            continue
+        started = pool.started_at(task_id)
+        if timeout and started is not None and time.time() - started > timeout:
+            pool.forget(task_id)
+            raise multiprocessing.TimeoutError()
+
+def extract_many(items, workers=None, timeout=None, max_in_flight=None, cache=text_cache):
+    """
+    Run extract_and_clean over (key, payload) pairs, where a payload is the
+    PDF bytes or, preferably, a path (workers then read the file themselves).
+
+    At most `max_in_flight` files are submitted at once, so only that many
+    payloads are held in memory; `items` is consumed lazily. A payload of None
+    is passed straight through (the caller already rejected that file). Cache
+    hits are answered before any PDF parsing.
+
+    Files run in the process's long-lived pool for `workers` processes (shared
+    with concurrent calls). A file still running `timeout` seconds after a
+    worker picked it up is reported as ExtractionTimeout and the pool is
+    replaced (terminating the worker stuck on it); files that were in flight
+    are resubmitted to the new pool.
+
+    Yields:
+        (key, Extracted or None, Exception or None) in input order
+    """
+    workers = EXTRACT_WORKERS if workers is None else workers
+    timeout = EXTRACT_TIMEOUT if timeout is None else timeout
+    max_in_flight = EXTRACT_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+
+    if workers <= 1:
+        for key, payload in items:
+            if payload is None:
+                yield key, None, None
+                continue
+            try:
+                yield key, extract_cached(payload, cache), None
+            except Exception as err:
+                yield key, None, err
+        return
+
+    pool = _worker_pool(workers)
+    pending = deque()   # (key, Extracted / [task id, AsyncResult, generation, args] / None)
+    items = iter(items)
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max(1, max_in_flight):
+                try:
+                    key, payload = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                job = None
+                if payload is not None:
+                    args = (payload, file_bytes_hash(payload))
+                    job = _from_cache(cache, args[1]) or [*pool.submit(args), args]
+                pending.append((key, job))
+            if not pending:
+                break
+
+            key, job = pending.popleft()
+            if job is None:
+                yield key, None, None
+                continue
+            if isinstance(job, Extracted):
+                yield key, job, None
+                continue
+            try:
+                extracted, stages = _wait(pool, job, timeout)
+                metrics.replay(stages)
+                yield key, _remember(cache, extracted), None
+            except multiprocessing.TimeoutError:
+                # The worker stays busy with this file: replace the pool (in-flight files are resubmitted)
+                pool.replace(job[2])
+                yield key, None, ExtractionTimeout(f"exceeded {timeout:g}s")
+            except Exception as err:
+                yield key, None, err
+    finally:
+        # Tasks of an abandoned run still finish in the shared pool; only drop their bookkeeping
+        for _, job in pending:
+            if isinstance(job, list):
+                pool.forget(job[0])
@@ -0,0 +1,213 @@
+# core/idf_model.py
+"""
+Incremental document-frequency model for a document pool.
+
+IdfModel keeps the pool size and per-term document counts, is updated with
+add()/remove() as documents come and go, and can be snapshotted to disk and
+reloaded, so IDF for a query against a stable pool costs only the query's own
+terms. Terms can be any hashable key that survives JSON (strings or the
+`vocabulary` ids used by the stored term vectors).
+
+The process-wide resume pool model (pool_idf_model) is keyed by vocabulary id,
+loaded from IDF_MODEL_PATH at startup and brought forward from the stored term
+vectors of resumes newer than its watermark (the highest documents.id seen).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from core.tf_idf import idf_from_df
+
+IDF_MODEL_PATH = os.environ.get(
+    "IDF_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "idf_model.json"),
+)
+# Rewrite the snapshot at most this often (seconds) while the pool is growing
+IDF_SNAPSHOT_INTERVAL = float(os.environ.get("IDF_SNAPSHOT_INTERVAL", "60"))
+
+
+class IdfModel:
+    """Document count and per-term document frequencies, updated in place."""
+
+    def __init__(self, df=None, n_docs=0, watermark=0):
+        self.df = dict(df or {})
+        self.n_docs = n_docs
+        self.watermark = watermark   # highest document id folded in (pool models)
+        self.version = 0             # bumped on every update
+        self._dense = None           # (version, df array over integer keys), see dense_df
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_docs(cls, docs):
+        model = cls()
+        for doc in docs:
+            model.add(doc)
+        return model
+
+    # ---------------- Updates ----------------
+    def add(self, doc):
+        """Count one document (an iterable of terms; repeats count once)."""
+        with self._lock:
+            for term in set(doc):
+                self.df[term] = self.df.get(term, 0) + 1
+            self.n_docs += 1
+            self.version += 1
+
+    def merge(self, df, n_docs):
+        """Count `n_docs` documents at once from their combined document frequencies."""
+        with self._lock:
+            for term, count in df.items():
+                self.df[term] = self.df.get(term, 0) + count
+            self.n_docs += n_docs
+            self.version += 1
+
+    def remove(self, doc):
+        """Undo add(doc) for a document that is leaving the pool."""
+        with self._lock:
+            for term in set(doc):
+                count = self.df.get(term, 0) - 1
+                if count > 0:
+                    self.df[term] = count
+                else:
+                    self.df.pop(term, None)
+            self.n_docs = max(0, self.n_docs - 1)
+            self.version += 1
+
+    # ---------------- Lookups ----------------
+    def df_array(self, terms):
+        with self._lock:
+            get = self.df.get
+            return np.fromiter((get(t, 0) for t in terms), dtype=np.int64, count=len(terms))
+
+    def dense_df(self, size):
+        """
+        Document frequencies of the integer keys 0..size-1 (pool models, keyed by
+        vocabulary id) as an array, rebuilt only after the model changed.
+        """
+        with self._lock:
+            if self._dense is None or self._dense[0] != self.version or len(self._dense[1]) < size:
+                keys = np.fromiter(self.df.keys(), dtype=np.int64, count=len(self.df))
+                counts = np.fromiter(self.df.values(), dtype=np.int64, count=len(self.df))
+                dense = np.zeros(max(size, int(keys.max()) + 1 if len(keys) else 0), dtype=np.int64)
+                dense[keys] = counts
+                self._dense = (self.version, dense)
+            return self._dense[1][:size]
+
+    def idf(self, terms, extra_df=None, extra_docs=0):
+        """
+        Smoothed IDF (as core.tf_idf.compute_idf) for `terms`, optionally with
+        documents outside the pool counted on top (e.g. the JD: extra_docs=1
+        and extra_df marking the JD's terms).
+        """
+        df = self.df_array(terms)
+        if extra_df is not None:
+            df = df + extra_df
+        return idf_from_df(df, self.n_docs + extra_docs)
+
+    def dense_idf(self, size, extra_df=None, extra_docs=0):
+        """idf() of the integer keys 0..size-1, from dense_df (no per-key lookups)."""
+        df = self.dense_df(size)
+        if extra_df is not None:
+            df = df + extra_df
+        return idf_from_df(df, self.n_docs + extra_docs)
+
+    # ---------------- Persistence ----------------
+    def snapshot(self, path):
+        """Write the model atomically (temp file + rename)."""
+        with self._lock:
+            state = {
+                "n_docs": self.n_docs,
+                "watermark": self.watermark,
+                "df": [[term, count] for term, count in self.df.items()],
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as fh:
+            state = json.load(fh)
+        return cls(((term, count) for term, count in state["df"]), state["n_docs"], state.get("watermark", 0))
+
+
+# ---------------- Process-wide resume pool (keyed by vocabulary id) ----------------
+_pool_model = None
+_pool_lock = threading.Lock()
+_last_snapshot = 0.0
+
+def pool_idf_model():
+    """The resume pool model, loaded from IDF_MODEL_PATH on first use."""
+    global _pool_model
+    with _pool_lock:
+        if _pool_model is None:
+            try:
+                _pool_model = IdfModel.load(IDF_MODEL_PATH)
+            except FileNotFoundError:
+                _pool_model = IdfModel()
+            except (OSError, ValueError, KeyError) as err:
+                print("IDF snapshot unreadable, rebuilding:", err)
+                _pool_model = IdfModel()
+        return _pool_model
+
+def _fold(resumes, terms_of):
+    """Combined document frequencies, count and highest id of (doc_id, doc) pairs (memory bounded by vocabulary)."""
+    df, n_docs, watermark = Counter(), 0, 0
+    for doc_id, doc in resumes:
+        df.update(set(terms_of(doc)))
+        n_docs += 1
+        watermark = max(watermark, doc_id)
+    return df, n_docs, watermark
+
+def sync_pool_model(resumes, terms_of=None, model=None, total=None, recount=None):
+    """
+    Fold resumes newer than the model's watermark into it.
+
+    Args:
+        resumes: [(doc_id, doc), ...] for every resume in the pool, e.g. as just fetched for ranking;
+                 or, for pools read in chunks, a callable after_id -> iterable of (doc_id, doc)
+                 for the resumes with doc_id > after_id, with the pool size in `total`
+        terms_of: doc -> its term keys (default: doc is already a list of keys);
+                  only called for resumes the model has not seen
+        recount: optional () -> (df, n_docs, watermark) of the whole pool from the
+                 database (vocabulary.df), used instead of re-reading every resume
+                 when the model is out of step with the pool
+
+    Returns:
+        IdfModel: the (possibly rebuilt) pool model
+    """
+    global _pool_model, _last_snapshot
+    terms_of = terms_of or (lambda doc: doc)
+    if callable(resumes):
+        read_after = resumes
+    else:
+        total = len(resumes)
+        read_after = lambda after: (r for r in resumes if r[0] > after)
+    is_pool = model is None
+    model = model or pool_idf_model()
+    with model._lock:
+        df, fresh, watermark = _fold(read_after(model.watermark), terms_of)
+        if model.n_docs + fresh != total:
+            # Snapshot from another database, or documents were deleted: start over from the pool's counts
+            model = IdfModel()
+            df, fresh, watermark = recount() if recount else _fold(read_after(0), terms_of)
+            if is_pool:
+                _pool_model = model
+        if fresh:
+            model.merge(df, fresh)
+            model.watermark = max(model.watermark, watermark)
+
+    if is_pool and fresh and time.monotonic() - _last_snapshot >= IDF_SNAPSHOT_INTERVAL:
+        try:
+            model.snapshot(IDF_MODEL_PATH)
+            _last_snapshot = time.monotonic()
+        except OSError as err:
+            print("Could not write IDF snapshot:", err)
+    return model
@@ -0,0 +1,61 @@
+# core/interner.py
+"""
+Process-wide term interner: every distinct term gets a stable int32 id.
+
+Documents held in memory while screening are int32 token-id arrays instead of
+lists of str (4 bytes per token rather than a list slot plus a string object
+per token); each distinct term's string is kept once, here. core.tf_idf builds
+its count matrices straight from these arrays.
+
+Ids are only meaningful inside this process: persisted vectors use the
+`vocabulary` table ids instead (core.term_vectors). The interner only grows,
+which is bounded by the distinct terms the process ever sees.
+"""
+
+import threading
+
+import numpy as np
+
+TOKEN_DTYPE = np.int32
+
+
+class TermInterner:
+    """term <-> int32 id, append-only and safe to share between threads."""
+
+    def __init__(self):
+        self._ids = {}     # term -> id
+        self._terms = []   # id -> term
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def encode(self, tokens):
+        """Token list -> np.ndarray[int32] of ids, interning unseen terms."""
+        if not isinstance(tokens, (list, tuple)):
+            tokens = list(tokens)
+        ids = self._ids
+        new = set(tokens).difference(ids)
+        if new:
+            with self._lock:
+                for term in new:
+                    if term not in ids:
+                        ids[term] = len(self._terms)
+                        self._terms.append(term)
+        return np.fromiter(map(ids.__getitem__, tokens), dtype=TOKEN_DTYPE, count=len(tokens))
+
+    def encode_text(self, cleaned_text):
+        """Whitespace-separated cleaned_text -> token ids."""
+        return self.encode((cleaned_text or "").split())
+
+    def decode(self, ids):
+        """Token ids -> list of terms."""
+        terms = self._terms
+        return [terms[i] for i in np.asarray(ids).tolist()]
+
+
+term_interner = TermInterner()
+
+def is_encoded(doc):
+    """True for token-id documents (as opposed to lists of terms)."""
+    return isinstance(doc, np.ndarray)
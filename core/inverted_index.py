@@ -0,0 +1,317 @@
+# core/inverted_index.py
+"""
+On-disk inverted index of resumes (term -> postings of (doc id, tf, weight)).
+
+The index lives in a SQLite file next to the app (RESUME_INDEX_PATH) and is
+keyed by `documents.id`, so it can be rebuilt from the `documents` table at any
+time; insert_document and insert_documents_bulk keep it current through
+`index_documents`, and `sync_from_db` catches up on anything they missed.
+
+Scoring model: cosine between the JD weighted tf * idf (smoothed IDF of
+core.tf_idf, the JD counting as one extra document) and resumes weighted by
+raw tf (SMART lnc.ltc). Nothing stored on the resume side depends on the JD or
+on the rest of the corpus, so everything MaxScore needs is kept up to date on
+insert: each document's norm, each posting's normalized weight tf / norm and
+each term's df and largest weight (its score upper bound before the query
+weight). A search reads the term rows and postings of the JD's terms only.
+
+This is not rank_resumes' model (idf and the JD boost on the resume side, top
+MAX_FEATURES terms): those make every document norm depend on the JD and the
+whole corpus, which no incrementally maintained index can keep.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+import numpy as np
+
+from core.metrics import timed
+from core.tf_idf import idf_from_df
+from database.db_connect import db_connection
+from core.similarity import top_k_indices
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    "RESUME_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "resume_index.db"),
+)
+
+# SQLite caps bound parameters per statement; stay well below it
+_IN_CHUNK = 900
+# Resumes read per keyset-paginated query by sync_from_db
+SYNC_CHUNK = 1000
+
+# Bumped whenever the layout changes; an index in an older layout is dropped
+# (it is only derived data; sync_from_db / rebuild_from_db refill it)
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id    INTEGER PRIMARY KEY,
+    file_name TEXT,
+    norm      REAL NOT NULL            -- sqrt(sum of tf^2)
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term       TEXT PRIMARY KEY,
+    df         INTEGER NOT NULL,
+    max_weight REAL NOT NULL           -- largest posting weight of the term
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term   TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf     INTEGER NOT NULL,
+    weight REAL NOT NULL,              -- tf / norm of the document
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+INSERT OR IGNORE INTO meta (key, value) VALUES ('n_docs', 0);
+"""
+
+def _chunks(items, size=_IN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class InvertedIndex:
+    """SQLite-backed postings with per-term score upper bounds for top-k pruning."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with self._conn:
+                self._conn.executescript("DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS terms; "
+                                         "DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS meta;")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------------- Stats ----------------
+    @property
+    def n_docs(self):
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'n_docs'").fetchone()[0]
+
+    @property
+    def max_doc_id(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(doc_id), 0) FROM docs").fetchone()[0]
+
+    # ---------------- Writes ----------------
+    def add_document(self, doc_id, file_name, tokens):
+        """Index (or re-index) one resume from its cleaned tokens."""
+        self.add_documents([(doc_id, file_name, tokens)])
+
+    def add_documents(self, docs):
+        """Index (or re-index) (doc_id, file_name, tokens) rows in one transaction."""
+        with self._lock, self._conn:
+            for doc_id, file_name, tokens in docs:
+                self._remove(doc_id)
+                self._insert(doc_id, file_name, Counter(tokens))
+
+    def remove_document(self, doc_id):
+        with self._lock, self._conn:
+            self._remove(doc_id)
+
+    def _insert(self, doc_id, file_name, counts):
+        norm = math.sqrt(sum(c * c for c in counts.values()))
+        self._conn.execute("INSERT INTO docs (doc_id, file_name, norm) VALUES (?, ?, ?)", (doc_id, file_name, norm))
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'n_docs'")
+        rows = [(t, doc_id, c, c / norm) for t, c in counts.items()]
+        self._conn.executemany("INSERT INTO postings (term, doc_id, tf, weight) VALUES (?, ?, ?, ?)", rows)
+        self._conn.executemany("""
+            INSERT INTO terms (term, df, max_weight) VALUES (?, 1, ?)
+            ON CONFLICT(term) DO UPDATE SET df = df + 1, max_weight = MAX(max_weight, excluded.max_weight)
+        """, ((t, w) for t, _, _, w in rows))
+
+    def _remove(self, doc_id):
+        if self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,)).rowcount == 0:
+            return
+        self._conn.execute("UPDATE meta SET value = value - 1 WHERE key = 'n_docs'")
+        terms = [r[0] for r in self._conn.execute("SELECT term FROM postings WHERE doc_id = ?", (doc_id,))]
+        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+        # Only the removed document's terms need their df and bound recomputed
+        self._conn.executemany("""
+            UPDATE terms SET df = df - 1,
+                max_weight = (SELECT COALESCE(MAX(weight), 0) FROM postings p WHERE p.term = terms.term)
+            WHERE term = ?
+        """, ((t,) for t in terms))
+        self._conn.execute("DELETE FROM terms WHERE df <= 0")
+
+    def rebuild(self, fetch_rows):
+        """
+        Replace the whole index.
+
+        Args:
+            fetch_rows: callable returning an iterator of (doc_id, file_name, cleaned_text)
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM terms")
+            self._conn.execute("DELETE FROM docs")
+            self._conn.execute("UPDATE meta SET value = 0 WHERE key = 'n_docs'")
+            for doc_id, file_name, text in fetch_rows():
+                self._insert(doc_id, file_name, Counter((text or "").split()))
+
+    # ---------------- Search ----------------
+    def _postings(self, term, doc_ids=None):
+        """(doc ids, weights) of a term's postings, optionally only for `doc_ids`."""
+        if doc_ids is None:
+            rows = self._conn.execute("SELECT doc_id, weight FROM postings WHERE term = ?", (term,)).fetchall()
+        else:
+            rows = []
+            for chunk in _chunks(doc_ids):
+                marks = ",".join("?" * len(chunk))
+                rows.extend(self._conn.execute(
+                    f"SELECT doc_id, weight FROM postings WHERE term = ? AND doc_id IN ({marks})",
+                    [term] + chunk,
+                ))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        ids, weights = zip(*rows)
+        return np.array(ids, dtype=np.int64), np.array(weights, dtype=np.float64)
+
+    def _query_terms(self, q_counts):
+        """term -> (df, max_weight) for the query terms present in the index."""
+        terms = list(q_counts)
+        found = {}
+        for chunk in _chunks(terms):
+            marks = ",".join("?" * len(chunk))
+            found.update((t, (df, m)) for t, df, m in self._conn.execute(
+                f"SELECT term, df, max_weight FROM terms WHERE term IN ({marks})", chunk))
+        return found
+
+    def _file_names(self, doc_ids):
+        names = {}
+        for chunk in _chunks(doc_ids):
+            marks = ",".join("?" * len(chunk))
+            names.update(self._conn.execute(f"SELECT doc_id, file_name FROM docs WHERE doc_id IN ({marks})", chunk))
+        return names
+
+    def search(self, query_tokens, top_k=10, min_score=0.0):
+        """
+        Score only resumes sharing a term with the query, with MaxScore-style pruning.
+
+        Query terms are visited by decreasing score upper bound. Once the terms left
+        cannot lift an unseen document above the current k-th score (or min_score),
+        new candidates are no longer admitted and remaining postings are fetched only
+        for candidates that can still make the cut.
+
+        Returns:
+            List[Tuple[str, float]]: (file_name, score) best first
+        """
+        q_counts = Counter(query_tokens)
+        if not q_counts:
+            return []
+        with self._lock:
+            n_docs = self.n_docs
+            stats = self._query_terms(q_counts)
+            if not n_docs or not stats:
+                return []
+
+            # JD side: tf * idf over the index plus the JD, cosine-normalized over every JD term
+            terms = list(q_counts)
+            df = np.array([stats[t][0] if t in stats else 0 for t in terms], dtype=np.int64)
+            q_weight = np.array([q_counts[t] for t in terms], dtype=np.float64) * idf_from_df(df + 1, n_docs + 1)
+            q_weight /= np.linalg.norm(q_weight)
+            qw = {t: float(w) for t, w in zip(terms, q_weight.tolist()) if t in stats}
+            bounds = {t: qw[t] * stats[t][1] for t in qw}
+            order = sorted(bounds, key=bounds.get, reverse=True)
+
+            k = n_docs if top_k is None else max(0, top_k)
+            acc = {}   # doc id -> partial score
+            theta = min_score
+            remaining = sum(bounds.values())
+
+            for t in order:
+                remaining -= bounds[t]
+                if bounds[t] + remaining >= theta:
+                    ids, weights = self._postings(t)
+                else:
+                    # Non-essential term: only candidates that can still reach theta
+                    cand = [d for d, s in acc.items() if s + bounds[t] + remaining >= theta]
+                    if not cand:
+                        break
+                    if len(cand) * 4 < stats[t][0]:
+                        ids, weights = self._postings(t, cand)
+                    else:
+                        ids, weights = self._postings(t)
+                        keep = np.isin(ids, cand)
+                        ids, weights = ids[keep], weights[keep]
+                for d, c in zip(ids.tolist(), (qw[t] * weights).tolist()):
+                    acc[d] = acc.get(d, 0.0) + c
+
+                if top_k is not None and k and len(acc) >= k:
+                    kth = np.partition(np.fromiter(acc.values(), dtype=np.float64, count=len(acc)), -k)[-k]
+                    theta = max(theta, kth)
+
+            cand = np.array(sorted(d for d, s in acc.items() if s >= min_score), dtype=np.int64)
+            if not len(cand):
+                return []
+            best, scores = top_k_indices(np.array([acc[d] for d in cand.tolist()]), k)
+            ids = cand[best].tolist()
+            names = self._file_names(ids)
+            return [(names[d], float(s)) for d, s in zip(ids, scores.tolist())]
+
+
+# ---------------- Process-wide index ----------------
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = InvertedIndex(DEFAULT_INDEX_PATH)
+        return _index
+
+def index_documents(docs):
+    """Incremental hook used by database.db_connect inserts: (doc_id, file_name, cleaned_text) rows."""
+    get_index().add_documents([(doc_id, file_name, (text or "").split()) for doc_id, file_name, text in docs])
+
+def _fetch_resume_rows(after_id=0):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT id, file_name, cleaned_text FROM documents
+                WHERE type = 'resume' AND id > %s ORDER BY id
+            """, (after_id,))
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+
+@timed("index_update")
+def sync_from_db(index=None, chunk_size=SYNC_CHUNK):
+    """Index resumes in the `documents` table past the highest indexed id (e.g. inserted while the hook failed)."""
+    index = index or get_index()
+    batch, added = [], 0
+    for doc_id, file_name, text in _fetch_resume_rows(index.max_doc_id):
+        batch.append((doc_id, file_name, (text or "").split()))
+        if len(batch) >= chunk_size:
+            index.add_documents(batch)
+            added, batch = added + len(batch), []
+    if batch:
+        index.add_documents(batch)
+        added += len(batch)
+    return added
+
+def rebuild_from_db(index=None):
+    """Rebuild the index from every resume in the `documents` table."""
+    index = index or get_index()
+    index.rebuild(_fetch_resume_rows)
+    return index.n_docs
+
+
+if __name__ == "__main__":
+    print(f"Indexed {rebuild_from_db()} resumes into {DEFAULT_INDEX_PATH}")
@@ -0,0 +1,400 @@
+# core/jobs.py
+"""
+Asynchronous screening jobs.
+
+/process saves the uploads under JOB_DIR and enqueues a job in a small SQLite
+queue (JOB_DB_PATH); worker threads claim queued jobs, run
+core.screening.run_screening and write progress and partial rankings back to
+the job row. Batch jobs (kind 'batch', enqueue_batch_job) screen one resume
+set against several JDs with core.batch_screening.screen_many and keep their
+report on the job row. Workers can run inside the web process (JOB_WORKERS > 0)
+or separately with `python -m core.jobs`, against the same queue file. In the
+web process they start from the server entry point (`python app.py`, asgi.py's
+lifespan startup) or at the first enqueue, never on import; under a plain WSGI
+server, run `python -m core.jobs` beside it so jobs queued earlier are picked up.
+
+A running job's row is touched every JOB_HEARTBEAT_SECONDS while its worker is
+alive; only a job whose heartbeat is older than JOB_STALE_SECONDS (its worker
+died) is handed to another worker. Each claim carries a token, so a run that
+was superseded anyway stops at its next write and leaves the job directory to
+the new owner.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+from core import metrics
+from core.batch_screening import screen_many
+from core.screening import run_screening
+from database.db_connect import save_run
+
+_INSTANCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance")
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", os.path.join(_INSTANCE_DIR, "jobs.db"))
+JOB_DIR = os.environ.get("JOB_DIR", os.path.join(_INSTANCE_DIR, "jobs"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+# A running job whose heartbeat is older than this is assumed orphaned
+JOB_STALE_SECONDS = float(os.environ.get("JOB_STALE_SECONDS", "600"))
+JOB_HEARTBEAT_SECONDS = float(os.environ.get("JOB_HEARTBEAT_SECONDS", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id              TEXT PRIMARY KEY,
+    user_id         INTEGER,
+    status          TEXT NOT NULL,          -- queued | running | done | failed
+    created_at      REAL NOT NULL,
+    updated_at      REAL NOT NULL,
+    files_total     INTEGER NOT NULL,
+    files_extracted INTEGER NOT NULL DEFAULT 0,
+    files_scored    INTEGER NOT NULL DEFAULT 0,
+    kind            TEXT NOT NULL DEFAULT 'screen',  -- screen | batch
+    manifest        TEXT NOT NULL,          -- JSON: [[filename, path or null], ...] (batch: {"jds": ..., "resumes": ...})
+    results         TEXT,                   -- JSON: latest (partial or final) ranking (batch: the report)
+    errors          TEXT,                   -- JSON: per-file error messages
+    error           TEXT,                   -- job-level failure
+    run_stored      INTEGER NOT NULL DEFAULT 0,  -- 1: final ranking is in screening_run_results
+    claim           TEXT                    -- token of the worker run that owns a running job
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+_COLUMN_UPDATES = [
+    ("run_stored", "run_stored INTEGER NOT NULL DEFAULT 0"),
+    ("kind", "kind TEXT NOT NULL DEFAULT 'screen'"),
+    ("claim", "claim TEXT"),
+]
+
+def _connect():
+    os.makedirs(os.path.dirname(os.path.abspath(JOB_DB_PATH)), exist_ok=True)
+    conn = sqlite3.connect(JOB_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Queue files created before these columns existed
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+    for column, ddl in _COLUMN_UPDATES:
+        if column not in columns:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {ddl}")
+    return conn
+
+class JobReclaimed(Exception):
+    """The job was handed to another worker run (see _claim_next)."""
+
+@metrics.timed("job_update")
+def _update(job_id, claim=None, **fields):
+    """Update a job row (and its heartbeat); with `claim`, only while that run still owns it."""
+    fields["updated_at"] = time.time()
+    cols = ", ".join(f"{k} = ?" for k in fields)
+    conn = _connect()
+    try:
+        if claim is None:
+            conn.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+        elif conn.execute(f"UPDATE jobs SET {cols} WHERE id = ? AND claim = ?",
+                          (*fields.values(), job_id, claim)).rowcount == 0:
+            raise JobReclaimed(job_id)
+    finally:
+        conn.close()
+
+# ---------------- Enqueue / query ----------------
+def enqueue_job(user_id, jd_file, resume_files, is_pdf):
+    """
+    Persist the uploads to disk and queue a screening job.
+
+    Args:
+        jd_file: werkzeug FileStorage for the JD (already validated)
+        resume_files: list of FileStorage
+        is_pdf: callable(FileStorage) -> bool, the upload signature check
+
+    Returns:
+        str: job id
+    """
+    job_id = uuid.uuid4().hex
+    job_dir = os.path.join(JOB_DIR, job_id)
+    os.makedirs(job_dir)
+
+    jd_file.save(os.path.join(job_dir, "jd.pdf"))
+    manifest = _save_uploads(job_dir, "", resume_files, is_pdf)
+    _insert_job(job_id, user_id, "screen", len(manifest), manifest)
+    return job_id
+
+def enqueue_batch_job(user_id, jd_files, resume_files, is_pdf):
+    """
+    Persist the uploads and queue a multi-JD batch job (see core.batch_screening).
+
+    Args:
+        jd_files: list of FileStorage, one per job description
+        resume_files: list of FileStorage
+        is_pdf: callable(FileStorage) -> bool, the upload signature check
+
+    Returns:
+        str: job id
+    """
+    job_id = uuid.uuid4().hex
+    job_dir = os.path.join(JOB_DIR, job_id)
+    os.makedirs(job_dir)
+
+    manifest = {
+        "jds": _save_uploads(job_dir, "jd_", jd_files, is_pdf),
+        "resumes": _save_uploads(job_dir, "", resume_files, is_pdf),
+    }
+    _insert_job(job_id, user_id, "batch", len(manifest["resumes"]), manifest)
+    return job_id
+
+def _save_uploads(job_dir, prefix, files, is_pdf):
+    """Save each upload that passes is_pdf; returns [[filename, path or None], ...]."""
+    manifest = []
+    for i, f in enumerate(files):
+        filename = (f.filename or "Unknown").strip()
+        if not is_pdf(f):
+            manifest.append([filename, None])
+            continue
+        path = os.path.join(job_dir, f"{prefix}{i:05d}.pdf")
+        f.save(path)
+        manifest.append([filename, path])
+    return manifest
+
+def _insert_job(job_id, user_id, kind, files_total, manifest):
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute(
+            """
+            INSERT INTO jobs (id, user_id, status, kind, created_at, updated_at, files_total, manifest)
+            VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)
+            """,
+            (job_id, user_id, kind, now, now, files_total, json.dumps(manifest)),
+        )
+    finally:
+        conn.close()
+
+    if JOB_WORKERS > 0:
+        get_worker_pool().notify()
+
+def get_job(job_id):
+    """Job status, progress and latest ranking as a dict (None if unknown)."""
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "status": row["status"],
+        "kind": row["kind"],
+        "files_total": row["files_total"],
+        "files_extracted": row["files_extracted"],
+        "files_scored": row["files_scored"],
+        "results": json.loads(row["results"]) if row["results"] else [],
+        "errors": json.loads(row["errors"]) if row["errors"] else [],
+        "error": row["error"],
+        "run_stored": bool(row["run_stored"]),
+    }
+
+@metrics.register_collector
+def _queue_metrics():
+    conn = _connect()
+    try:
+        counts = dict(conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued', 'running') GROUP BY status"
+        ).fetchall())
+    finally:
+        conn.close()
+    lines = ["# HELP screening_jobs Screening jobs waiting or in progress.", "# TYPE screening_jobs gauge"]
+    lines += [f'screening_jobs{{status="{s}"}} {counts.get(s, 0)}' for s in ("queued", "running")]
+    return lines
+
+# ---------------- Workers ----------------
+def _claim_next():
+    """
+    Atomically move the oldest queued (or orphaned running) job to running.
+
+    Returns:
+        (job id, manifest, user id, kind, claim token), or None when there is nothing to run
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT id, manifest, user_id, kind FROM jobs
+            WHERE status = 'queued' OR (status = 'running' AND updated_at < ?)
+            ORDER BY created_at LIMIT 1
+            """,
+            (time.time() - JOB_STALE_SECONDS,),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        claim = uuid.uuid4().hex
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'running', claim = ?, updated_at = ?, files_extracted = 0, files_scored = 0
+            WHERE id = ?
+            """,
+            (claim, time.time(), row["id"]),
+        )
+        conn.execute("COMMIT")
+        return row["id"], json.loads(row["manifest"]), row["user_id"], row["kind"], claim
+    finally:
+        conn.close()
+
+class _Heartbeat:
+    """Touch a claimed job's row every `interval` seconds while its run is in progress."""
+
+    def __init__(self, job_id, claim, interval=JOB_HEARTBEAT_SECONDS):
+        self.job_id = job_id
+        self.claim = claim
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _beat(self):
+        while not self._stop.wait(self.interval):
+            try:
+                _update(self.job_id, self.claim)
+            except JobReclaimed:
+                return   # the run notices at its own next write
+            except Exception as err:
+                print(f"Heartbeat for job {self.job_id} failed:", err)
+
+def _mark_failed(job_id, claim, err):
+    """Record a failed run; False if the job already belongs to another run."""
+    try:
+        _update(job_id, claim, status="failed", error=str(err))
+        return True
+    except JobReclaimed:
+        return False
+
+def run_job(job_id, manifest, user_id=None, kind="screen", claim=None):
+    if kind == "batch":
+        return run_batch_job(job_id, manifest, claim)
+    job_dir = os.path.join(JOB_DIR, job_id)
+
+    def progress(files_extracted, files_scored, ranked):
+        fields = {"files_extracted": files_extracted}
+        if files_scored is not None:
+            fields["files_scored"] = files_scored
+        if ranked is not None:
+            fields["results"] = json.dumps(ranked)
+        _update(job_id, claim, **fields)
+
+    owner = True
+    try:
+        with metrics.trace("screening_job", job_id=job_id, files=len(manifest)), _Heartbeat(job_id, claim):
+            # Paths, not bytes: each extraction worker streams its own file from disk
+            payloads = ((filename, path) for filename, path in manifest)
+            results, errors = run_screening(os.path.join(job_dir, "jd.pdf"), payloads, progress=progress)
+            try:
+                # The finished ranking lives in MySQL (run id == job id) and is paged from there
+                save_run(job_id, user_id, results, errors)
+                stored = None
+            except Exception as err:
+                print("Could not store run, keeping results on the job:", err)
+                stored = json.dumps(results)
+            _update(job_id, claim, status="done", results=stored, errors=json.dumps(errors),
+                    run_stored=int(stored is None))
+    except JobReclaimed:
+        print(f"Screening job {job_id} was reclaimed by another worker; abandoning this run.")
+        owner = False
+    except Exception as err:
+        print(f"Screening job {job_id} failed:", err)
+        owner = _mark_failed(job_id, claim, err)
+    finally:
+        if owner:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+def run_batch_job(job_id, manifest, claim=None):
+    job_dir = os.path.join(JOB_DIR, job_id)
+    owner = True
+    try:
+        with metrics.trace("batch_job", job_id=job_id, jds=len(manifest["jds"]), files=len(manifest["resumes"])), \
+                _Heartbeat(job_id, claim):
+            errors = [f"Job description '{name}' is not a valid PDF and was skipped."
+                      for name, path in manifest["jds"] if path is None]
+            report = screen_many(
+                [(name, path) for name, path in manifest["jds"] if path is not None],
+                ((filename, path) for filename, path in manifest["resumes"]),
+                top_k=None,
+                progress=lambda n: _update(job_id, claim, files_extracted=n),
+            )
+            report["errors"] = errors + report["errors"]
+            _update(job_id, claim, status="done", files_scored=len(manifest["resumes"]),
+                    results=json.dumps(report), errors=json.dumps(report["errors"]))
+    except JobReclaimed:
+        print(f"Batch job {job_id} was reclaimed by another worker; abandoning this run.")
+        owner = False
+    except Exception as err:
+        print(f"Batch job {job_id} failed:", err)
+        owner = _mark_failed(job_id, claim, err)
+    finally:
+        if owner:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+
+class WorkerPool:
+    """Local worker threads polling the job queue (no external broker)."""
+
+    def __init__(self, workers=JOB_WORKERS, poll_interval=2.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"screening-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def notify(self):
+        self._wakeup.set()
+
+    def _loop(self):
+        while True:
+            claimed = _claim_next()
+            if claimed is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            run_job(*claimed)
+
+    def join(self):
+        for t in self._threads:
+            t.join()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_worker_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(JOB_WORKERS).start()
+        return _pool
+
+def start_workers():
+    """Start the in-process workers (JOB_WORKERS > 0) so queued jobs run without waiting for an enqueue."""
+    if JOB_WORKERS > 0:
+        get_worker_pool()
+
+
+if __name__ == "__main__":
+    # Standalone worker process: scale workers independently of the web tier
+    print(f"Screening workers: {max(1, JOB_WORKERS)} (queue: {JOB_DB_PATH})")
+    WorkerPool(max(1, JOB_WORKERS)).start().join()
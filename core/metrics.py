@@ -0,0 +1,295 @@
+# core/metrics.py
+"""
+Lightweight pipeline instrumentation: stage timers, counters, per-job
+breakdowns logged as one JSON line, and a Prometheus text rendering for
+/metrics.
+
+    with timed("tfidf"):
+        ...
+
+    @timed("extract_text")
+    def extract_text(...): ...
+
+    with trace("screening_job", job_id=job_id):
+        ...   # every timed() stage inside is summed into the logged breakdown
+
+Set METRICS_ENABLED=0 to turn it all off: timed() then costs one flag check.
+/metrics needs "Authorization: Bearer $METRICS_TOKEN" when METRICS_TOKEN is
+set (for a scraper), and a signed-in session otherwise.
+Metrics are per process; stages run in extraction worker processes are
+measured there with capture() and folded back into the parent with replay().
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Stage durations span sub-millisecond tokenizing to multi-second PDF batches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger("resume_screener.metrics")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+def _fmt(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus semantics)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, series in items:
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_label_str(labels + [('le', _fmt(bound))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(labels + [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{self.name}_sum{_label_str(labels)} {_fmt(series[-2])}")
+            lines.append(f"{self.name}_count{_label_str(labels)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set; `name` should end in _total."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_label_str(list(zip(self.label_names, label_values)))} {_fmt(value)}")
+        return lines
+
+
+# ---------------- Registry ----------------
+_registry = []
+_collectors = []   # callables returning extra exposition lines at scrape time
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+def register_collector(fn):
+    """fn() -> list of exposition lines, called on every /metrics scrape."""
+    _collectors.append(fn)
+    return fn
+
+STAGE_SECONDS = register(Histogram(
+    "screening_stage_seconds", "Time spent in each screening pipeline stage.", ("stage",)))
+STAGE_ERRORS = register(Counter(
+    "screening_stage_errors_total", "Stages that raised.", ("stage",)))
+EVENTS = register(Counter(
+    "screening_events_total", "Pipeline events (files by outcome, cache hits, ...).", ("event",)))
+
+def render_prometheus():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        try:
+            lines.extend(collect())
+        except Exception as err:
+            print("Metrics collector failed:", err)
+    return "\n".join(lines) + "\n"
+
+
+# ---------------- Per-job / per-request traces ----------------
+_current_trace = ContextVar("screening_trace", default=None)
+
+class Trace:
+    """Stage totals for one unit of work (a request or a screening job)."""
+
+    def __init__(self, name, **fields):
+        self.name = name
+        self.fields = fields
+        self.stages = {}   # stage -> [seconds, calls]
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, calls=1):
+        with self._lock:
+            entry = self.stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+
+    def count(self, event, amount=1):
+        with self._lock:
+            self.counts[event] = self.counts.get(event, 0) + amount
+
+    def as_dict(self, total_seconds):
+        return {
+            "event": self.name,
+            **self.fields,
+            "total_seconds": round(total_seconds, 6),
+            "stages": {s: {"seconds": round(v[0], 6), "calls": v[1]} for s, v in sorted(self.stages.items())},
+            "counts": dict(sorted(self.counts.items())),
+        }
+
+@contextmanager
+def trace(name, **fields):
+    """Collect timed() stages run inside the block and log them as one JSON line."""
+    if not METRICS_ENABLED:
+        yield None
+        return
+    t = Trace(name, **fields)
+    token = _current_trace.set(t)
+    start = time.perf_counter()
+    try:
+        yield t
+    except BaseException:
+        t.fields["status"] = "error"
+        raise
+    finally:
+        _current_trace.reset(token)
+        t.fields.setdefault("status", "ok")
+        logger.info(json.dumps(t.as_dict(time.perf_counter() - start), default=str))
+
+
+# ---------------- Recording ----------------
+def observe(stage, seconds):
+    """Record one already-measured stage duration (metrics + current trace)."""
+    STAGE_SECONDS.observe(seconds, stage)
+    t = _current_trace.get()
+    if t is not None:
+        t.add(stage, seconds)
+
+def count(event, amount=1):
+    if not METRICS_ENABLED:
+        return
+    EVENTS.inc(event, amount=amount)
+    t = _current_trace.get()
+    if t is not None:
+        t.count(event, amount)
+
+
+class timed:
+    """Context manager / decorator timing one stage."""
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        if METRICS_ENABLED:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if METRICS_ENABLED:
+            observe(self.stage, time.perf_counter() - self._start)
+            if exc_type is not None:
+                STAGE_ERRORS.inc(self.stage)
+        return False
+
+    def __call__(self, fn):
+        stage = self.stage
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                STAGE_ERRORS.inc(stage)
+                raise
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+
+
+# ---------------- Crossing process boundaries ----------------
+class _Capture(Trace):
+    """Keeps every call's duration ({stage: [seconds, ...]}), so the parent can observe each one."""
+
+    def add(self, stage, seconds, calls=1):
+        with self._lock:
+            self.stages.setdefault(stage, []).append(seconds)
+
+@contextmanager
+def capture():
+    """
+    In a worker process: collect stage timings into a plain dict
+    ({stage: [seconds of each call, ...]}) that can be sent back and replay()ed.
+    """
+    t = _Capture("capture")
+    token = _current_trace.set(t)
+    try:
+        yield t.stages
+    finally:
+        _current_trace.reset(token)
+
+def replay(stages):
+    """Fold timings captured in another process into this one, one histogram sample per call."""
+    if not METRICS_ENABLED or not stages:
+        return
+    t = _current_trace.get()
+    for stage, durations in stages.items():
+        for seconds in durations:
+            STAGE_SECONDS.observe(seconds, stage)
+        if t is not None:
+            t.add(stage, sum(durations), len(durations))
@@ -0,0 +1,149 @@
+# core/minhash.py
+"""
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+A document's signature is the MinHash of its word shingles (SHINGLE_SIZE-grams
+of cleaned_text tokens) under MINHASH_PERMUTATIONS hash functions; the fraction
+of equal positions between two signatures estimates the Jaccard similarity of
+their shingle sets. Signatures are cut into bands and each band is hashed into
+a bucket, so candidates for a new document are just the documents sharing a
+bucket with it (no pairwise comparison); candidates are then confirmed against
+NEAR_DUP_THRESHOLD with the signature estimate.
+
+Signatures and bucket keys are deterministic across processes, so they can be
+stored (see database.db_connect) and compared later. Bucket keys depend on the
+band layout, which follows from the threshold: documents stored under another
+NEAR_DUP_THRESHOLD are simply not found as candidates.
+"""
+
+import hashlib
+import os
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from core.metrics import timed
+
+# Estimated Jaccard similarity at or above which a resume is a near-duplicate (0 disables)
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.8"))
+MINHASH_PERMUTATIONS = int(os.environ.get("MINHASH_PERMUTATIONS", "128"))
+SHINGLE_SIZE = int(os.environ.get("SHINGLE_SIZE", "3"))
+
+# Universal hashing (a*x + b) mod p over 32-bit shingle hashes; a < 2^31 keeps a*x + b inside uint64
+_PRIME = np.uint64(4294967311)   # smallest prime above 2^32
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(1, 2 ** 31, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+# Shingles hashed per step (bounds the shingles x permutations temporary)
+_CHUNK = 2048
+
+
+def shingle_hashes(tokens, k=SHINGLE_SIZE):
+    """Distinct 32-bit hashes of the document's k-word shingles (one shingle if shorter than k)."""
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    if len(tokens) <= k:
+        grams = [" ".join(tokens)]
+    else:
+        grams = (" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1))
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+    return np.unique(hashes)
+
+@timed("minhash")
+def minhash_signature(tokens):
+    """
+    MinHash signature of a token list.
+
+    Returns:
+        np.ndarray[uint32] of MINHASH_PERMUTATIONS values, or None for an empty document
+    """
+    hashes = shingle_hashes(tokens)
+    if not len(hashes):
+        return None
+    signature = np.full(MINHASH_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(hashes), _CHUNK):
+        x = hashes[start:start + _CHUNK, None]
+        np.minimum(signature, ((x * _A + _B) % _PRIME).min(axis=0), out=signature)
+    return (signature & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+def jaccard_estimate(a, b):
+    return float(np.count_nonzero(a == b)) / len(a)
+
+def pack_signature(signature):
+    return signature.astype("<u4").tobytes()
+
+def unpack_signature(blob):
+    return np.frombuffer(blob, dtype="<u4").astype(np.uint32)
+
+
+# ---------------- LSH banding ----------------
+@lru_cache(maxsize=None)
+def lsh_params(threshold=NEAR_DUP_THRESHOLD, num_perm=MINHASH_PERMUTATIONS, fn_weight=0.7):
+    """
+    (bands, rows) minimizing the weighted false positive / false negative area
+    of the banding S-curve 1 - (1 - s^rows)^bands around `threshold`.
+    False negatives weigh more: false positives only cost a signature check.
+    """
+    below = np.linspace(0.0, threshold, 101)
+    above = np.linspace(threshold, 1.0, 101)
+    best, best_error = (1, num_perm), None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            fp = np.mean(1.0 - (1.0 - below ** rows) ** bands) * threshold
+            fn = np.mean((1.0 - above ** rows) ** bands) * (1.0 - threshold)
+            error = (1.0 - fn_weight) * fp + fn_weight * fn
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+def band_keys(signature, threshold=NEAR_DUP_THRESHOLD):
+    """[(band, bucket key as a signed 64-bit int), ...] of a signature."""
+    bands, rows = lsh_params(threshold, len(signature))
+    keys = []
+    for band in range(bands):
+        chunk = signature[band * rows:(band + 1) * rows].astype("<u4").tobytes()
+        digest = hashlib.blake2b(chunk, digest_size=8, person=b"lsh%d" % rows).digest()
+        keys.append((band, int.from_bytes(digest, "little", signed=True)))
+    return keys
+
+
+class LshIndex:
+    """In-memory LSH index: item -> signature, with bucket lookups for candidates."""
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets = defaultdict(list)   # (band, key) -> [item, ...]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def add(self, item, signature):
+        if signature is None:
+            return
+        self._signatures[item] = signature
+        for key in band_keys(signature, self.threshold):
+            self._buckets[key].append(item)
+
+    def query(self, signature):
+        """[(item, estimated Jaccard), ...] at or above the threshold, most similar first."""
+        if signature is None:
+            return []
+        candidates = {}
+        for key in band_keys(signature, self.threshold):
+            for item in self._buckets.get(key, ()):
+                candidates.setdefault(item, None)
+        matches = []
+        for item in candidates:
+            similarity = jaccard_estimate(signature, self._signatures[item])
+            if similarity >= self.threshold:
+                matches.append((item, similarity))
+        matches.sort(key=lambda m: -m[1])
+        return matches
+
+    def near_duplicate(self, signature):
+        """The most similar indexed item at or above the threshold, or None."""
+        matches = self.query(signature)
+        return matches[0][0] if matches else None
@@ -1,5 +1,8 @@
+import re as std_re
 import regex as re
 
+from core.metrics import timed
+
 # Compound replacements
 COMPOUND_TERMS = {
     'c++': 'cpp_language',
@@ -41,12 +44,6 @@ SYNONYM_MAP = {
     'troubleshot': 'solve'
 }
 
-def preserve_compounds(text):    
-    terms_sorted = sorted(COMPOUND_TERMS, key=len, reverse=True)
-    for term in terms_sorted:
-        text = re.sub(r'(?i)\b{}\b'.format(re.escape(term)), COMPOUND_TERMS[term], text)
-    return text
-
 stop_words = {
     'the', 'i', 'is', 'in', 'and', 'to', 'has', 'that', 'of', 'a', 'using',
     'an', 'on', 'for', 'with', 'it', 'as', 'this', 'by', 'be', 'are',
@@ -66,38 +63,30 @@ stop_words = {
     'enthusiast'
 }
 
+_TOKEN_RE = std_re.compile(r"[a-z0-9_]+")
+
 def tokenize(text: str):
-    allowed_chars = set("abcdefghijklmnopqrstuvwxyz0123456789_")
-    tokens, word = [], ''
-    for char in text:
-        if char in allowed_chars:
-            word += char
-        else:
-            if word:
-                tokens.append(word)
-                word = ''
-    if word:
-        tokens.append(word)
-    return tokens
+    # Runs of [a-z0-9_]; everything else separates tokens
+    return _TOKEN_RE.findall(text)
+
+LEMMA_EXCEPTIONS = {
+    "men": "man", "women": "woman", "children": "child",
+    "mice": "mouse", "geese": "goose", "feet": "foot", "teeth": "tooth",
+    "ran": "run", "went": "go", "studies": "study", "studied": "study",
+    "led": "lead", "wrote": "write", "written": "write",
+    "built": "build", "made": "make", "held": "hold",
+    "taught": "teach", "understood": "understand", "performed": "perform",
+    "developed": "develop", "analyzed": "analyze", "evaluated": "evaluate",
+    "managed": "manage", "created": "create", "designed": "design",
+    "implemented": "implement", "organized": "organize",
+    "collaborated": "collaborate", "conducted": "conduct",
+    "optimized": "optimize", "presented": "present",
+    "achieved": "achieve", "deployed": "deploy", "aspiring": "aspire"
+}
 
 def lemmatization(word: str):
-    exception = {
-        "men": "man", "women": "woman", "children": "child",
-        "mice": "mouse", "geese": "goose", "feet": "foot", "teeth": "tooth",
-        "ran": "run", "went": "go", "studies": "study", "studied": "study",
-        "led": "lead", "wrote": "write", "written": "write",
-        "built": "build", "made": "make", "held": "hold",
-        "taught": "teach", "understood": "understand", "performed": "perform",
-        "developed": "develop", "analyzed": "analyze", "evaluated": "evaluate",
-        "managed": "manage", "created": "create", "designed": "design",
-        "implemented": "implement", "organized": "organize",
-        "collaborated": "collaborate", "conducted": "conduct",
-        "optimized": "optimize", "presented": "present",
-        "achieved": "achieve", "deployed": "deploy", "aspiring": "aspire"
-    }
-
-    if word in exception:
-        return exception[word]
+    if word in LEMMA_EXCEPTIONS:
+        return LEMMA_EXCEPTIONS[word]
 
     if word.endswith("ies") and len(word) > 4:
         return word[:-3] + "y"
@@ -115,13 +104,110 @@ def lemmatization(word: str):
 def normalize_synonyms(word: str):
     return SYNONYM_MAP.get(word, word)
 
+
+class Preprocessor:
+    """
+    Compiled preprocess_text: one alternation regex for all compounds, a
+    precompiled tokenizer and a per-token memo of stop-word filtering +
+    lemmatization + synonym mapping. Built from the module tables, so rebuild
+    it (see reset_preprocessor) after changing COMPOUND_TERMS or the maps.
+    """
+
+    MEMO_MAX = 200_000
+
+    def __init__(self, compound_terms=None):
+        compound_terms = COMPOUND_TERMS if compound_terms is None else compound_terms
+        terms_sorted = sorted(compound_terms, key=len, reverse=True)
+        self._lookup = dict(compound_terms)
+        self._compound_re = re.compile("|".join(
+            r"\b{}\b".format(re.escape(t)) for t in terms_sorted
+        ), re.IGNORECASE)
+        # Case-insensitive exact forms, to resolve matches that are not literal keys
+        self._folded = [
+            (re.compile(re.escape(t), re.IGNORECASE), compound_terms[t]) for t in terms_sorted
+        ]
+        # Legacy order-dependent substitution, kept for the rare texts where it differs
+        self._sequential = [
+            (re.compile(r'(?i)\b{}\b'.format(re.escape(t))), compound_terms[t]) for t in terms_sorted
+        ]
+        self._risky = self._risky_adjacencies(terms_sorted, compound_terms)
+        self._memo = {}
+
+    @staticmethod
+    def _risky_adjacencies(terms_sorted, compound_terms):
+        """
+        Substituting terms one at a time can remove a word boundary that a term
+        handled later relies on (e.g. 'c++' -> 'cpp_language' right before 'c#').
+        Collect those adjacent pairs; texts containing one take the sequential path.
+        """
+        def is_word(ch):
+            return ch.isalnum() or ch == "_"
+
+        risky = set()
+        for i, a in enumerate(terms_sorted):
+            rep = compound_terms[a]
+            for b in terms_sorted[i + 1:]:
+                if not is_word(a[-1]) and is_word(rep[-1]) and is_word(b[0]):
+                    risky.add(a + b)
+                if not is_word(a[0]) and is_word(rep[0]) and is_word(b[-1]):
+                    risky.add(b + a)
+        return tuple(risky)
+
+    def preserve_compounds(self, text):
+        if self._risky and any(pair in text for pair in self._risky):
+            for pattern, replacement in self._sequential:
+                text = pattern.sub(replacement, text)
+            return text
+        return self._compound_re.sub(self._replace, text)
+
+    def _replace(self, match):
+        found = match.group()
+        replacement = self._lookup.get(found)
+        if replacement is None:
+            # Matched through case folding (e.g. 'ſ' for 's'): first term, in
+            # alternation order, spelling the same text wins
+            replacement = next(rep for pattern, rep in self._folded if pattern.fullmatch(found))
+        return replacement
+
+    def _normalize(self, token):
+        if token in stop_words:
+            return None
+        return normalize_synonyms(lemmatization(token))
+
+    def preprocess(self, text: str):
+        text = self.preserve_compounds(text.lower())
+        memo = self._memo
+        processed = []
+        for w in _TOKEN_RE.findall(text):
+            out = memo.get(w)
+            if out is None:
+                if len(memo) >= self.MEMO_MAX:
+                    memo.clear()
+                # "" marks a stop word
+                out = memo[w] = self._normalize(w) or ""
+            if out:
+                processed.append(out)
+        return " ".join(processed)
+
+    def preprocess_many(self, texts):
+        return [self.preprocess(t) for t in texts]
+
+
+_preprocessor = Preprocessor()
+
+def reset_preprocessor():
+    """Rebuild the shared Preprocessor after editing the module tables."""
+    global _preprocessor
+    _preprocessor = Preprocessor()
+
+def preserve_compounds(text):
+    return _preprocessor.preserve_compounds(text)
+
+@timed("preprocess")
 def preprocess_text(text: str):
-    text = text.lower()
-    text = preserve_compounds(text)
-    text = re.sub(r'[^a-z0-9_\s]', ' ', text)
-    tokens = tokenize(text)
-    processed = [
-        normalize_synonyms(lemmatization(w))
-        for w in tokens if w not in stop_words
-    ]
-    return " ".join(processed)
+    return _preprocessor.preprocess(text)
+
+@timed("preprocess")
+def preprocess_many(texts):
+    """Batch form of preprocess_text (shares one compiled Preprocessor)."""
+    return _preprocessor.preprocess_many(texts)
@@ -1,71 +1,246 @@
 # core/ranking.py
 
-from database.db_connect import get_connection
-from core.tf_idf import compute_tfidf
-from core.similarity import cosine_similarity
+import numpy as np
 
+from database.db_connect import db_connection, backfill_term_vectors, vocabulary_df
+from core.metrics import timed
+from core.tf_idf import weigh_counts, top_features
+from core.term_vectors import unpack_term_vector, vectors_to_id_matrix
+from core.idf_model import sync_pool_model
+from core.interner import term_interner
+from core.similarity import StreamingTopK
+
+
+# Resumes read per keyset-paginated query (and scored per step) by the streaming readers
+RANK_BATCH_SIZE = 4096
+
+def iter_cleaned_docs(chunk_size=RANK_BATCH_SIZE):
+    """
+    Stream all resumes (already cleaned and tokenized) in id order, paginated
+    on documents.id so each query returns at most `chunk_size` rows.
+    Yields:
+        List[Tuple[str, np.ndarray[int32]]]: (file name, interned token ids) per resume
+    """
+    after_id = 0
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            while True:
+                cursor.execute("""
+                    SELECT id, file_name, cleaned_text FROM documents
+                    WHERE type = 'resume' AND id > %s
+                    ORDER BY id LIMIT %s
+                """, (after_id, chunk_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                after_id = rows[-1][0]
+                yield [(file_name, term_interner.encode_text(text)) for _, file_name, text in rows]
+        finally:
+            cursor.close()
 
 def fetch_cleaned_docs():
     """
     Fetch latest job description and all resumes (already cleaned and tokenized).
+    Tokens come back as interned int32 id arrays (core.interner), which core.tf_idf
+    accepts in place of term lists. Use iter_cleaned_docs to process the pool
+    without holding all of it.
     Returns:
-        job_tokens: List[str]
-        resume_data: List[Tuple[str, List[str]]]
+        job_tokens: np.ndarray[int32]
+        resume_data: List[Tuple[str, np.ndarray[int32]]]
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    job_tokens = term_interner.encode(fetch_latest_job_tokens())
+    resume_data = [doc for chunk in iter_cleaned_docs() for doc in chunk]
+    return job_tokens, resume_data
 
-    # Fetch most recent job description
-    cursor.execute("SELECT cleaned_text FROM documents WHERE type = 'job' ORDER BY id DESC LIMIT 1")
-    jd = cursor.fetchone()
+
+def fetch_latest_job_tokens():
+    """Fetch only the most recent job description's cleaned tokens."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT cleaned_text FROM documents WHERE type = 'job' ORDER BY id DESC LIMIT 1")
+        jd = cursor.fetchone()
+        cursor.close()
     if not jd:
         raise Exception("No job description found.")
-    job_tokens = jd[0].split()
+    return jd[0].split()
+
+
+def rank_resumes_indexed(min_score_threshold: float = 0.2, top_k: int = 10, index=None):
+    """
+    Rank resumes through the persistent inverted index (core.inverted_index,
+    kept current by the insert path). Only resumes sharing a term with the JD
+    are scored, and top-k pruning skips candidates that cannot make the cut.
+    Scores use the index's model (tf-idf JD against raw-tf resumes), so they
+    differ somewhat from rank_resumes.
 
-    # Fetch all resumes
-    cursor.execute("SELECT file_name, cleaned_text FROM documents WHERE type = 'resume'")
-    resumes = cursor.fetchall()
+    Returns:
+        List[Tuple[str, float]]: Sorted list of (filename, similarity score)
+    """
+    from core.inverted_index import get_index
 
-    resume_data = [(file_name, text.split()) for file_name, text in resumes]
+    index = index or get_index()
+    job_tokens = fetch_latest_job_tokens()
+    return [
+        (file_name, round(score, 2))
+        for file_name, score in index.search(job_tokens, top_k=top_k, min_score=min_score_threshold)
+    ]
 
-    cursor.close()
-    conn.close()
 
-    return job_tokens, resume_data
+def _term_vector_chunks(cursor, after_id, max_id, chunk_size):
+    """[(doc id, file name, vector)] chunks of resumes with after_id < id <= max_id, keyset-paginated on id."""
+    while True:
+        cursor.execute("""
+            SELECT d.id, d.file_name, v.vector FROM documents d JOIN term_vectors v ON v.doc_id = d.id
+            WHERE d.type = 'resume' AND d.id > %s AND d.id <= %s
+            ORDER BY d.id LIMIT %s
+        """, (after_id, max_id, chunk_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        yield [(doc_id, name, bytes(vec)) for doc_id, name, vec in rows]
 
+def _pool_head(cursor):
+    """Latest JD vector, and the pool's highest resume id, resume count and vocabulary size."""
+    cursor.execute("""
+        SELECT v.vector FROM documents d JOIN term_vectors v ON v.doc_id = d.id
+        WHERE d.type = 'job' ORDER BY d.id DESC LIMIT 1
+    """)
+    jd = cursor.fetchone()
+    if not jd:
+        raise Exception("No job description found.")
+    cursor.execute("""
+        SELECT COALESCE(MAX(d.id), 0), COUNT(*) FROM documents d JOIN term_vectors v ON v.doc_id = d.id
+        WHERE d.type = 'resume'
+    """)
+    max_id, total = cursor.fetchone()
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM vocabulary")
+    (max_term,) = cursor.fetchone()
+    return bytes(jd[0]), int(max_id), int(total), int(max_term) + 1
 
-def rank_resumes(min_score_threshold: float = 0.2):
+def rank_term_vectors(jd_vector, read_after, total, n_terms, min_score_threshold=0.2, top_k=None, idf_model=None,
+                      recount=None):
     """
-    Rank all resumes against the job description based on cosine similarity.
-    Filters out resumes with similarity score < min_score_threshold.
+    Streaming ranking pipeline over a resume pool read in chunks.
 
-    Returns:
-        List[Tuple[str, float]]: Sorted list of (filename, similarity score)
+    Args:
+        jd_vector: packed JD term vector
+        read_after: after_id -> iterable of [(doc id, file name, vector)] chunks
+            for the resumes with id > after_id, in id order (re-read once per pass)
+        total: number of resumes in the pool
+        n_terms: upper bound on vocabulary ids (column space)
+        idf_model: pool model to bring forward (default: the process-wide one)
+        recount: () -> (df, n_docs, watermark) of the pool, to rebuild an out-of-step
+            model from (see sync_pool_model)
+
+    Passes:
+        1. document frequencies: only resumes the IdfModel has not seen are read
+        2. global term importance for the top-MAX_FEATURES selection
+        3. scoring into a StreamingTopK heap, yielding best-so-far after each chunk
+
+    Memory is bounded by the chunk size, the vocabulary and top_k, and the
+    rankings equal scoring the whole pool as one matrix. Ties at the
+    MAX_FEATURES cut keep first-seen term order, as in compute_tfidf_matrix;
+    term vectors do not keep token positions, so terms first seen in the same
+    document follow vocabulary id order there.
+
+    Yields:
+        List[Tuple[str, float]]: (filename, similarity score) best first
     """
-    job_tokens, resume_data = fetch_cleaned_docs()
+    # Pass 1: fold new resumes into the pool document frequencies
+    with timed("idf"):
+        idf_model = sync_pool_model(
+            lambda after: ((doc_id, vec) for chunk in read_after(after) for doc_id, _, vec in chunk),
+            terms_of=lambda vec: unpack_term_vector(vec)[0].tolist(),
+            model=idf_model,
+            total=total,
+            recount=recount,
+        )
 
-    # Combine all docs (JD + resumes) for TF-IDF vectorization
-    all_docs = [job_tokens] + [tokens for _, tokens in resume_data]
+    # JD + resumes, as TF-IDF over the same corpus as before: the JD is one more document
+    jd_ids = unpack_term_vector(jd_vector)[0]
+    n_terms = max(n_terms, int(jd_ids.max()) + 1 if len(jd_ids) else 0)
+    jd_cols = np.zeros(n_terms, dtype=bool)
+    jd_cols[jd_ids] = True
+    idf = idf_model.dense_idf(n_terms, extra_df=jd_cols.astype(np.int64), extra_docs=1)
+    jd_row = weigh_counts(vectors_to_id_matrix([jd_vector], n_terms), idf)
 
-    tfidf_vectors, all_terms = compute_tfidf(
-        all_docs,
-        boost_terms=set(job_tokens),
-        boost_factor=2.0
-    )
+    # Pass 2: importance summed in document order (np.add.at, like the one-matrix bincount),
+    # and the first document each term appears in (JD = 0) for first-seen column order
+    with timed("tfidf"):
+        importance = np.zeros(n_terms)
+        first_doc = np.where(jd_cols, 0, np.iinfo(np.int64).max)
+        np.add.at(importance, jd_row.indices, jd_row.data)
+        row = 1
+        for chunk in read_after(0):
+            weights = weigh_counts(vectors_to_id_matrix([vec for _, _, vec in chunk], n_terms), idf,
+                                   boost_cols=jd_cols, first_boosted_row=0)
+            np.add.at(importance, weights.indices, weights.data)
+            np.minimum.at(first_doc, weights.indices, np.repeat(
+                np.arange(row, row + len(chunk), dtype=np.int64), np.diff(weights.indptr)))
+            row += len(chunk)
+        present_ids = np.flatnonzero(first_doc < np.iinfo(np.int64).max)
+        # Columns in first-seen order, so MAX_FEATURES ties break as in compute_tfidf_matrix
+        present_ids = present_ids[np.argsort(first_doc[present_ids], kind="stable")]
+        selected = present_ids[top_features(importance[present_ids])]
 
-    job_vec = tfidf_vectors[0]
-    resume_vecs = tfidf_vectors[1:]
+    # Pass 3: score chunk by chunk into the top-k heap
+    ranker = StreamingTopK(jd_row[:, selected].tocsr(), k=top_k, min_score=min_score_threshold)
+    for chunk in read_after(0):
+        with timed("tfidf"):
+            weights = weigh_counts(vectors_to_id_matrix([vec for _, _, vec in chunk], n_terms), idf,
+                                   boost_cols=jd_cols, first_boosted_row=0)
+        with timed("cosine"):
+            ranker.feed(weights[:, selected].tocsr(), [name for _, name, _ in chunk])
+        yield [(name, round(score, 2)) for name, score in ranker.results()]
 
-    scored = []
-    for i, (file_name, _) in enumerate(resume_data):
-     score = cosine_similarity(job_vec, resume_vecs[i], all_terms)
-     if score >= min_score_threshold:
-        scored.append((file_name, round(score, 2)))  
+def rank_resumes_stream(min_score_threshold: float = 0.2, top_k: int = None, batch_size: int = RANK_BATCH_SIZE):
+    """
+    Rank resumes against the latest job description, yielding the best-so-far
+    list after each batch of `batch_size` resumes. A bounded heap keeps the
+    top_k, and resumes whose score upper bound cannot reach the current k-th
+    score (or min_score_threshold) are never scored exactly.
 
-    # Sort by similarity score in descending order
-    scored.sort(key=lambda x: x[1], reverse=True)
+    Term counts come from the stored term vectors and IDF from the resume pool's
+    IdfModel (core.idf_model), which only folds in resumes it has not seen yet;
+    no cleaned_text is re-tokenized. The pool is read in keyset-paginated
+    chunks from one consistent snapshot (see rank_term_vectors), so memory does
+    not grow with the number of resumes.
 
-    return scored
+    Yields:
+        List[Tuple[str, float]]: (filename, similarity score) best first
+    """
+    backfill_term_vectors()
+    with db_connection() as conn:
+        conn.start_transaction(consistent_snapshot=True, readonly=True)
+        cursor = conn.cursor()
+        try:
+            jd_vector, max_id, total, n_terms = _pool_head(cursor)
+            yield from rank_term_vectors(
+                jd_vector,
+                lambda after: _term_vector_chunks(cursor, after, max_id, batch_size),
+                total, n_terms, min_score_threshold, top_k,
+                recount=lambda: (vocabulary_df(cursor), total, max_id),
+            )
+        finally:
+            cursor.close()
+            conn.commit()
+
+
+def rank_resumes(min_score_threshold: float = 0.2, top_k: int = None):
+    """
+    Rank all resumes against the job description based on cosine similarity.
+    Filters out resumes with similarity score < min_score_threshold.
+    If top_k is given, only the best top_k resumes are returned (bounded heap, no full sort).
+
+    Returns:
+        List[Tuple[str, float]]: Sorted list of (filename, similarity score)
+    """
+    ranked = []
+    for ranked in rank_resumes_stream(min_score_threshold, top_k):
+        pass
+    return ranked
 
 
 # ------- TEST-FRIENDLY WRAPPER -------
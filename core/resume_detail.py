@@ -0,0 +1,115 @@
+# core/resume_detail.py
+"""
+In-process LRU of resume details for /api/resume_detail.
+
+Recruiters click through many candidates of the same run, often more than
+once, so the latest document per file name (text plus the contact columns
+extracted at ingest) is kept in an LRU bounded by approximate size. Entries
+expire after DETAIL_CACHE_TTL seconds so a resume re-uploaded under the same
+name (by this or another process) shows up, and inserts in this process drop
+the name right away (invalidate()).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from core.metrics import count, register_collector
+from database.db_connect import get_resume_detail
+
+DETAIL_CACHE_MAX_BYTES = int(os.environ.get("DETAIL_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+DETAIL_CACHE_TTL = float(os.environ.get("DETAIL_CACHE_TTL", "60"))
+
+
+class ResumeDetailCache:
+    """file_name -> detail dict, LRU bounded by total text size, entries expire after `ttl`."""
+
+    def __init__(self, max_bytes=DETAIL_CACHE_MAX_BYTES, ttl=DETAIL_CACHE_TTL, loader=get_resume_detail):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.loader = loader
+        self._entries = OrderedDict()   # file_name -> (expires_at, size, detail)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry_size(detail):
+        return len(detail["text"]) + 300   # + rough per-entry overhead
+
+    def get(self, file_name):
+        """The resume's detail dict (None if no such resume)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(file_name)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(file_name)
+                count("resume_detail_cache_hit")
+                return entry[2]
+
+        count("resume_detail_cache_miss")
+        row = self.loader(file_name)
+        if not row:
+            return None
+        detail = {
+            "id": row["id"],
+            "filename": row["file_name"],
+            "email": row["email"] or "",
+            "phone": row["phone"] or "",
+            "linkedin": row["linkedin"] or "",
+            "text": row["raw_text"] or "",
+            "etag": f"{row['hashed_text'][:16]}-{row['id']}",
+            "last_modified": row.get("created_at"),
+        }
+        self.put(file_name, detail, now)
+        return detail
+
+    def put(self, file_name, detail, now=None):
+        size = self._entry_size(detail)
+        if size > self.max_bytes:
+            return
+        expires = (time.monotonic() if now is None else now) + self.ttl
+        with self._lock:
+            self._drop(file_name)
+            self._entries[file_name] = (expires, size, detail)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, old_size, _) = self._entries.popitem(last=False)
+                self._size -= old_size
+
+    def invalidate(self, file_name):
+        with self._lock:
+            self._drop(file_name)
+
+    def _drop(self, file_name):
+        old = self._entries.pop(file_name, None)
+        if old is not None:
+            self._size -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+detail_cache = ResumeDetailCache()
+
+def text_window(text, offset=0, limit=None):
+    """
+    The requested slice of a resume's text.
+
+    Returns:
+        (text, truncated): truncated is True when text continues past the slice
+    """
+    offset = max(0, offset)
+    if limit is None:
+        return text[offset:], False
+    end = offset + max(0, limit)
+    return text[offset:end], end < len(text)
+
+@register_collector
+def _detail_cache_metrics():
+    return [
+        "# TYPE resume_detail_cache_entries gauge", f"resume_detail_cache_entries {len(detail_cache._entries)}",
+        "# TYPE resume_detail_cache_bytes gauge", f"resume_detail_cache_bytes {detail_cache._size}",
+    ]
@@ -0,0 +1,305 @@
+# core/score_cache.py
+"""
+Cross-run cache of /process similarity scores.
+
+A resume's score depends on the JD, the boost configuration, the resume itself
+and the IDF (and selected feature columns) of the run's corpus: the JD plus the
+run's unique resumes. Scores are cached per (JD raw_hash, boost key, resume
+raw_hash), stamped with the version of the scoring model they were computed
+with. Each (JD, boost) context keeps that model (ModelSnapshot): the IDF,
+vocabulary and feature selection of the corpus it was built from and the
+weighted JD row, plus the document frequencies and term mass of every resume
+folded in since.
+
+A run whose corpus contains the snapshot's resumes only vectorizes the resumes
+without a cached score, against the snapshot's model: no corpus-wide count
+matrix is built. With SCORE_CACHE_TOLERANCE = 0 (exact mode, the default) that
+only happens for the very same corpus, so cached scores always equal a fresh
+run's. A positive tolerance (opt-in) trades that for speed: the new resumes are
+folded into the snapshot's frequencies first, and the snapshot is kept while no
+term of its vocabulary moved its IDF by more than that relative tolerance and
+the feature selection only changed by terms it never saw. Past the tolerance
+(or when the run dropped resumes the snapshot counted) the whole corpus is
+scored again and becomes the new snapshot; drift is always measured from the
+snapshot's model, so it does not accumulate over runs.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from core.metrics import count, register_collector, timed
+from core.similarity import cosine_similarity_batch
+from core.tf_idf import MAX_FEATURES, count_matrix, idf_from_df, idf_vector, tfidf_from_counts, top_features
+
+# Cached (context, resume) scores; 0 disables the cache
+SCORE_CACHE_MAX_ENTRIES = int(os.environ.get("SCORE_CACHE_MAX_ENTRIES", "200000"))
+SCORE_CACHE_TTL = float(os.environ.get("SCORE_CACHE_TTL", "3600"))
+# Largest relative IDF change under which cached scores are reused (0 = exact mode).
+# Opt-in: above 0, a run's scores can depend on what earlier runs cached
+SCORE_CACHE_TOLERANCE = float(os.environ.get("SCORE_CACHE_TOLERANCE", "0"))
+# (JD, boost) contexts whose model snapshot is kept
+SCORE_CACHE_CONTEXTS = int(os.environ.get("SCORE_CACHE_CONTEXTS", "16"))
+
+
+def _term_mass(counts):
+    """Per column of a count matrix: document frequency and sum over rows of tf / row length."""
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    mass = np.bincount(counts.indices, weights=counts.data / totals[rows], minlength=counts.shape[1])
+    return df, mass
+
+
+class ModelSnapshot:
+    """One context's scoring model, and the statistics of the corpus it now stands for."""
+
+    def __init__(self, version, terms, counts, idf, boost_terms, boost_factor):
+        self.version = version
+        self.lock = threading.Lock()
+        self.boost_terms = frozenset(boost_terms or ())
+        self.boost_factor = boost_factor
+        # Corpus statistics: resumes are folded in, new terms appended past the model's columns
+        self.terms = list(terms)
+        self.vocab = {t: j for j, t in enumerate(terms)}
+        self.boosted = np.array([t in self.boost_terms for t in terms], dtype=bool)
+        self.hashes = set()
+        self.n_docs = counts.shape[0]
+        self.df, self.mass = _term_mass(counts[1:])
+        jd = slice(counts.indptr[0], counts.indptr[1])
+        jd_cols, jd_counts = counts.indices[jd], counts.data[jd]
+        self.df[jd_cols] += 1
+        self.jd_tf = np.zeros(len(terms))
+        self.jd_tf[jd_cols] = jd_counts / jd_counts.sum()
+        # Model: frozen for the snapshot's lifetime (set by build)
+        self.n_model = len(terms)
+        self.idf = idf
+        self.selected = None
+        self.position = None
+        self.jd_row = None
+
+    @classmethod
+    def build(cls, version, resume_hashes, terms, counts, boost_terms, boost_factor):
+        """Snapshot of a whole corpus (JD in row 0), and its TF-IDF matrix over the selected columns."""
+        idf = idf_vector(counts)
+        snapshot = cls(version, terms, counts, idf, boost_terms, boost_factor)
+        snapshot.hashes.update(resume_hashes)
+        matrix, top_cols = tfidf_from_counts(counts, idf, snapshot.boosted, boost_factor)
+        snapshot.selected = top_cols
+        snapshot.position = np.full(len(terms), -1, dtype=np.int64)   # model column -> selected position
+        snapshot.position[top_cols] = np.arange(len(top_cols))
+        snapshot.jd_row = matrix[0]
+        return snapshot, matrix
+
+    def columns(self, terms):
+        """Snapshot columns for `terms`, numbering unseen ones after the vocabulary; also returns those."""
+        cols = np.empty(len(terms), dtype=np.int64)
+        unseen = []
+        for i, term in enumerate(terms):
+            j = self.vocab.get(term)
+            if j is None:
+                j = len(self.terms) + len(unseen)
+                unseen.append(term)
+            cols[i] = j
+        return cols, unseen
+
+    def extended(self, cols, unseen, counts):
+        """(df, mass, n_docs, boosted) of the corpus with the resumes of `counts` folded in."""
+        df_add, mass_add = _term_mass(counts)
+        size = len(self.terms) + len(unseen)
+        df = np.zeros(size, dtype=np.int64)
+        df[:len(self.df)] = self.df
+        df[cols] += df_add
+        mass = np.zeros(size)
+        mass[:len(self.mass)] = self.mass
+        mass[cols] += mass_add
+        boosted = np.concatenate([self.boosted, np.array([t in self.boost_terms for t in unseen], dtype=bool)])
+        return df, mass, self.n_docs + counts.shape[0], boosted
+
+    def drift(self, df, mass, n_docs, boosted):
+        """
+        Largest relative IDF change over the model's terms for the given corpus
+        statistics, or inf when the feature selection gained or lost one of them.
+        """
+        idf = idf_from_df(df, n_docs)
+        importance = mass * idf * np.where(boosted, self.boost_factor, 1.0)
+        importance[:self.n_model] += self.jd_tf * idf[:self.n_model]
+        moved = np.setxor1d(top_features(importance), self.selected)
+        if (moved < self.n_model).any():
+            return math.inf
+        return float(np.max(np.abs(idf[:self.n_model] - self.idf) / self.idf))
+
+    def fold(self, resume_hashes, unseen, stats):
+        """Record resumes whose statistics `stats` (from extended) now include."""
+        for term in unseen:
+            self.vocab[term] = len(self.terms)
+            self.terms.append(term)
+        self.df, self.mass, self.n_docs, self.boosted = stats
+        self.hashes.update(resume_hashes)
+
+    def vectorize(self, counts, cols):
+        """Resume count rows (columns mapped by `cols`) as TF-IDF rows over the model's selected columns."""
+        rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        totals = np.asarray(counts.sum(axis=1)).ravel()
+        model_cols = cols[counts.indices]
+        known = model_cols < self.n_model
+        position = np.full(len(model_cols), -1, dtype=np.int64)
+        position[known] = self.position[model_cols[known]]
+        keep = position >= 0
+        rows, model_cols = rows[keep], model_cols[keep]
+        # tf * idf, then the boost, in weigh_counts' operation order
+        data = (counts.data[keep] / totals[rows]) * self.idf[model_cols]
+        data[self.boosted[model_cols]] *= self.boost_factor
+        indptr = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=counts.shape[0]), out=indptr[1:])
+        matrix = csr_matrix((data, position[keep], indptr), shape=(counts.shape[0], len(self.selected)))
+        matrix.sort_indices()
+        return matrix
+
+
+def corpus_version(jd_hash, resume_hashes):
+    """Fingerprint of a run's corpus: IDF and feature selection follow from it (and its order)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(jd_hash.encode())
+    for raw_hash in resume_hashes:
+        digest.update(b"\n" + raw_hash.encode())
+    return digest.hexdigest()
+
+def boost_key(boost_terms, boost_factor):
+    terms = "\n".join(sorted(boost_terms or ()))
+    return f"{boost_factor}:{MAX_FEATURES}:{hashlib.blake2b(terms.encode(), digest_size=16).hexdigest()}"
+
+
+class ScoreCache:
+    """(context, resume raw_hash) -> score, LRU-bounded, entries expire after `ttl`."""
+
+    def __init__(self, max_entries=SCORE_CACHE_MAX_ENTRIES, ttl=SCORE_CACHE_TTL,
+                 tolerance=SCORE_CACHE_TOLERANCE, max_contexts=SCORE_CACHE_CONTEXTS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.tolerance = tolerance
+        self.max_contexts = max_contexts
+        self._entries = OrderedDict()    # (context, raw_hash) -> (expires_at, version, score)
+        self._contexts = OrderedDict()   # context -> ModelSnapshot
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def scores(self, jd_hash, jd_tokens, resume_hashes, resume_docs, boost_terms=None, boost_factor=1.5):
+        """
+        Cosine scores of the resumes against the JD, as compute_tfidf_matrix +
+        cosine_similarity_batch over [jd] + resumes, reusing cached scores.
+
+        Args:
+            jd_hash: JD raw_hash
+            resume_hashes: raw_hash per resume (unique within the run)
+            resume_docs: tokenized resumes (term lists or token-id arrays)
+
+        Returns:
+            np.ndarray: one score per resume
+        """
+        context = (jd_hash, boost_key(boost_terms, boost_factor))
+        version = corpus_version(jd_hash, resume_hashes)
+        with self._lock:
+            snapshot = self._contexts.get(context)
+            if snapshot is not None:
+                self._contexts.move_to_end(context)
+        if snapshot is not None:
+            with snapshot.lock:
+                scores = self._from_snapshot(snapshot, context, version, resume_hashes, resume_docs)
+            if scores is not None:
+                return scores
+
+        # No usable snapshot: score the whole corpus, which becomes the context's snapshot
+        n = len(resume_docs)
+        with timed("tfidf"):
+            counts, _, terms = count_matrix([jd_tokens] + list(resume_docs))
+            if not terms:
+                return np.zeros(n)
+            snapshot, matrix = ModelSnapshot.build(version, resume_hashes, terms, counts, boost_terms, boost_factor)
+        with timed("cosine"):
+            scores = cosine_similarity_batch(matrix[0], matrix[1:])
+        count("score_cache_miss", n)
+        with self._lock:
+            self._contexts[context] = snapshot
+            self._contexts.move_to_end(context)
+            while len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+        self._store(context, snapshot.version, resume_hashes, range(n), scores)
+        return scores
+
+    def _from_snapshot(self, snapshot, context, version, resume_hashes, resume_docs):
+        """
+        Cached scores plus the uncached resumes scored with the snapshot's model,
+        or None when the run's corpus is not within tolerance of the snapshot.
+        """
+        if self.tolerance <= 0 and version != snapshot.version:
+            return None
+        if not snapshot.hashes.issubset(resume_hashes):
+            return None   # resumes left the corpus; their frequencies cannot be taken back out
+
+        n = len(resume_docs)
+        scores = np.empty(n)
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for i, raw_hash in enumerate(resume_hashes):
+                entry = self._entries.get((context, raw_hash))
+                if entry is not None and entry[0] > now and entry[1] == snapshot.version:
+                    self._entries.move_to_end((context, raw_hash))
+                    scores[i] = entry[2]
+                else:
+                    missing.append(i)
+        if not missing:
+            count("score_cache_hit", n)
+            return scores
+
+        with timed("tfidf"):
+            counts, _, terms = count_matrix([resume_docs[i] for i in missing])
+            cols, unseen = snapshot.columns(terms)
+            fresh = [k for k, i in enumerate(missing) if resume_hashes[i] not in snapshot.hashes]
+            if fresh:
+                stats = snapshot.extended(cols, unseen, counts[fresh])
+                if snapshot.drift(*stats) > self.tolerance:
+                    return None
+                snapshot.fold([resume_hashes[missing[k]] for k in fresh], unseen, stats)
+            matrix = snapshot.vectorize(counts, cols)
+        with timed("cosine"):
+            scores[missing] = cosine_similarity_batch(snapshot.jd_row, matrix)
+        count("score_cache_hit", n - len(missing))
+        count("score_cache_miss", len(missing))
+        self._store(context, snapshot.version, resume_hashes, missing, scores)
+        return scores
+
+    def _store(self, context, version, resume_hashes, indices, scores):
+        with self._lock:
+            expires = time.monotonic() + self.ttl
+            for i in indices:
+                key = (context, resume_hashes[i])
+                self._entries.pop(key, None)
+                self._entries[key] = (expires, version, float(scores[i]))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._contexts.clear()
+
+
+score_cache = ScoreCache()
+
+@register_collector
+def _score_cache_metrics():
+    return [
+        "# TYPE score_cache_entries gauge", f"score_cache_entries {len(score_cache._entries)}",
+        "# TYPE score_cache_contexts gauge", f"score_cache_contexts {len(score_cache._contexts)}",
+    ]
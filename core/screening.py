@@ -0,0 +1,256 @@
+# core/screening.py
+"""
+The screening pipeline behind /process: extract -> de-dupe -> persist -> score -> rank.
+Runs outside the request (see core.jobs) and reports progress through a callback.
+"""
+
+from core import metrics
+from core.extract import extract_email, PdfTooLarge
+from core.preprocess import preprocess_text
+from core.extract_pool import extract_many, extract_cached, document_row, ExtractionTimeout
+from core.tf_idf import compute_tfidf_matrix
+from core.interner import term_interner
+from core.similarity import cosine_similarity_batch, StreamingTopK
+from core.sections import JD_HEADINGS_FOR_BOOST, segment
+from core.minhash import NEAR_DUP_THRESHOLD, LshIndex, minhash_signature
+from core.score_cache import score_cache
+from database.db_connect import insert_document, insert_documents_bulk
+
+# First partial ranking after N unique resumes; the interval then doubles, so
+# all partial rankings together cost at most about twice the final one
+PARTIAL_EVERY = 25
+# Partial rankings only carry the best N rows (the final ranking has every row)
+PARTIAL_TOP_K = 100
+
+def collect_jd_priority_terms(jd_raw_text: str):
+    """Grab content under the specified JD headings and return preprocessed tokens."""
+    sections = segment(jd_raw_text)   # one scan for all headings
+    picked_sections = [sec for sec in (sections.section(h) for h in JD_HEADINGS_FOR_BOOST) if sec]
+    if not picked_sections:
+        return set()
+    priority_clean = preprocess_text("\n".join(picked_sections))
+    return set(priority_clean.split())
+
+def rejection_message(filename, extracted, err):
+    """The per-file error for an extract_many result, or None if the resume is usable."""
+    if isinstance(err, PdfTooLarge):
+        return f"'{filename}' is too large to process ({err}) and was skipped."
+    if isinstance(err, ExtractionTimeout):
+        return f"'{filename}' took too long to read ({err}) and was skipped."
+    if err is not None:
+        return f"'{filename}' could not be read and was skipped."
+    if extracted is None:
+        return f"'{filename}' is not a valid PDF and was skipped."
+    return None
+
+def truncation_message(filename, extracted):
+    """The per-file note for a usable extraction that stopped early, or None."""
+    if extracted is not None and extracted.truncated:
+        return f"'{filename}' was {extracted.truncated}; only that part was screened."
+    return None
+
+def rank_rows(results, uniques, jd_tokens, jd_priority_terms, top_k=None, jd_hash=None):
+    """
+    Score the unique resumes seen so far and return ranked copies of `results`
+    (similarity desc, duplicates last, S.N in ranked order).
+
+    With top_k, only the best top_k scored rows are returned, selected with a
+    bounded heap instead of sorting every row. With jd_hash, scores go through
+    the cross-run score cache (core.score_cache).
+    """
+    if top_k is not None:
+        return _top_rows(results, uniques, jd_tokens, jd_priority_terms, top_k)
+
+    hash_to_score = {}
+    if uniques and jd_hash is not None and score_cache.enabled:
+        scores = score_cache.scores(jd_hash, jd_tokens, [u["raw_hash"] for u in uniques],
+                                    [u["tokens"] for u in uniques], jd_priority_terms, boost_factor=1.5)
+        hash_to_score = {
+            u["raw_hash"]: round(float(s), 2) for u, s in zip(uniques, scores)
+        }
+    elif uniques:
+        all_docs = [jd_tokens] + [u["tokens"] for u in uniques]
+        tfidf_matrix, _ = compute_tfidf_matrix(
+            all_docs,
+            boost_terms=jd_priority_terms,
+            boost_factor=1.5
+        )
+        with metrics.timed("cosine"):
+            scores = cosine_similarity_batch(tfidf_matrix[0], tfidf_matrix[1:])
+        hash_to_score = {
+            u["raw_hash"]: round(float(s), 2) for u, s in zip(uniques, scores)
+        }
+
+    ranked = []
+    for row in results:
+        row = dict(row)
+        # assign scores to non-duplicates
+        if row.get("duplicate") == "—":
+            row["score"] = hash_to_score.get(row["raw_hash"], None)
+        ranked.append(row)
+
+    # === IMPORTANT: rank by similarity (desc), duplicates last ===
+    def sort_key(r):
+        # scored rows first (flag 0), duplicates (None) later (flag 1)
+        is_dup_flag = 0 if r.get("score") is not None else 1
+        score = r.get("score") if r.get("score") is not None else -1.0
+        return (is_dup_flag, -score)
+
+    ranked.sort(key=sort_key)
+
+    # S.N reflects ranked order
+    for i, r in enumerate(ranked, start=1):
+        r["sn"] = i
+        r.pop("raw_hash", None)
+    return ranked
+
+def _top_rows(results, uniques, jd_tokens, jd_priority_terms, top_k):
+    if not uniques:
+        return []
+    all_docs = [jd_tokens] + [u["tokens"] for u in uniques]
+    tfidf_matrix, _ = compute_tfidf_matrix(all_docs, boost_terms=jd_priority_terms, boost_factor=1.5)
+    ranker = StreamingTopK(tfidf_matrix[0], k=top_k)
+    with metrics.timed("cosine"):
+        ranker.feed(tfidf_matrix[1:], [u["raw_hash"] for u in uniques])
+
+    by_hash = {r["raw_hash"]: r for r in results if r.get("duplicate") == "—"}
+    ranked = []
+    for sn, (raw_hash, score) in enumerate(ranker.results(), start=1):
+        row = {k: v for k, v in by_hash[raw_hash].items() if k != "raw_hash"}
+        row["score"] = round(score, 2)
+        row["sn"] = sn
+        ranked.append(row)
+    return ranked
+
+def run_screening(jd_source, resume_payloads, progress=None, partial_every=PARTIAL_EVERY):
+    """
+    Per-run policy:
+      - Detect duplicates only within THIS run: exact (same text) and near
+        (MinHash estimate of shingle Jaccard >= NEAR_DUP_THRESHOLD, see core.minhash).
+      - Do not compute similarity for duplicates (display '—').
+      - Block if the same PDF is uploaded as both JD and Resume.
+      - Similarity is 0..1 (rounded to 2 decimals).
+
+    Args:
+        jd_source: JD PDF bytes or path
+        resume_payloads: iterable of (filename, pdf bytes/path, or None if not a valid PDF)
+        progress: optional callback(files_extracted, files_scored, ranked_rows_or_None)
+
+    Returns:
+        (results, errors): ranked rows and per-file error messages
+    """
+    results, errors = [], []
+
+    jd = extract_cached(jd_source)
+    jd_text, jd_cleaned, jd_hash = jd.raw_text, jd.cleaned_text, jd.raw_hash
+    insert_document("job_description.pdf", "job", jd_text, jd_cleaned,
+                    bytes_hash=None if jd.truncated else jd.bytes_hash)
+    if jd.truncated:
+        errors.append(truncation_message("job_description.pdf", jd))
+
+    jd_tokens = term_interner.encode_text(jd_cleaned)
+    jd_priority_terms = collect_jd_priority_terms(jd_text)
+
+    seen_hashes_run = {}   # hash -> first filename
+    near_dups = LshIndex(NEAR_DUP_THRESHOLD) if NEAR_DUP_THRESHOLD > 0 else None   # keyed by hash
+    uniques = []           # to score once (tokens as interned ids)
+    to_store = []          # persisted in batches (optional persistence)
+    extracted_count = 0
+    next_partial = partial_every
+
+    def flush_store():
+        if to_store:
+            try:
+                insert_documents_bulk(to_store)
+            except Exception as err:
+                print("Skipping persistence for this batch:", err)
+            to_store.clear()
+
+    for filename, extracted, err in extract_many(resume_payloads):
+        extracted_count += 1
+        if progress:
+            progress(extracted_count, None, None)
+
+        rejected = rejection_message(filename, extracted, err)
+        if rejected:
+            metrics.count("file_rejected")
+            errors.append(rejected)
+            continue
+
+        raw_text, cleaned_text, raw_hash = extracted.raw_text, extracted.cleaned_text, extracted.raw_hash
+        email = extract_email(raw_text)
+
+        # (2) Block JD==Resume same PDF
+        if raw_hash == jd_hash:
+            metrics.count("file_same_as_jd")
+            errors.append(f"'{filename}' was skipped because it is the SAME PDF as the uploaded JD.")
+            continue
+        truncated = truncation_message(filename, extracted)
+        if truncated:
+            metrics.count("file_truncated")
+            errors.append(truncated)
+
+        # In-run duplicate check
+        if raw_hash in seen_hashes_run:
+            metrics.count("file_duplicate")
+            # (3) mark duplicate; DO NOT score
+            results.append({
+                "name": filename,
+                "email": email,
+                "duplicate": f"Duplicate of {seen_hashes_run[raw_hash]}",
+                "score": None,         # <- not computed
+                "raw_hash": raw_hash,
+            })
+            continue
+
+        # Lightly edited copy of a resume already in this run: listed, not scored.
+        # Indexed by content hash, since uploads can share a file name
+        if near_dups is not None:
+            signature = minhash_signature(cleaned_text.split())
+            original = near_dups.near_duplicate(signature)
+            if original is not None:
+                metrics.count("file_near_duplicate")
+                results.append({
+                    "name": filename,
+                    "email": email,
+                    "duplicate": f"Near-duplicate of {seen_hashes_run[original]}",
+                    "score": None,
+                    "raw_hash": raw_hash,
+                })
+                continue
+            near_dups.add(raw_hash, signature)
+
+        # First time in this run
+        metrics.count("file_unique")
+        seen_hashes_run[raw_hash] = filename
+        to_store.append(document_row(filename, extracted))
+
+        results.append({
+            "name": filename,
+            "email": email,
+            "duplicate": "—",
+            "score": None,            # filled later
+            "raw_hash": raw_hash,
+        })
+        uniques.append({
+            "filename": filename,
+            "raw_hash": raw_hash,
+            "tokens": term_interner.encode_text(cleaned_text),
+        })
+
+        if partial_every and len(uniques) % partial_every == 0:
+            flush_store()
+        # Partial ranking over what has been extracted so far (25, 50, 100, 200, ... uniques by default)
+        if partial_every and len(uniques) >= next_partial:
+            next_partial = len(uniques) + max(partial_every, len(uniques))
+            if progress:
+                progress(extracted_count, len(uniques),
+                         rank_rows(results, uniques, jd_tokens, jd_priority_terms, top_k=PARTIAL_TOP_K))
+
+    flush_store()
+
+    # --- In-memory scoring for THIS RUN ONLY ---
+    ranked = rank_rows(results, uniques, jd_tokens, jd_priority_terms, jd_hash=jd_hash)
+    if progress:
+        progress(extracted_count, len(uniques), ranked)
+    return ranked, errors
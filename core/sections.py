@@ -0,0 +1,151 @@
+# core/sections.py
+"""
+Single-pass section segmentation.
+
+segment(text) finds every known heading (JD_HEADINGS_FOR_BOOST plus the
+resume sections boost_resume_sections uses) in one scan and returns a
+heading -> content span map, so JD priority terms and resume boosting read
+all their sections from one parse. Parses are cached per text.
+
+Spans follow the rules of the original per-heading regex exactly: a heading's
+first case-insensitive occurrence anywhere in the text, whitespace after it
+skipped, and the content running to the next line that starts with a letter
+and is followed by another line break, or to the end of the text.
+"""
+
+import os
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+# ===== JD headings to boost at 1.5× =====
+JD_HEADINGS_FOR_BOOST = [
+    "Responsibilities", "Duties", "Role Overview",
+    "Requirements", "Must-Have Skills", "Qualifications",
+    "Preferred Skills", "Good to Have", "Bonus Points For",
+    "Who You Are", "Ideal Candidate",
+    "What We Offer", "Benefits", "Perks",
+]
+# Resume sections repeated by boost_resume_sections
+RESUME_BOOST_HEADINGS = ["skills", "experience"]
+
+# Parsed documents kept (JDs are parsed once per run, resumes once per boost)
+SECTION_CACHE_SIZE = int(os.environ.get("SECTION_CACHE_SIZE", "256"))
+
+# Non-ASCII characters re's IGNORECASE matches to ASCII letters; lower() alone misses them
+# (and lower-cases "İ" to two characters)
+_RE_FOLDS = {"İ": "i", "ı": "i", "ſ": "s", "K": "k"}
+_FOLD_CHARS = re.compile("[" + "".join(_RE_FOLDS) + "]")
+_FOLD_TABLE = str.maketrans(_RE_FOLDS)
+
+def _fold(heading):
+    return heading.translate(_FOLD_TABLE).lower()
+
+_WHITESPACE = re.compile(r"\s*")
+# Section ends: a line break followed by a letter ([A-Z] under IGNORECASE, as in the original lookahead)
+_LINE_START = re.compile(r"(?i)\n(?=[A-Z])")
+
+
+def _trie_pattern(words):
+    """One regex for all words, factored by common prefixes; longer words win at a shared start."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and "" not in node else "(?:" + "|".join(branches) + ")"
+        return body + ("?" if "" in node else "")
+
+    return emit(trie)
+
+
+class HeadingMatcher:
+    """
+    Aho-Corasick style multi-heading matcher: one prefix-factored pattern is
+    scanned over the lower-cased text, each hit reporting the longest heading
+    at that position plus, like Aho-Corasick output links, every heading that
+    is a prefix of it. Searching again from the next position keeps
+    overlapping headings ("Skills" inside "Preferred Skills").
+    """
+
+    def __init__(self, headings):
+        self.headings = list(dict.fromkeys(_fold(h) for h in headings))
+        self._pattern = re.compile(_trie_pattern(self.headings))
+        self._prefixes = {h: [g for g in self.headings if g != h and h.startswith(g)] for h in self.headings}
+
+    def __contains__(self, heading):
+        return _fold(heading) in self._prefixes
+
+    def first_occurrences(self, text):
+        """{heading: (start, end)} of each heading's first case-insensitive occurrence."""
+        if not text.isascii() and _FOLD_CHARS.search(text):
+            text = text.translate(_FOLD_TABLE)
+        lowered = text.lower()
+        found = {}
+        pos = 0
+        while len(found) < len(self.headings):
+            m = self._pattern.search(lowered, pos)
+            if m is None:
+                break
+            start = m.start()
+            for heading in (m.group(), *self._prefixes[m.group()]):
+                found.setdefault(heading, (start, start + len(heading)))
+            pos = start + 1
+        return found
+
+
+class Sections:
+    """Heading -> (start, end) content spans of one document."""
+
+    __slots__ = ("text", "spans")
+
+    def __init__(self, text, spans):
+        self.text = text
+        self.spans = spans
+
+    def section(self, heading):
+        """As extract_exact_section(text, heading): heading, newline, stripped content; '' if absent."""
+        span = self.spans.get(_fold(heading))
+        if span is None:
+            return ""
+        return heading + "\n" + self.text[span[0]:span[1]].strip()
+
+
+def parse_sections(text, matcher):
+    """Segment `text` by the headings of `matcher` (uncached; see segment())."""
+    occurrences = matcher.first_occurrences(text)
+    if not occurrences:
+        return Sections(text, {})
+
+    # Line starts that still have a line break after them (the lookahead's [^\n]*\n)
+    last_newline = text.rfind("\n")
+    ends = [m.start() for m in _LINE_START.finditer(text, 0, max(last_newline, 0))]
+    # `$`: before a final newline, else the very end
+    final = len(text) - 1 if text.endswith("\n") else len(text)
+
+    spans = {}
+    for heading, (_, heading_end) in occurrences.items():
+        start = _WHITESPACE.match(text, heading_end).end()
+        i = bisect_left(ends, start)
+        end = final if start <= final else len(text)
+        if i < len(ends):
+            end = min(end, ends[i])
+        spans[heading] = (start, end)
+    return Sections(text, spans)
+
+KNOWN_HEADINGS = HeadingMatcher(JD_HEADINGS_FOR_BOOST + RESUME_BOOST_HEADINGS)
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def segment(text):
+    """Sections of `text` for every known heading, parsed once per distinct text."""
+    return parse_sections(text, KNOWN_HEADINGS)
+
+@lru_cache(maxsize=64)
+def heading_matcher(heading):
+    return HeadingMatcher([heading])
@@ -1,7 +1,12 @@
 # core/similarity.py
 
+import heapq
 import math
-from typing import Dict, Set
+from typing import Dict, Set, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
 def cosine_similarity(vec1: Dict[str, float], vec2: Dict[str, float], all_terms: Set[str]) -> float:
     dot_product = sum(vec1.get(term, 0.0) * vec2.get(term, 0.0) for term in all_terms)
     norm1 = math.sqrt(sum(vec1.get(term, 0.0) ** 2 for term in all_terms))
@@ -10,3 +15,139 @@ def cosine_similarity(vec1: Dict[str, float], vec2: Dict[str, float], all_terms:
         return 0.0
     return dot_product / (norm1 * norm2)  # value is already between 0 and 1
 
+# ---------------- Batched scoring ----------------
+
+def l2_normalize_rows(matrix) -> csr_matrix:
+    """Return a CSR copy of `matrix` with every row scaled to unit length (zero rows stay zero)."""
+    matrix = csr_matrix(matrix, dtype=np.float64, copy=True)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+    return matrix
+
+def cosine_similarity_batch(query_vec, doc_matrix) -> np.ndarray:
+    """
+    Score one query against N documents in a single sparse matrix-vector product.
+
+    Args:
+        query_vec: 1 x V sparse row (or length-V dense array), e.g. the JD row of compute_tfidf_matrix
+        doc_matrix: N x V sparse matrix of document vectors in the same column space
+
+    Returns:
+        np.ndarray: N cosine scores in [0, 1]; 0.0 where either vector is empty
+    """
+    if not issparse(query_vec):
+        query_vec = csr_matrix(np.asarray(query_vec, dtype=np.float64).reshape(1, -1))
+    query = l2_normalize_rows(query_vec)
+    docs = l2_normalize_rows(doc_matrix)
+    return np.asarray((docs @ query.T).todense()).ravel()
+
+def top_k_similar(query_vec, doc_matrix, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best `k` documents for a query without sorting the full score list.
+
+    Returns:
+        (indices, scores): row indices into doc_matrix and their scores, best first
+    """
+    scores = cosine_similarity_batch(query_vec, doc_matrix)
+    return top_k_indices(scores, k)
+
+def top_k_indices(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """argpartition the `k` highest scores, then sort only those (ties among them keep input order)."""
+    n = len(scores)
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates.sort()
+    else:
+        candidates = np.arange(n)
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order, scores[order]
+
+
+# ---------------- Streaming top-k ----------------
+
+# Slack for float rounding between the upper bound and the exact score
+_BOUND_EPS = 1e-12
+
+class StreamingTopK:
+    """
+    Keep the best `k` documents for one query while document rows arrive in batches.
+
+    Each document first gets a cheap upper bound: the norm of the (unit) query
+    restricted to the terms the document contains, which by Cauchy-Schwarz is
+    at least its cosine. Only documents whose bound reaches the current cut-off
+    (the k-th best score so far, or min_score) get an exact score. Scores match
+    cosine_similarity_batch, and ties keep arrival order, as in top_k_indices.
+
+    Memory is O(k); time is O(nnz) for the bounds plus log k per admitted document.
+    """
+
+    def __init__(self, query_vec, k=None, min_score=0.0):
+        if not issparse(query_vec):
+            query_vec = csr_matrix(np.asarray(query_vec, dtype=np.float64).reshape(1, -1))
+        self._query = query_vec
+        q = np.asarray(l2_normalize_rows(query_vec).todense()).ravel()
+        self._q2 = q * q
+        self.k = k
+        self.min_score = min_score
+        self._heap = []       # (score, -seq, item): heap[0] is the current k-th best
+        self._seen = 0
+        self.scored = 0       # documents that needed an exact score
+        self.pruned = 0       # documents skipped on their upper bound
+
+    @property
+    def threshold(self):
+        """Score a new document must reach to be kept."""
+        if self.k is not None and len(self._heap) >= self.k:
+            return max(self.min_score, self._heap[0][0])
+        return self.min_score
+
+    def upper_bounds(self, doc_matrix):
+        doc_matrix = csr_matrix(doc_matrix)
+        rows = np.repeat(np.arange(doc_matrix.shape[0]), np.diff(doc_matrix.indptr))
+        overlap = np.bincount(rows, weights=self._q2[doc_matrix.indices], minlength=doc_matrix.shape[0])
+        return np.sqrt(overlap)
+
+    def feed(self, doc_matrix, items=None):
+        """
+        Offer a batch of document rows (same columns as the query).
+
+        Args:
+            items: per-row payloads returned by results() (default: global row number)
+
+        Returns:
+            int: number of documents from this batch admitted to the top k
+        """
+        n = doc_matrix.shape[0]
+        base, self._seen = self._seen, self._seen + n
+        if self.k == 0 or n == 0:
+            return 0
+
+        cand = np.flatnonzero(self.upper_bounds(doc_matrix) + _BOUND_EPS >= self.threshold)
+        self.pruned += n - len(cand)
+        self.scored += len(cand)
+        if not len(cand):
+            return 0
+        scores = cosine_similarity_batch(self._query, csr_matrix(doc_matrix)[cand])
+
+        admitted = 0
+        for i in np.flatnonzero(scores >= self.threshold).tolist():
+            score = float(scores[i])
+            if score < self.threshold:
+                continue   # the cut-off rose while this batch was being pushed
+            row = int(cand[i])
+            entry = (score, -(base + row), items[row] if items is not None else base + row)
+            if self.k is None or len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+                admitted += 1
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+                admitted += 1
+        return admitted
+
+    def results(self):
+        """[(item, score)] best first."""
+        return [(item, score) for score, _, item in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
@@ -0,0 +1,76 @@
+# core/term_vectors.py
+"""
+Compact per-document term-frequency vectors.
+
+A vector is stored as one blob: N little-endian uint32 term ids (ascending,
+ids from the `vocabulary` table) followed by their N uint32 counts. Ranking
+turns a batch of blobs straight into a CSR count matrix, with no string
+splitting.
+"""
+
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+_DTYPE = np.dtype("<u4")
+# vocabulary.term is VARCHAR(255); longer tokens (base64 blobs, runs of
+# underscores from PDF artefacts) are never useful terms and are skipped
+MAX_TERM_LENGTH = 255
+
+def count_terms(cleaned_text):
+    """cleaned_text -> (Counter of term counts, document length in tokens), without over-long tokens."""
+    counts = Counter(t for t in (cleaned_text or "").split() if len(t) <= MAX_TERM_LENGTH)
+    return counts, sum(counts.values())
+
+def pack_term_vector(counts, term_ids):
+    """
+    Args:
+        counts: term -> count
+        term_ids: term -> vocabulary id (must cover every term in `counts`)
+
+    Returns:
+        bytes: packed vector
+    """
+    pairs = sorted((term_ids[t], c) for t, c in counts.items())
+    ids = np.fromiter((i for i, _ in pairs), dtype=_DTYPE, count=len(pairs))
+    cnts = np.fromiter((c for _, c in pairs), dtype=_DTYPE, count=len(pairs))
+    return ids.tobytes() + cnts.tobytes()
+
+def unpack_term_vector(blob):
+    """Packed vector -> (term ids, counts) as uint32 arrays (zero-copy views)."""
+    flat = np.frombuffer(blob or b"", dtype=_DTYPE)
+    n = len(flat) // 2
+    return flat[:n], flat[n:]
+
+def vectors_to_matrix(blobs):
+    """
+    Stack packed vectors into a CSR (docs x vocabulary ids) count matrix.
+
+    Returns:
+        csr_matrix, np.ndarray: count matrix over the distinct ids present,
+        and the vocabulary id of each column (ascending)
+    """
+    parts = [unpack_term_vector(b) for b in blobs]
+    indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids, _ in parts], out=indptr[1:])
+    all_ids = np.concatenate([ids for ids, _ in parts]) if parts else np.empty(0, dtype=_DTYPE)
+    data = np.concatenate([c for _, c in parts]).astype(np.float64) if parts else np.empty(0)
+
+    col_ids, indices = np.unique(all_ids, return_inverse=True)
+    counts = csr_matrix((data, indices.astype(np.int32), indptr), shape=(len(parts), len(col_ids)))
+    return counts, col_ids.astype(np.int64)
+
+def vectors_to_id_matrix(blobs, n_ids):
+    """
+    Stack packed vectors into a CSR (docs x n_ids) count matrix whose columns
+    are the vocabulary ids themselves, so chunks of a pool share one column space.
+    """
+    parts = [unpack_term_vector(b) for b in blobs]
+    indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids, _ in parts], out=indptr[1:])
+    if not parts:
+        return csr_matrix((0, n_ids), dtype=np.float64)
+    indices = np.concatenate([ids for ids, _ in parts]).astype(np.int32)
+    data = np.concatenate([c for _, c in parts]).astype(np.float64)
+    return csr_matrix((data, indices, indptr), shape=(len(parts), n_ids))
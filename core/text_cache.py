@@ -0,0 +1,102 @@
+# core/text_cache.py
+"""
+Cache of extracted + preprocessed text keyed by the SHA-256 of the raw upload
+bytes, so a PDF we have already parsed is never parsed again.
+
+Lookups go to an in-process LRU (evicted by approximate size) and then to the
+`documents.bytes_hash` column.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from core.metrics import register_collector
+from database.db_connect import get_document_by_bytes_hash
+
+TEXT_CACHE_MAX_BYTES = int(os.environ.get("TEXT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+def file_bytes_hash(source):
+    """SHA-256 of an upload, given as bytes or as a path (hashed in chunks)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """bytes_hash -> (raw_text, cleaned_text, raw_hash), LRU bounded by total text size."""
+
+    def __init__(self, max_bytes=TEXT_CACHE_MAX_BYTES, loader=get_document_by_bytes_hash):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _entry_size(raw_text, cleaned_text):
+        return len(raw_text) + len(cleaned_text) + 200   # + rough per-entry overhead
+
+    def get(self, bytes_hash):
+        with self._lock:
+            entry = self._entries.get(bytes_hash)
+            if entry is not None:
+                self._entries.move_to_end(bytes_hash)
+                self.hits += 1
+                return entry
+
+        row = None
+        if self.loader is not None:
+            try:
+                row = self.loader(bytes_hash)
+            except Exception as err:
+                # The DB tier is optional here: a failed lookup is just a miss
+                print("Text cache lookup failed:", err)
+        if not row:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        entry = (row["raw_text"] or "", row["cleaned_text"] or "", row["hashed_text"])
+        self.put(bytes_hash, *entry)
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, bytes_hash, raw_text, cleaned_text, raw_hash):
+        size = self._entry_size(raw_text, cleaned_text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(bytes_hash, None)
+            if old is not None:
+                self._size -= self._entry_size(old[0], old[1])
+            self._entries[bytes_hash] = (raw_text, cleaned_text, raw_hash)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (raw, cleaned, _) = self._entries.popitem(last=False)
+                self._size -= self._entry_size(raw, cleaned)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+text_cache = TextCache()
+
+@register_collector
+def _text_cache_metrics():
+    return [
+        "# TYPE text_cache_entries gauge", f"text_cache_entries {len(text_cache._entries)}",
+        "# TYPE text_cache_bytes gauge", f"text_cache_bytes {text_cache._size}",
+        "# TYPE text_cache_hits_total counter", f"text_cache_hits_total {text_cache.hits}",
+        "# TYPE text_cache_misses_total counter", f"text_cache_misses_total {text_cache.misses}",
+    ]
@@ -3,6 +3,12 @@
 import math
 from collections import Counter
 
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from core.metrics import timed
+from core.interner import term_interner, is_encoded
+
 MAX_FEATURES = 2000
 
 def compute_tf(tokens):
@@ -18,15 +24,198 @@ def compute_tf(tokens):
 def compute_idf(all_docs):
     """Compute inverse document frequency (smoothed)."""
     N = len(all_docs)
-    idf = {}
-    all_terms = set(term for doc in all_docs for term in doc)
+    # One pass over the corpus: each document contributes its distinct terms once
+    df = Counter()
+    for doc in all_docs:
+        df.update(set(doc))
+
+    return {term: math.log((N + 1) / (count + 1)) + 1 for term, count in df.items()}
+
+# ---------------- Sparse engine ----------------
+
+def build_vocabulary(all_docs):
+    """
+    Map every term to a column index, in first-seen order across the corpus.
+
+    Returns:
+        Dict[str, int], List[str]: term -> column, column -> term
+    """
+    vocab = {}
+    for doc in all_docs:
+        for term in doc:
+            if term not in vocab:
+                vocab[term] = len(vocab)
+    terms = list(vocab)
+    return vocab, terms
 
-    for term in all_terms:
-        containing_docs = sum(1 for doc in all_docs if term in doc)
-        idf[term] = math.log((N + 1) / (containing_docs + 1)) + 1
-    return idf
+def term_count_matrix(all_docs, vocab):
+    """Build a CSR (docs x terms) matrix of raw term counts."""
+    lengths = np.fromiter((len(doc) for doc in all_docs), dtype=np.int64, count=len(all_docs))
+    indptr = np.zeros(len(all_docs) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter(
+        (vocab[term] for doc in all_docs for term in doc),
+        dtype=np.int32, count=int(indptr[-1])
+    )
+    data = np.ones(len(indices), dtype=np.float64)
+    counts = csr_matrix((data, indices, indptr), shape=(len(all_docs), len(vocab)))
+    counts.sum_duplicates()
+    return counts
 
-def compute_tfidf(all_docs, boost_terms=None, boost_factor=2.0):
+# Token-id documents reduced to (id, count) pairs per step of encoded_count_matrix
+COUNT_CHUNK_DOCS = 1024
+
+def encoded_count_matrix(all_docs):
+    """
+    term_count_matrix for token-id documents (core.interner). Documents are
+    reduced to (id, count) pairs COUNT_CHUNK_DOCS at a time, so temporaries
+    stay bounded however many tokens the corpus holds.
+
+    Returns:
+        csr_matrix, np.ndarray: raw counts with columns in first-seen order (as
+        build_vocabulary), and the token id of each column
+    """
+    size = max((int(doc.max()) + 1 for doc in all_docs if len(doc)), default=0)
+    column_of = np.full(size, -1, dtype=np.int32)   # token id -> column
+    n_cols = 0
+    indptr = np.zeros(len(all_docs) + 1, dtype=np.int64)
+    cols, counts = [], []
+    for start in range(0, len(all_docs), COUNT_CHUNK_DOCS):
+        chunk = all_docs[start:start + COUNT_CHUNK_DOCS]
+        lengths = np.fromiter((len(doc) for doc in chunk), dtype=np.int64, count=len(chunk))
+        rows = np.repeat(np.arange(len(chunk), dtype=np.int64), lengths)
+        # (row, id) pairs sorted by row then id, with the position of their first token
+        keys, first_seen, pair_counts = np.unique(rows * size + np.concatenate(chunk),
+                                                  return_index=True, return_counts=True)
+        ids = keys % size
+
+        # Ids not seen in earlier chunks get columns in order of first occurrence
+        new = column_of[ids] < 0
+        if new.any():
+            by_position = np.argsort(first_seen[new])
+            fresh, first = np.unique(ids[new][by_position], return_index=True)
+            fresh = fresh[np.argsort(first)]
+            column_of[fresh] = np.arange(n_cols, n_cols + len(fresh), dtype=np.int32)
+            n_cols += len(fresh)
+
+        cols.append(column_of[ids])
+        counts.append(pair_counts)
+        indptr[start + 1:start + len(chunk) + 1] = indptr[start] + np.cumsum(
+            np.bincount(keys // size, minlength=len(chunk)))
+
+    col_ids = np.empty(n_cols, dtype=np.int64)
+    seen = np.flatnonzero(column_of >= 0)
+    col_ids[column_of[seen]] = seen
+    indices = np.concatenate(cols) if cols else np.empty(0, dtype=np.int32)
+    data = np.concatenate(counts).astype(np.float64) if counts else np.empty(0)
+    matrix = csr_matrix((data, indices, indptr), shape=(len(all_docs), n_cols))
+    matrix.sort_indices()
+    return matrix, col_ids
+
+def count_matrix(all_docs):
+    """
+    Raw term counts for a corpus of term lists or token-id arrays (mixing is allowed).
+
+    Returns:
+        csr_matrix, Dict[str, int], List[str]: counts, term -> column, column -> term
+    """
+    if any(is_encoded(doc) for doc in all_docs):
+        docs = [doc if is_encoded(doc) else term_interner.encode(doc) for doc in all_docs]
+        counts, col_ids = encoded_count_matrix(docs)
+        terms = term_interner.decode(col_ids)
+        return counts, {term: j for j, term in enumerate(terms)}, terms
+    vocab, terms = build_vocabulary(all_docs)
+    return term_count_matrix(all_docs, vocab), vocab, terms
+
+def idf_from_df(df, n_docs):
+    """Smoothed IDF for an array of document frequencies over `n_docs` documents."""
+    # math.log per distinct df value keeps results bit-identical to compute_idf
+    values, inverse = np.unique(np.asarray(df), return_inverse=True)
+    lookup = np.array([math.log((n_docs + 1) / (d + 1)) + 1 for d in values.tolist()], dtype=np.float64)
+    return lookup[inverse.reshape(-1)]
+
+def idf_vector(counts):
+    """Smoothed IDF per column of a term-count matrix (document frequency in one pass)."""
+    return idf_from_df(np.bincount(counts.indices, minlength=counts.shape[1]), counts.shape[0])
+
+def weigh_counts(weights, idf, boost_cols=None, boost_factor=2.0, first_boosted_row=1):
+    """
+    tf * idf in place on a count matrix, boosting `boost_cols` in rows from
+    `first_boosted_row` on (row 0 is the JD in a full corpus; 0 boosts every row).
+    Each row's weights depend only on that row, so a corpus may be weighed in chunks.
+    """
+    doc_lengths = np.diff(weights.indptr)
+    rows = np.repeat(np.arange(weights.shape[0]), doc_lengths)
+    row_totals = np.asarray(weights.sum(axis=1)).ravel()
+
+    # tf * idf, same operation order as the dict implementation
+    weights.data = (weights.data / row_totals[rows]) * idf[weights.indices]
+
+    if boost_cols is not None and boost_cols.any():
+        mask = boost_cols[weights.indices] & (rows >= first_boosted_row)
+        weights.data[mask] *= boost_factor
+    return weights
+
+def top_features(all_scores):
+    """Columns of the MAX_FEATURES highest global term importances (ties keep column order)."""
+    return np.argsort(-all_scores, kind="stable")[:MAX_FEATURES]
+
+def tfidf_from_counts(weights, idf, boost_cols=None, boost_factor=2.0):
+    """
+    TF-IDF weighting and top-MAX_FEATURES column selection over a count matrix.
+
+    Args:
+        weights (csr_matrix): docs x terms raw counts (JD in row 0); reweighted in place
+        idf (np.ndarray): IDF per column
+        boost_cols (np.ndarray[bool]): columns boosted in resume rows
+
+    Returns:
+        csr_matrix, np.ndarray: (docs x top-k columns) TF-IDF matrix, selected columns
+    """
+    weigh_counts(weights, idf, boost_cols, boost_factor)
+
+    # Global term importance, accumulated in document order, then top MAX_FEATURES
+    all_scores = np.bincount(weights.indices, weights=weights.data, minlength=weights.shape[1])
+    top_cols = top_features(all_scores)
+
+    return weights[:, top_cols].tocsr(), top_cols
+
+@timed("tfidf")
+def compute_tfidf_matrix(all_docs, boost_terms=None, boost_factor=2.0, idf_model=None):
+    """
+    Sparse counterpart of compute_tfidf.
+
+    Args:
+        all_docs (List[List[str]]): List of tokenized documents (JD is at index 0);
+            token-id arrays from core.interner are accepted as well
+        boost_terms (Set[str]): Terms from JD to boost in resumes
+        boost_factor (float): Boost multiplier
+        idf_model (IdfModel): document frequencies of the resume pool, which must
+            already include all_docs[1:]; only the JD is counted on top of it
+
+    Returns:
+        csr_matrix, List[str]: (docs x top-k terms) TF-IDF matrix, column terms
+    """
+    weights, vocab, terms = count_matrix(all_docs)
+    if not terms:
+        return csr_matrix((len(all_docs), 0), dtype=np.float64), []
+
+    boost_cols = None
+    if boost_terms:
+        boost_cols = np.zeros(len(terms), dtype=bool)
+        boost_cols[[vocab[t] for t in boost_terms if t in vocab]] = True
+
+    if idf_model is None:
+        idf = idf_vector(weights)
+    else:
+        jd_df = np.zeros(len(terms), dtype=np.int64)
+        jd_df[weights.indices[weights.indptr[0]:weights.indptr[1]]] = 1
+        idf = idf_model.idf(terms, extra_df=jd_df, extra_docs=1)
+
+    matrix, top_cols = tfidf_from_counts(weights, idf, boost_cols, boost_factor)
+    return matrix, [terms[j] for j in top_cols]
+
+def compute_tfidf(all_docs, boost_terms=None, boost_factor=2.0, idf_model=None):
     """
     Compute TF-IDF vectors with optional boosting for job-description terms in resumes.
 
@@ -34,38 +223,18 @@ def compute_tfidf(all_docs, boost_terms=None, boost_factor=2.0):
         all_docs (List[List[str]]): List of tokenized documents (JD is at index 0)
         boost_terms (Set[str]): Terms from JD to boost in resumes
         boost_factor (float): Boost multiplier
+        idf_model (IdfModel): precomputed pool document frequencies (see compute_tfidf_matrix)
 
     Returns:
         List[Dict[str, float]], Set[str]: TF-IDF vectors, selected top-k terms
     """
-    idf = compute_idf(all_docs)
-    tfidf_vectors = []
-
-    # Collect all TF-IDF scores across all documents for feature limiting
-    all_scores = {}
-
-    for i, doc in enumerate(all_docs):
-        tf = compute_tf(doc)
-        tfidf = {}
-        for term in tf:
-            weight = tf[term] * idf[term]
-            if boost_terms and i != 0 and term in boost_terms:
-                weight *= boost_factor
-            tfidf[term] = weight
-
-            # Track term importance globally for feature pruning
-            if term not in all_scores:
-                all_scores[term] = 0
-            all_scores[term] += weight
-        tfidf_vectors.append(tfidf)
-
-    # Keep only top MAX_FEATURES by global score
-    top_terms = set(sorted(all_scores, key=all_scores.get, reverse=True)[:MAX_FEATURES])
-
-    # Filter TF-IDF vectors to include only top terms
+    matrix, top_terms = compute_tfidf_matrix(all_docs, boost_terms, boost_factor, idf_model)
+
     filtered_vectors = []
-    for tfidf in tfidf_vectors:
-        filtered = {term: score for term, score in tfidf.items() if term in top_terms}
-        filtered_vectors.append(filtered)
+    for i in range(matrix.shape[0]):
+        start, end = matrix.indptr[i], matrix.indptr[i + 1]
+        cols = matrix.indices[start:end].tolist()
+        vals = matrix.data[start:end].tolist()
+        filtered_vectors.append({top_terms[j]: v for j, v in zip(cols, vals)})
 
-    return filtered_vectors, top_terms
+    return filtered_vectors, set(top_terms)
@@ -1,70 +1,618 @@
 import mysql.connector
+import mysql.connector.pooling
 import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 
-def get_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="resume_screener"
-    )
+from core.extract import extract_contacts
+from core.metrics import timed
+from core.minhash import NEAR_DUP_THRESHOLD, band_keys, jaccard_estimate, minhash_signature, \
+    pack_signature, unpack_signature
+from core.term_vectors import count_terms, pack_term_vector
 
-def insert_document(file_name, doc_type, raw_text, cleaned_text):
-    hashed_text = hashlib.sha256(raw_text.encode('utf-8')).hexdigest()
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "resume_screener",
+}
 
-    # Check if document with this hash already exists
-    if document_exists(hashed_text):
-        print(f"Document '{file_name}' already exists in DB. Skipping insert.")
-        return
+# ===== Connection pool =====
+# mysql-connector caps a pool at 32 connections
+DB_POOL_SIZE = min(int(os.environ.get("DB_POOL_SIZE", "8")), 32)
+# How long a checkout waits for a free connection before giving up (seconds)
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
 
-    conn = get_connection()
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name="resume_screener",
+                pool_size=DB_POOL_SIZE,
+                pool_reset_session=True,
+                **DB_CONFIG
+            )
+        return _pool
+
+# ===== Schema additions, applied once per process on first connection =====
+# (serialized by a lock within the process and a MySQL named lock across processes)
+# (table, column or None for a whole table, DDL)
+SCHEMA_UPDATES = [
+    ("documents", "bytes_hash",
+     "ALTER TABLE documents ADD COLUMN bytes_hash CHAR(64) NULL, "
+     "ADD INDEX idx_documents_bytes_hash (bytes_hash)"),
+    ("screening_runs", None, """
+        CREATE TABLE screening_runs (
+            id         CHAR(32) PRIMARY KEY,
+            user_id    INT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            total_rows INT NOT NULL,
+            errors     MEDIUMTEXT NULL,
+            INDEX idx_screening_runs_user (user_id, created_at)
+        )"""),
+    ("screening_run_results", None, """
+        CREATE TABLE screening_run_results (
+            run_id    CHAR(32) NOT NULL,
+            sn        INT NOT NULL,
+            name      VARCHAR(255) NOT NULL,
+            email     VARCHAR(255) NULL,
+            duplicate VARCHAR(512) NULL,
+            score     DOUBLE NULL,
+            PRIMARY KEY (run_id, sn),
+            INDEX idx_run_results_score (run_id, score),
+            INDEX idx_run_results_name (run_id, name, sn)
+        )"""),
+    # Global vocabulary: term -> id for term vectors
+    ("vocabulary", None, """
+        CREATE TABLE vocabulary (
+            id   INT AUTO_INCREMENT PRIMARY KEY,
+            term VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+            UNIQUE KEY uq_vocabulary_term (term)
+        )"""),
+    # Resumes containing the term (JD-only terms stay at 0), bumped with the term vectors
+    ("vocabulary", "df",
+     "ALTER TABLE vocabulary ADD COLUMN df INT NOT NULL DEFAULT 0"),
+    # Packed term-frequency vector per document (see core.term_vectors)
+    ("term_vectors", None, """
+        CREATE TABLE term_vectors (
+            doc_id INT PRIMARY KEY,
+            length INT NOT NULL,
+            vector MEDIUMBLOB NOT NULL
+        )"""),
+    # Contact fields extracted once at ingest (NULL: stored before these columns existed)
+    ("documents", "email",
+     "ALTER TABLE documents ADD COLUMN email VARCHAR(255) NULL, "
+     "ADD COLUMN phone VARCHAR(64) NULL, ADD COLUMN linkedin VARCHAR(255) NULL, "
+     "ADD INDEX idx_documents_file_name (file_name(191), type, id)"),
+    ("documents", "created_at",
+     "ALTER TABLE documents ADD COLUMN created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP"),
+    # MinHash signatures and LSH buckets of resumes (see core.minhash)
+    ("minhash_signatures", None, """
+        CREATE TABLE minhash_signatures (
+            doc_id    INT PRIMARY KEY,
+            signature VARBINARY(2048) NOT NULL
+        )"""),
+    ("minhash_buckets", None, """
+        CREATE TABLE minhash_buckets (
+            band   SMALLINT NOT NULL,
+            bucket BIGINT NOT NULL,
+            doc_id INT NOT NULL,
+            PRIMARY KEY (band, bucket, doc_id)
+        )"""),
+    ("documents", "near_duplicate_of",
+     "ALTER TABLE documents ADD COLUMN near_duplicate_of INT NULL"),
+]
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def ensure_schema(conn):
+    """Apply any missing SCHEMA_UPDATES (idempotent; one thread at a time)."""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        _apply_schema_updates(conn)
+        _schema_ready = True
+
+def _apply_schema_updates(conn):
     cursor = conn.cursor()
     try:
-        cursor.execute("""
-            INSERT INTO documents (file_name, type, raw_text, cleaned_text, hashed_text)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (file_name, doc_type, raw_text, cleaned_text, hashed_text))
+        cursor.execute("SELECT GET_LOCK('resume_screener_schema', 60)")
+        if cursor.fetchone()[0] != 1:
+            raise mysql.connector.errors.OperationalError("Timed out waiting for the schema lock")
+        for table, column, ddl in SCHEMA_UPDATES:
+            if column is None:
+                cursor.execute("""
+                    SELECT 1 FROM information_schema.tables
+                    WHERE table_schema = DATABASE() AND table_name = %s
+                """, (table,))
+            else:
+                cursor.execute("""
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+                """, (table, column))
+            if cursor.fetchone() is None:
+                cursor.execute(ddl)
         conn.commit()
-        print(f"{doc_type.capitalize()} document '{file_name}' inserted successfully.")
-    except mysql.connector.Error as err:
-        print(f"Error inserting document '{file_name}':", err)
     finally:
+        cursor.execute("DO RELEASE_LOCK('resume_screener_schema')")
         cursor.close()
+
+@timed("db_checkout")
+def get_connection():
+    """
+    Check out a pooled connection (close() hands it back to the pool).
+    Waits up to DB_POOL_TIMEOUT for a free connection and reconnects
+    connections the server has dropped.
+    """
+    pool = _get_pool()
+    deadline = time.monotonic() + DB_POOL_TIMEOUT
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except mysql.connector.errors.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+    # Health check: is_connected() pings the server
+    try:
+        if not conn.is_connected():
+            conn.reconnect(attempts=2, delay=0)
+        if not _schema_ready:
+            ensure_schema(conn)
+    except Exception:
+        conn.close()   # hand it back rather than leak the pool slot
+        raise
+    return conn
+
+@contextmanager
+def db_connection():
+    """`with db_connection() as conn:` - pooled checkout, always returned."""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
         conn.close()
 
+@timed("db_insert")
+def insert_document(file_name, doc_type, raw_text, cleaned_text, bytes_hash=None):
+    hashed_text = hashlib.sha256(raw_text.encode('utf-8')).hexdigest()
+
+    doc_id = None
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Check if document with this hash already exists
+            cursor.execute("SELECT 1 FROM documents WHERE hashed_text = %s", (hashed_text,))
+            if cursor.fetchone() is not None:
+                print(f"Document '{file_name}' already exists in DB. Skipping insert.")
+                if bytes_hash:
+                    _remember_bytes_hash(cursor, hashed_text, bytes_hash)
+                    conn.commit()
+                return
+
+            contacts = extract_contacts(raw_text)
+            cursor.execute("""
+                INSERT INTO documents (file_name, type, raw_text, cleaned_text, hashed_text, bytes_hash,
+                                       email, phone, linkedin)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (file_name, doc_type, raw_text, cleaned_text, hashed_text, bytes_hash,
+                  contacts["email"], contacts["phone"], contacts["linkedin"]))
+            doc_id = cursor.lastrowid
+            _store_term_vectors(cursor, [(doc_id, doc_type, cleaned_text)])
+            _store_minhash(cursor, [(doc_id, doc_type, file_name, cleaned_text)])
+            conn.commit()
+            print(f"{doc_type.capitalize()} document '{file_name}' inserted successfully.")
+        except mysql.connector.Error as err:
+            conn.rollback()
+            print(f"Error inserting document '{file_name}':", err)
+            return
+        finally:
+            cursor.close()
+
+    if doc_type == "resume":
+        # A newer upload under this name replaces any cached detail (see core.resume_detail)
+        from core.resume_detail import detail_cache
+        detail_cache.invalidate(file_name)
+
+        # Keep the on-disk inverted index current (see core.inverted_index)
+        from core.inverted_index import index_documents
+        try:
+            index_documents([(doc_id, file_name, cleaned_text)])
+        except Exception as err:
+            print(f"Error indexing document '{file_name}':", err)
+
+# ===== Bulk ingestion =====
+# Rows per multi-row INSERT (keeps each statement well under max_allowed_packet)
+BULK_INSERT_CHUNK = int(os.environ.get("BULK_INSERT_CHUNK", "100"))
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+@timed("db_insert_bulk")
+def insert_documents_bulk(docs):
+    """
+    Insert many documents in one transaction.
+
+    Args:
+        docs: list of dicts with file_name, type, raw_text, cleaned_text and optional bytes_hash
+
+    Returns:
+        (inserted, existing): the input dicts, each given its hashed_text and
+        (for inserted rows) its new id. Repeats within `docs` count as existing.
+    """
+    rows, seen = [], set()
+    inserted, existing = [], []
+    for doc in docs:
+        doc["hashed_text"] = hashlib.sha256(doc["raw_text"].encode('utf-8')).hexdigest()
+        if doc["hashed_text"] in seen:
+            existing.append(doc)
+        else:
+            seen.add(doc["hashed_text"])
+            rows.append(doc)
+    if not rows:
+        return inserted, existing
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Resolve hashes already stored, one IN (...) query per chunk
+            known = set()
+            for chunk in _chunks([d["hashed_text"] for d in rows], BULK_INSERT_CHUNK):
+                marks = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"SELECT hashed_text FROM documents WHERE hashed_text IN ({marks})", chunk)
+                known.update(h for (h,) in cursor.fetchall())
+
+            new_rows = [d for d in rows if d["hashed_text"] not in known]
+            existing.extend(d for d in rows if d["hashed_text"] in known)
+
+            backfill = [(d["bytes_hash"], d["hashed_text"]) for d in rows
+                        if d["hashed_text"] in known and d.get("bytes_hash")]
+            if backfill:
+                cursor.executemany("""
+                    UPDATE documents SET bytes_hash = %s
+                    WHERE hashed_text = %s AND bytes_hash IS NULL
+                """, backfill)
+
+            for chunk in _chunks(new_rows, BULK_INSERT_CHUNK):
+                contacts = [extract_contacts(d["raw_text"]) for d in chunk]
+                cursor.executemany("""
+                    INSERT INTO documents (file_name, type, raw_text, cleaned_text, hashed_text, bytes_hash,
+                                           email, phone, linkedin)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, [(d["file_name"], d["type"], d["raw_text"], d["cleaned_text"], d["hashed_text"],
+                       d.get("bytes_hash"), c["email"], c["phone"], c["linkedin"])
+                      for d, c in zip(chunk, contacts)])
+
+                # Auto-increment ids are not guaranteed consecutive, so read them back
+                marks = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"SELECT id, hashed_text FROM documents WHERE hashed_text IN ({marks})",
+                    [d["hashed_text"] for d in chunk]
+                )
+                ids = dict((h, i) for i, h in cursor.fetchall())
+                for d in chunk:
+                    d["id"] = ids.get(d["hashed_text"])
+                _store_term_vectors(cursor, [(d["id"], d["type"], d["cleaned_text"]) for d in chunk])
+                _store_minhash(cursor, [(d["id"], d["type"], d["file_name"], d["cleaned_text"]) for d in chunk])
+            conn.commit()
+            inserted = new_rows
+            print(f"Bulk insert: {len(inserted)} new, {len(existing)} already in DB.")
+        except mysql.connector.Error as err:
+            conn.rollback()
+            print("Error in bulk document insert:", err)
+            raise
+        finally:
+            cursor.close()
+
+    resumes = [d for d in inserted if d["type"] == "resume"]
+    if resumes:
+        from core.resume_detail import detail_cache
+        for d in resumes:
+            detail_cache.invalidate(d["file_name"])
+
+        # Keep the on-disk inverted index current, one transaction for the batch
+        from core.inverted_index import index_documents
+        try:
+            index_documents([(d["id"], d["file_name"], d["cleaned_text"]) for d in resumes])
+        except Exception as err:
+            print("Error indexing bulk-inserted resumes:", err)
+
+    return inserted, existing
+
+# ===== Term vectors + vocabulary (see core.term_vectors) =====
+def _store_term_vectors(cursor, docs):
+    """
+    Store packed term vectors for new documents, adding unseen terms to the
+    vocabulary and bumping its df for resumes, inside the caller's transaction.
+    df rows are updated in id order, so concurrent ingests lock them in the
+    same order and wait for each other instead of deadlocking.
+
+    Args:
+        docs: list of (doc_id, doc_type, cleaned_text)
+    """
+    counted = [(doc_id, *count_terms(text)) for doc_id, _, text in docs]
+    terms = sorted({t for _, counts, _ in counted for t in counts})
+
+    term_ids = _vocabulary_ids(cursor, terms)
+    unseen = [t for t in terms if t not in term_ids]
+    if unseen:
+        # IGNORE: another writer may add the same term first; either id is read back
+        for chunk in _chunks(unseen, BULK_INSERT_CHUNK * 10):
+            cursor.executemany("INSERT IGNORE INTO vocabulary (term) VALUES (%s)", [(t,) for t in chunk])
+        term_ids.update(_vocabulary_ids(cursor, unseen))
+
+    cursor.executemany(
+        "INSERT INTO term_vectors (doc_id, length, vector) VALUES (%s, %s, %s)",
+        [(doc_id, length, pack_term_vector(counts, term_ids)) for doc_id, counts, length in counted]
+    )
+
+    df_delta = Counter(term_ids[t] for (_, counts, _), (_, doc_type, _) in zip(counted, docs)
+                       if doc_type == "resume" for t in counts)
+    for chunk in _chunks(sorted(df_delta.items()), BULK_INSERT_CHUNK * 10):
+        cursor.executemany("UPDATE vocabulary SET df = df + %s WHERE id = %s",
+                           [(delta, term_id) for term_id, delta in chunk])
+
+def vocabulary_df(cursor):
+    """{vocabulary id: df} of every term some resume contains."""
+    cursor.execute("SELECT id, df FROM vocabulary WHERE df > 0")
+    return dict(cursor.fetchall())
+
+def _vocabulary_ids(cursor, terms):
+    term_ids = {}
+    for chunk in _chunks(terms, BULK_INSERT_CHUNK * 10):
+        marks = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"SELECT term, id FROM vocabulary WHERE term IN ({marks})", chunk)
+        term_ids.update(cursor.fetchall())
+    return term_ids
+
+# ===== Near-duplicates (see core.minhash) =====
+def _find_near_duplicate(cursor, signature):
+    """Id of the most similar stored resume sharing an LSH bucket with `signature`, if above the threshold."""
+    keys = band_keys(signature)
+    marks = ", ".join(["(%s, %s)"] * len(keys))
+    cursor.execute(f"""
+        SELECT s.doc_id, s.signature
+        FROM minhash_signatures s
+        JOIN (SELECT DISTINCT doc_id FROM minhash_buckets WHERE (band, bucket) IN ({marks})) b
+          ON b.doc_id = s.doc_id
+    """, [v for key in keys for v in key])
+    best, best_similarity = None, 0.0
+    for doc_id, blob in cursor.fetchall():
+        similarity = jaccard_estimate(signature, unpack_signature(bytes(blob)))
+        if similarity >= NEAR_DUP_THRESHOLD and similarity > best_similarity:
+            best, best_similarity = doc_id, similarity
+    return best
+
+def _store_minhash(cursor, docs):
+    """
+    Store MinHash signatures and LSH buckets of new resumes, inside the caller's
+    transaction, and link each to an earlier near-duplicate (documents.near_duplicate_of).
+
+    Args:
+        docs: list of (doc_id, doc_type, file_name, cleaned_text)
+    """
+    if NEAR_DUP_THRESHOLD <= 0:
+        return
+    for doc_id, doc_type, file_name, cleaned_text in docs:
+        if doc_type != "resume":
+            continue
+        signature = minhash_signature(cleaned_text.split())
+        if signature is None:
+            continue
+        original = _find_near_duplicate(cursor, signature)
+        if original is not None:
+            cursor.execute("UPDATE documents SET near_duplicate_of = %s WHERE id = %s", (original, doc_id))
+            print(f"Resume '{file_name}' is a near-duplicate of document {original}.")
+        cursor.execute("INSERT INTO minhash_signatures (doc_id, signature) VALUES (%s, %s)",
+                       (doc_id, pack_signature(signature)))
+        cursor.executemany("INSERT IGNORE INTO minhash_buckets (band, bucket, doc_id) VALUES (%s, %s, %s)",
+                           [(band, key, doc_id) for band, key in band_keys(signature)])
+
+def backfill_term_vectors(batch=BULK_INSERT_CHUNK):
+    """Vectorize documents stored before term_vectors existed. Returns how many were added."""
+    added = 0
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            while True:
+                cursor.execute("""
+                    SELECT d.id, d.type, d.cleaned_text
+                    FROM documents d LEFT JOIN term_vectors v ON v.doc_id = d.id
+                    WHERE v.doc_id IS NULL
+                    ORDER BY d.id
+                    LIMIT %s
+                """, (batch,))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                _store_term_vectors(cursor, rows)
+                conn.commit()
+                added += len(rows)
+        except mysql.connector.Error as err:
+            conn.rollback()
+            print("Error back-filling term vectors:", err)
+            raise
+        finally:
+            cursor.close()
+    return added
+
 def document_exists(hashed_text):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM documents WHERE hashed_text = %s", (hashed_text,))
-    result = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM documents WHERE hashed_text = %s", (hashed_text,))
+        result = cursor.fetchone()
+        cursor.close()
     return result is not None
 
 def get_document_by_hash(hashed_text):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT file_name, type, raw_text, cleaned_text, hashed_text
-        FROM documents
-        WHERE hashed_text = %s
-    """, (hashed_text,))
-    doc = cursor.fetchone()
-    conn.close()
+    with db_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT file_name, type, raw_text, cleaned_text, hashed_text
+            FROM documents
+            WHERE hashed_text = %s
+        """, (hashed_text,))
+        doc = cursor.fetchone()
+        cursor.close()
     return doc
 
 # ===== NEW: fetch latest by filename & type (used by /api/resume_detail) =====
 def get_document_by_filename(file_name, doc_type):
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("""
-        SELECT id, file_name, type, raw_text, cleaned_text, hashed_text
-        FROM documents
-        WHERE file_name = %s AND type = %s
-        ORDER BY id DESC
-        LIMIT 1
-    """, (file_name, doc_type))
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute("""
+            SELECT id, file_name, type, raw_text, cleaned_text, hashed_text
+            FROM documents
+            WHERE file_name = %s AND type = %s
+            ORDER BY id DESC
+            LIMIT 1
+        """, (file_name, doc_type))
+        row = cur.fetchone()
+        cur.close()
+    return row
+
+# ===== Resume detail (see core.resume_detail) =====
+@timed("db_resume_detail")
+def get_resume_detail(file_name):
+    """
+    Latest resume stored under `file_name` via idx_documents_file_name, with its
+    contact columns; contacts of rows stored before those columns existed are
+    extracted and written back once.
+    """
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute("""
+                SELECT id, file_name, raw_text, hashed_text, email, phone, linkedin, created_at
+                FROM documents
+                WHERE file_name = %s AND type = 'resume'
+                ORDER BY id DESC
+                LIMIT 1
+            """, (file_name,))
+            row = cur.fetchone()
+            if row and row["email"] is None:
+                row.update(extract_contacts(row["raw_text"] or ""))
+                cur.execute(
+                    "UPDATE documents SET email = %s, phone = %s, linkedin = %s WHERE id = %s",
+                    (row["email"], row["phone"], row["linkedin"], row["id"]),
+                )
+                conn.commit()
+        finally:
+            cur.close()
+    return row
+
+# ===== Content-hash cache backing (see core.text_cache) =====
+@timed("db_cache_lookup")
+def get_document_by_bytes_hash(bytes_hash):
+    """Latest document whose uploaded file bytes hash to `bytes_hash`."""
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute("""
+            SELECT raw_text, cleaned_text, hashed_text
+            FROM documents
+            WHERE bytes_hash = %s
+            ORDER BY id DESC
+            LIMIT 1
+        """, (bytes_hash,))
+        row = cur.fetchone()
+        cur.close()
     return row
+
+def _remember_bytes_hash(cursor, hashed_text, bytes_hash):
+    """Record the file-bytes hash on an existing row that predates the column."""
+    cursor.execute("""
+        UPDATE documents SET bytes_hash = %s
+        WHERE hashed_text = %s AND bytes_hash IS NULL
+    """, (bytes_hash, hashed_text))
+
+# ===== Screening runs (server-side result store) =====
+RUN_RESULT_SORTS = ("rank", "name")
+
+@timed("db_save_run")
+def save_run(run_id, user_id, results, errors):
+    """Persist a finished screening run; rows keep their ranked S.N."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO screening_runs (id, user_id, total_rows, errors)
+                VALUES (%s, %s, %s, %s)
+            """, (run_id, user_id, len(results), json.dumps(errors)))
+            for chunk in _chunks(results, BULK_INSERT_CHUNK * 10):
+                cursor.executemany("""
+                    INSERT INTO screening_run_results (run_id, sn, name, email, duplicate, score)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, [(run_id, r["sn"], r["name"], r.get("email"),
+                       r.get("duplicate"), r.get("score")) for r in chunk])
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+def get_run(run_id):
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute("""
+            SELECT id, user_id, created_at, total_rows, errors
+            FROM screening_runs WHERE id = %s
+        """, (run_id,))
+        run = cur.fetchone()
+        cur.close()
+    if run:
+        run["errors"] = json.loads(run["errors"]) if run["errors"] else []
+    return run
+
+@timed("db_run_page")
+def get_run_results(run_id, limit, sort="rank", after_sn=None, min_score=None):
+    """
+    One page of a run's rows using keyset pagination.
+
+    Args:
+        limit: page size (LIMIT)
+        sort: "rank" (S.N order: score desc, duplicates last) or "name"
+        after_sn: S.N of the last row of the previous page
+        min_score: only rows scored at least this much (uses the score index)
+    """
+    where, params = ["run_id = %s"], [run_id]
+    if min_score is not None:
+        where.append("score >= %s")
+        params.append(min_score)
+    if sort == "name":
+        order = "name, sn"
+        if after_sn is not None:
+            where.append("""(name, sn) > (
+                (SELECT name FROM screening_run_results WHERE run_id = %s AND sn = %s), %s)""")
+            params += [run_id, after_sn, after_sn]
+    else:
+        order = "sn"
+        if after_sn is not None:
+            where.append("sn > %s")
+            params.append(after_sn)
+    params.append(limit)
+
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(f"""
+            SELECT sn, name, email, duplicate, score
+            FROM screening_run_results
+            WHERE {" AND ".join(where)}
+            ORDER BY {order}
+            LIMIT %s
+        """, params)
+        rows = cur.fetchall()
+        cur.close()
+    return rows
@@ -97,10 +97,52 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     }
 
+    // Rows are paged server-side: asking for more than this page holds reloads with a bigger LIMIT
+    function reloadWith(params){
+      const url = new URL(window.location.href);
+      Object.entries(params).forEach(([k, v]) => url.searchParams.set(k, v));
+      url.searchParams.delete('after');
+      window.location.href = url.toString();
+    }
+
     // initial + live updates
     applyTop();
     topInput.addEventListener('input', applyTop);
-    topInput.addEventListener('change', applyTop);
+    topInput.addEventListener('change', () => {
+      const n = parseInt(topInput.value, 10);
+      if (!isNaN(n) && n > total && rowsTbody.dataset.hasMore === "1"){ reloadWith({ top: n }); return; }
+      applyTop();
+    });
+
+    const sortSel = document.getElementById('sortBy');
+    if (sortSel){
+      sortSel.addEventListener('change', () => reloadWith({ sort: sortSel.value }));
+    }
+  }
+
+  // ===== Screening job progress (results page) =====
+  const jobProgress = document.getElementById('job-progress');
+  if (jobProgress){
+    const progressText = document.getElementById('job-progress-text');
+    let lastScored = null;
+    const poll = async () => {
+      try {
+        const resp = await fetch(jobProgress.dataset.statusUrl);
+        const data = await resp.json();
+        if (!data.ok) return;
+        if (data.status === "done" || data.status === "failed"){ window.location.reload(); return; }
+        if (progressText){
+          progressText.textContent = `${data.files_extracted} of ${data.files_total} files extracted, ${data.files_scored} scored`;
+        }
+        // reload to show a newer partial ranking
+        if (lastScored !== null && data.files_scored !== lastScored){ window.location.reload(); return; }
+        lastScored = data.files_scored;
+      } catch (err) {
+        console.error(err);
+      }
+      setTimeout(poll, 1500);
+    };
+    setTimeout(poll, 1000);
   }
 
   // ===== Resume Detail Modal (LinkedIn removed) =====
@@ -110,6 +152,8 @@ document.addEventListener("DOMContentLoaded", () => {
   const modalPhone = $("#modal-phone");
   const modalText  = $("#modal-text");
   const modalClose = $("#modal-close");
+  // Characters of resume text shown in the modal (the API truncates server-side)
+  const MODAL_TEXT_LIMIT = 20000;
 
   function openModal(){ if(modal){ modal.classList.add("open"); modal.setAttribute("aria-hidden","false"); } }
   function closeModal(){ if(modal){ modal.classList.remove("open"); modal.setAttribute("aria-hidden","true"); } }
@@ -124,14 +168,14 @@ document.addEventListener("DOMContentLoaded", () => {
     e.preventDefault();
     const filename = link.dataset.filename;
     try {
-      const resp = await fetch(`/api/resume_detail?file=${encodeURIComponent(filename)}`);
+      const resp = await fetch(`/api/resume_detail?file=${encodeURIComponent(filename)}&limit=${MODAL_TEXT_LIMIT}`);
       const data = await resp.json();
       if (!data.ok) throw new Error(data.error || "Failed to load resume detail");
 
       if (modalTitle) modalTitle.textContent = data.filename || "Resume";
       if (modalEmail) modalEmail.textContent = data.email || "—";
       if (modalPhone) modalPhone.textContent = data.phone || "—";
-      if (modalText)  modalText.textContent  = data.text || "";
+      if (modalText)  modalText.textContent  = (data.text || "") + (data.truncated ? "\n…" : "");
 
       openModal();
     } catch (err) {
@@ -0,0 +1,97 @@
+import asyncio
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+_TMP = tempfile.mkdtemp(prefix="resume-asgi-test-")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("JOB_DB_PATH", os.path.join(_TMP, "jobs.db"))
+os.environ.setdefault("JOB_DIR", os.path.join(_TMP, "jobs"))
+
+from werkzeug.test import EnvironBuilder
+
+from app import app
+from asgi import WsgiBridge
+from benchmarks.corpus import make_corpus, make_pdf
+
+def call(bridge, method, path, body=b"", headers=(), chunk_size=1000):
+    """Drive one ASGI http request; returns (status, headers dict, body)."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+                for i, c in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+             "path": path, "query_string": query.encode(), "root_path": "",
+             "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+             "server": ("testserver", 80), "client": ("127.0.0.1", 5000)}
+    asyncio.run(bridge(scope, receive, send))
+    start, content = sent
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, content["body"]
+
+class TestAsgiBridge(unittest.TestCase):
+    def setUp(self):
+        self.bridge = WsgiBridge(app, threads=2, spool_memory=4096)
+        cookie = app.session_interface.get_signing_serializer(app).dumps({"user_id": 1})
+        self.cookie = ("Cookie", f"{app.config['SESSION_COOKIE_NAME']}={cookie}")
+
+    def test_process_upload_is_spooled_and_enqueued(self):
+        jd_text, resumes = make_corpus(2, seed=1)
+        builder = EnvironBuilder(method="POST", data={
+            "jd_file": (io.BytesIO(make_pdf(jd_text)), "jd.pdf"),
+            "resume_files": [(io.BytesIO(make_pdf(text)), name) for name, text in resumes],
+        })
+        environ = builder.get_environ()
+        body = environ["wsgi.input"].read()
+        self.assertGreater(len(body), 4096)   # past spool_memory: parsed from disk
+
+        status, headers, content = call(self.bridge, "POST", "/process", body, [
+            ("Content-Type", environ["CONTENT_TYPE"]), ("Accept", "application/json"), self.cookie])
+        self.assertEqual(status, 202, content)
+        self.assertIn('"job_id"', content.decode())
+        self.assertIn("set-cookie", headers)
+
+    def test_oversized_body_is_refused(self):
+        bridge = WsgiBridge(app, threads=1, spool_memory=4096, max_body=1000)
+        self.assertEqual(app.config["MAX_CONTENT_LENGTH"], WsgiBridge(app, threads=1).max_body)
+        # Declared too large: refused before reading; streamed (no length) past the cap: refused mid-body
+        for headers in ([("Content-Length", "5000"), self.cookie], [self.cookie]):
+            status, headers, content = call(bridge, "POST", "/process", b"x" * 5000, headers)
+            self.assertEqual(status, 413)
+            self.assertEqual(headers["connection"], "close")
+
+    def test_lifespan_startup_starts_the_job_workers(self):
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        bridge = WsgiBridge(app, threads=1)
+        with mock.patch("asgi.start_workers") as start:
+            asyncio.run(bridge({"type": "lifespan"}, receive, send))
+        start.assert_called_once_with()
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+
+    def test_query_string_and_login_redirect(self):
+        status, _, content = call(self.bridge, "GET", "/api/resume_detail?file=", headers=[self.cookie])
+        self.assertEqual(status, 400)
+        self.assertIn(b"Missing 'file' parameter", content)
+        status, headers, _ = call(self.bridge, "GET", "/results")
+        self.assertEqual(status, 302)
+        self.assertIn("/login", headers["location"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+import numpy as np
+
+from core.batch_screening import score_matrix
+from core.similarity import cosine_similarity_batch
+from core.tf_idf import compute_tfidf_matrix
+
+class TestBatchScreening(unittest.TestCase):
+    def setUp(self):
+        self.resumes = [
+            "python flask sql api".split(),
+            "excel sales marketing".split(),
+            "sql python python docker".split(),
+            [],
+        ]
+
+    def test_single_jd_matches_pipeline_scores(self):
+        jd = "python flask sql docker".split()
+        priority = {"python", "docker"}
+        matrix, _ = compute_tfidf_matrix([jd] + self.resumes, boost_terms=priority, boost_factor=1.5)
+        expected = cosine_similarity_batch(matrix[0], matrix[1:])
+        scores = score_matrix([jd], self.resumes, [priority])
+        self.assertEqual(scores.shape, (4, 1))
+        np.testing.assert_allclose(scores[:, 0], expected, atol=1e-12)
+
+    def test_each_jd_boosts_its_own_terms(self):
+        jds = ["python sql".split(), "python sql".split()]
+        scores = score_matrix(jds, self.resumes, [{"python"}, set()])
+        self.assertGreater(scores[2, 0], scores[2, 1])   # resume 2 is python-heavy
+        self.assertEqual(scores[3].tolist(), [0.0, 0.0])
+        self.assertEqual(score_matrix([], self.resumes).shape, (4, 0))
+
+if __name__ == "__main__":
+    unittest.main()
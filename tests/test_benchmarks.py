@@ -0,0 +1,25 @@
+import unittest
+
+from benchmarks.corpus import make_corpus, make_pdf
+from benchmarks.run import compare, run_benchmarks
+from core.extract import extract_text
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generated_pdf_round_trips(self):
+        _, resumes = make_corpus(1, seed=5)
+        text = resumes[0][1] + "\n" + "\n".join(f"line {i}" for i in range(60))   # spans two pages
+        self.assertEqual(extract_text(make_pdf(text)).split(), text.split())
+
+    def test_report_and_baseline_comparison(self):
+        results = run_benchmarks([10], ["compute_tfidf", "rank_resumes_simple"], memory=False,
+                                 caps={"max_simple": 5}, log=lambda _: None)
+        self.assertEqual(results[0]["items"], 11)
+        self.assertIn("skipped", results[1])
+
+        baseline = {"results": [dict(results[0], seconds=results[0]["seconds"] / 2)]}
+        (row,) = compare(results, baseline, tolerance=0.2)
+        self.assertTrue(row["regression"])
+        self.assertAlmostEqual(row["time_ratio"], 2.0, places=2)
+
+if __name__ == "__main__":
+    unittest.main()
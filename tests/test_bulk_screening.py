@@ -0,0 +1,74 @@
+import os
+import random
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.corpus import make_pdf, make_resume
+from core import bulk_screening
+
+class TestBulkScreening(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.jd = os.path.join(self.tmp, "jd.pdf")
+        with open(self.jd, "wb") as fh:
+            fh.write(make_pdf("Requirements\npython flask sql\n"))
+        self.dir = os.path.join(self.tmp, "resumes")
+        os.makedirs(self.dir)
+        texts = {"a.pdf": "python flask sql developer", "b.pdf": "excel sales",
+                 "c.pdf": "python flask sql developer", "d.pdf": "python docker"}
+        for name, text in texts.items():
+            with open(os.path.join(self.dir, name), "wb") as fh:
+                fh.write(make_pdf(text))
+        with open(os.path.join(self.dir, "e.pdf"), "wb") as fh:
+            fh.write(b"not a pdf")
+
+    def screen(self, source, **kwargs):
+        conn, _ = bulk_screening.screen_directory(
+            self.jd, [source], os.path.join(self.tmp, "ck.db"), workers=1, **kwargs)
+        try:
+            return list(bulk_screening.ranked_rows(conn))
+        finally:
+            conn.close()
+
+    def test_ranking_and_per_file_policy(self):
+        rows = self.screen(self.dir)
+        self.assertEqual([r["name"] for r in rows], ["a.pdf", "d.pdf", "b.pdf", "c.pdf"])
+        self.assertEqual(rows[-1]["duplicate"], "Duplicate of a.pdf")
+        self.assertIsNone(rows[-1]["score"])
+
+        archive = os.path.join(self.tmp, "resumes.tar.gz")
+        with tarfile.open(archive, "w:gz") as tf:
+            tf.add(self.dir, arcname=".")
+        from_tar = self.screen(archive, restart=True)
+        self.assertEqual([(os.path.basename(r["name"]), r["score"]) for r in from_tar],
+                         [(r["name"], r["score"]) for r in rows])
+
+    def test_near_duplicates_are_listed_not_scored(self):
+        text = make_resume(random.Random(3), 1)
+        with open(os.path.join(self.dir, "f.pdf"), "wb") as fh:
+            fh.write(make_pdf(text))
+        with open(os.path.join(self.dir, "g.pdf"), "wb") as fh:
+            fh.write(make_pdf(text.replace("Summary", "Profile")))
+        rows = self.screen(self.dir)
+        self.assertEqual(rows[-1], {"sn": 6, "name": "g.pdf", "email": "candidate1@example.com",
+                                    "duplicate": "Near-duplicate of f.pdf", "score": None})
+
+    def test_resumes_from_checkpoint_after_crash(self):
+        expected = self.screen(self.dir)
+
+        def crash(phase, done, total):
+            if done == 3:
+                raise KeyboardInterrupt
+        with mock.patch.object(bulk_screening, "CHECKPOINT_EVERY", 1):
+            with self.assertRaises(KeyboardInterrupt):
+                self.screen(self.dir, restart=True, progress=crash)
+
+        seen = []
+        self.assertEqual(self.screen(self.dir, progress=lambda *args: seen.append(args)), expected)
+        # only the inputs after the checkpoint were extracted again
+        self.assertEqual([done for phase, done, _ in seen if phase == "extract"], [4, 5])
+
+if __name__ == "__main__":
+    unittest.main()
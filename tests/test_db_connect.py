@@ -0,0 +1,219 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from database import db_connect
+
+class FakeSchema:
+    """Just enough of a MySQL connection for ensure_schema: tables and columns come into existence on DDL."""
+
+    def __init__(self):
+        self.ddl = []
+        self.lock = threading.Lock()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+class FakeCursor:
+    def __init__(self, schema):
+        self.schema = schema
+        self.row = None
+
+    def execute(self, sql, params=()):
+        if "GET_LOCK" in sql:
+            self.row = (1,)
+        elif "information_schema" in sql:
+            with self.schema.lock:
+                table, name = f"TABLE {params[0]}", params[-1]
+                self.row = (1,) if any(table in d and name in d for d in self.schema.ddl) else None
+            time.sleep(0.01)   # widen the window between the check and the DDL
+        elif not sql.startswith("DO "):
+            with self.schema.lock:
+                self.schema.ddl.append(sql)
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+class TestEnsureSchema(unittest.TestCase):
+    def test_concurrent_first_checkouts_apply_each_update_once(self):
+        schema = FakeSchema()
+        with mock.patch.object(db_connect, "_schema_ready", False):
+            threads = [threading.Thread(target=db_connect.ensure_schema, args=(schema,)) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(schema.ddl), len(db_connect.SCHEMA_UPDATES))
+
+class FakePool:
+    """Hands out one connection at a time; close() returns it."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.out = False
+        conn.close = self.put_back
+
+    def get_connection(self):
+        if self.out:
+            raise db_connect.mysql.connector.errors.PoolError("Failed getting connection; pool exhausted")
+        self.out = True
+        return self.conn
+
+    def put_back(self):
+        self.out = False
+
+class TestGetConnection(unittest.TestCase):
+    def setUp(self):
+        self.pool = FakePool(mock.Mock(is_connected=mock.Mock(return_value=True)))
+        patches = [mock.patch.object(db_connect, "_get_pool", return_value=self.pool),
+                   mock.patch.object(db_connect, "DB_POOL_TIMEOUT", 0.1),
+                   mock.patch.object(db_connect, "_schema_ready", False)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_checkout_is_returned_by_db_connection(self):
+        with mock.patch.object(db_connect, "ensure_schema"):
+            with db_connect.db_connection() as conn:
+                self.assertIs(conn, self.pool.conn)
+                self.assertTrue(self.pool.out)
+            self.assertFalse(self.pool.out)
+
+    def test_failed_schema_check_returns_the_connection(self):
+        error = db_connect.mysql.connector.errors.OperationalError("Timed out waiting for the schema lock")
+        with mock.patch.object(db_connect, "ensure_schema", side_effect=error):
+            with self.assertRaises(db_connect.mysql.connector.errors.OperationalError):
+                db_connect.get_connection()
+        self.assertFalse(self.pool.out)
+        with mock.patch.object(db_connect, "ensure_schema"):
+            self.assertIs(db_connect.get_connection(), self.pool.conn)
+
+class RecordingCursor:
+    """Records executemany calls; vocabulary lookups find `known` (term -> id)."""
+
+    def __init__(self, known):
+        self.known = known
+        self.calls = []
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        self.rows = [(t, self.known[t]) for t in params if t in self.known] if "FROM vocabulary" in sql else []
+
+    def executemany(self, sql, rows):
+        self.calls.append((sql.split()[0], rows))
+        if sql.startswith("INSERT IGNORE INTO vocabulary"):
+            for (term,) in rows:
+                self.known.setdefault(term, 100 + len(self.known))
+
+    def fetchall(self):
+        return self.rows
+
+class TestTermVectorStore(unittest.TestCase):
+    def test_df_is_bumped_for_resume_terms_in_id_order(self):
+        cursor = RecordingCursor({"sql": 9, "python": 4})
+        db_connect._store_term_vectors(cursor, [(1, "resume", "sql python python flask"),
+                                                (2, "job", "python docker"),
+                                                (3, "resume", "python")])
+        [df_rows] = [rows for verb, rows in cursor.calls if verb == "UPDATE"]
+        flask = cursor.known["flask"]
+        self.assertEqual(df_rows, sorted([(2, 4), (1, 9), (1, flask)], key=lambda r: r[1]))
+
+class DocumentsCursor:
+    """An in-memory documents table for insert_documents_bulk; ids skip like a busy auto-increment."""
+
+    def __init__(self, stored=()):
+        self.rows = {h: {"id": i, "bytes_hash": None} for i, h in enumerate(stored, start=1)}
+        self.next_id = len(self.rows) + 10
+        self.calls = []
+        self.result = []
+
+    def execute(self, sql, params=()):
+        self.calls.append(("execute", sql.split()[0], len(params)))
+        if sql.startswith("SELECT hashed_text FROM documents"):
+            self.result = [(h,) for h in params if h in self.rows]
+        elif sql.startswith("SELECT id, hashed_text FROM documents"):
+            self.result = [(self.rows[h]["id"], h) for h in params if h in self.rows]
+
+    def executemany(self, sql, rows):
+        verb = sql.split()[0]
+        self.calls.append(("executemany", verb, len(rows)))
+        if verb == "INSERT":
+            for row in rows:
+                self.rows[row[4]] = {"id": self.next_id, "bytes_hash": row[5]}
+                self.next_id += 2
+        elif verb == "UPDATE":
+            for bytes_hash, hashed_text in rows:
+                if self.rows[hashed_text]["bytes_hash"] is None:
+                    self.rows[hashed_text]["bytes_hash"] = bytes_hash
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+def _doc(name, text, bytes_hash=None):
+    return {"file_name": name, "type": "resume", "raw_text": text, "cleaned_text": text.lower(),
+            "bytes_hash": bytes_hash}
+
+def _text_hash(text):
+    return db_connect.hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class TestInsertDocumentsBulk(unittest.TestCase):
+    def setUp(self):
+        self.cursor = DocumentsCursor(stored=[_text_hash("Stored resume")])
+        self.conn = mock.Mock(cursor=mock.Mock(return_value=self.cursor))
+        self.stored_vectors, self.indexed = [], []
+        patches = [
+            mock.patch.object(db_connect, "get_connection", return_value=self.conn),
+            mock.patch.object(db_connect, "BULK_INSERT_CHUNK", 2),
+            mock.patch.object(db_connect, "_store_term_vectors",
+                              side_effect=lambda cur, docs: self.stored_vectors.extend(docs)),
+            mock.patch.object(db_connect, "_store_minhash"),
+            mock.patch("core.inverted_index.index_documents", side_effect=self.indexed.extend),
+            mock.patch("core.resume_detail.detail_cache"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_new_rows_are_inserted_in_chunks_and_get_their_ids(self):
+        docs = [_doc(f"r{i}.pdf", f"Resume {i}") for i in range(5)]
+        inserted, existing = db_connect.insert_documents_bulk(docs)
+
+        self.assertEqual(inserted, docs)
+        self.assertEqual(existing, [])
+        inserts = [n for kind, verb, n in self.cursor.calls if kind == "executemany" and verb == "INSERT"]
+        self.assertEqual(inserts, [2, 2, 1])
+        # Ids are read back, not assumed consecutive
+        self.assertEqual([d["id"] for d in docs], [11, 13, 15, 17, 19])
+        self.assertEqual([doc_id for doc_id, _, _ in self.stored_vectors], [11, 13, 15, 17, 19])
+        self.assertEqual([doc_id for doc_id, _, _ in self.indexed], [11, 13, 15, 17, 19])
+        self.conn.commit.assert_called_once()
+
+    def test_stored_and_repeated_texts_count_as_existing(self):
+        new, stored = _doc("new.pdf", "New resume"), _doc("old.pdf", "Stored resume", bytes_hash="b1")
+        repeat = _doc("copy.pdf", "New resume")
+        inserted, existing = db_connect.insert_documents_bulk([new, stored, repeat])
+
+        self.assertEqual(inserted, [new])
+        self.assertEqual(existing, [repeat, stored])
+        inserts = [n for kind, verb, n in self.cursor.calls if kind == "executemany" and verb == "INSERT"]
+        self.assertEqual(inserts, [1])
+        # The stored row learns the upload's bytes hash in the same transaction
+        self.assertEqual(self.cursor.rows[_text_hash("Stored resume")]["bytes_hash"], "b1")
+        self.assertNotIn("id", stored)
+
+    def test_empty_batch_skips_the_connection(self):
+        self.assertEqual(db_connect.insert_documents_bulk([]), ([], []))
+        db_connect.get_connection.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
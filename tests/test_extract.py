@@ -0,0 +1,37 @@
+import unittest
+from unittest import mock
+
+from benchmarks.corpus import make_pdf
+from core.extract import extract_text, extract_email, PdfTooLarge
+from core.extract_pool import extract_and_clean
+from core.screening import truncation_message
+
+class TestExtract(unittest.TestCase):
+    def test_size_limit_is_checked_before_parsing(self):
+        with self.assertRaises(PdfTooLarge):
+            extract_text(b"%PDF-" + b"0" * 2048, max_bytes=1024)
+
+    def test_page_limit_truncation_is_reported(self):
+        pdf = make_pdf("\n".join(f"page{i}" for i in range(3)), lines_per_page=1)
+        notes = []
+        self.assertEqual(extract_text(pdf, max_pages=2, notes=notes).split(), ["page0", "page1"])
+        self.assertEqual(notes, ["truncated at 2 of 3 pages (page limit)"])
+
+        notes = []
+        extract_text(pdf, max_pages=5, notes=notes)
+        self.assertEqual(notes, [])
+
+    def test_truncated_extraction_gets_a_per_file_note(self):
+        pdf = make_pdf("one\ntwo", lines_per_page=1)
+        with mock.patch("core.extract.MAX_PDF_PAGES", 1):
+            extracted = extract_and_clean(pdf)
+        self.assertEqual(truncation_message("cv.pdf", extracted),
+                         "'cv.pdf' was truncated at 1 of 2 pages (page limit); only that part was screened.")
+        self.assertIsNone(truncation_message("cv.pdf", extract_and_clean(pdf)))
+
+    def test_extract_email(self):
+        self.assertEqual(extract_email("Contact: jane.doe@example.com, +1 555"), "jane.doe@example.com")
+        self.assertEqual(extract_email("no email here"), "")
+
+if __name__ == "__main__":
+    unittest.main()
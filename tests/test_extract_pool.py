@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core import extract_pool
+from core.extract_pool import Extracted, ExtractionTimeout, extract_many
+from core.text_cache import TextCache, file_bytes_hash
+
+class TestExtractPool(unittest.TestCase):
+    def test_results_keep_input_order(self):
+        items = [("a.pdf", b"not a pdf"), ("b.pdf", None), ("c.pdf", b"still not a pdf")]
+        for workers in (1, 2):
+            out = list(extract_many(iter(items), workers=workers, timeout=10, max_in_flight=1, cache=None))
+            self.assertEqual([key for key, _, _ in out], ["a.pdf", "b.pdf", "c.pdf"])
+            # unreadable bytes surface as per-file errors, None payloads pass through
+            self.assertIsNotNone(out[0][2])
+            self.assertEqual(out[1][1:], (None, None))
+    def test_cache_hit_skips_parsing(self):
+        cache = TextCache(loader=None)
+        cache.put(file_bytes_hash(b"not a pdf"), "raw text", "raw text", "h")
+        [(key, extracted, err)] = extract_many(iter([("a.pdf", b"not a pdf")]), workers=1, cache=cache)
+        self.assertIsNone(err)
+        self.assertEqual(extracted.raw_text, "raw text")
+
+def slow_on_hang(source, bytes_hash=None):
+    """extract_and_clean stand-in (module level, so fork workers see the patch) that hangs on b'hang'."""
+    if source == b"hang":
+        time.sleep(60)
+    if source.startswith(b"slow"):
+        time.sleep(0.7)
+    return Extracted(source.decode(), source.decode(), source.decode(), bytes_hash)
+
+class TestExtractPoolTimeout(unittest.TestCase):
+    def setUp(self):
+        # Pools are long-lived: start a fresh one with the patched worker body
+        extract_pool.shutdown_pools()
+        self.addCleanup(extract_pool.shutdown_pools)
+        patches = [mock.patch.object(extract_pool, "EXTRACT_START_METHOD", "fork"),
+                   mock.patch.object(extract_pool, "extract_and_clean", slow_on_hang)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_timed_out_workers_are_replaced(self):
+        items = [("a", b"hang"), ("b", b"hang"), ("c", b"ok c"), ("d", b"ok d")]
+        start = time.monotonic()
+        out = list(extract_many(iter(items), workers=2, timeout=1, max_in_flight=4, cache=None))
+        # Both workers were stuck; without a new pool c and d would time out as well
+        self.assertIsInstance(out[0][2], ExtractionTimeout)
+        self.assertIsInstance(out[1][2], ExtractionTimeout)
+        self.assertEqual([(k, e.raw_text if e else None) for k, e, _ in out[2:]], [("c", "ok c"), ("d", "ok d")])
+        self.assertLess(time.monotonic() - start, 20)
+
+    def test_pool_is_reused_across_calls(self):
+        list(extract_many(iter([("a", b"ok a"), ("b", b"ok b")]), workers=2, timeout=5, cache=None))
+        pool = extract_pool._pools[2]._pool
+        list(extract_many(iter([("c", b"ok c"), ("d", b"ok d")]), workers=2, timeout=5, cache=None))
+        self.assertIs(extract_pool._pools[2]._pool, pool)
+
+    def test_time_queued_behind_other_files_does_not_count(self):
+        # Another run keeps both workers busy for ~1.4s; b waits that long in the queue, then runs quickly
+        slow = [(f"s{i}", b"slow %d" % i) for i in range(4)]
+        other = []
+        thread = threading.Thread(target=lambda: other.extend(
+            extract_many(iter(slow), workers=2, timeout=1, max_in_flight=4, cache=None)))
+        thread.start()
+        time.sleep(0.2)
+        out = list(extract_many(iter([("b", b"ok b")]), workers=2, timeout=1, cache=None))
+        thread.join()
+        self.assertEqual([(k, e.raw_text if e else err) for k, e, err in out], [("b", "ok b")])
+        self.assertEqual([err for _, _, err in other], [None] * 4)
+
+class TestTextCache(unittest.TestCase):
+    def test_evicts_least_recently_used_by_size(self):
+        cache = TextCache(max_bytes=1000, loader=None)
+        cache.put("a", "x" * 200, "x" * 100, "ha")
+        cache.put("b", "y" * 200, "y" * 100, "hb")
+        cache.get("a")                                 # a is now most recent
+        cache.put("c", "z" * 200, "z" * 100, "hc")     # over budget -> evict b
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from core.idf_model import IdfModel, sync_pool_model
+from core.tf_idf import compute_tfidf, compute_idf
+
+class TestIdfModel(unittest.TestCase):
+    def setUp(self):
+        self.jd = "python flask sql".split()
+        self.pool = ["python flask api".split(), "excel sales".split(), "sql python python".split()]
+
+    def test_tfidf_with_model_matches_full_recompute(self):
+        model = IdfModel.from_docs(self.pool)
+        expected = compute_tfidf([self.jd] + self.pool, boost_terms=set(self.jd))
+        self.assertEqual(compute_tfidf([self.jd] + self.pool, boost_terms=set(self.jd), idf_model=model), expected)
+
+    def test_add_remove_and_snapshot(self):
+        model = IdfModel.from_docs(self.pool + [["java", "python"]])
+        model.remove(["java", "python"])
+        self.assertEqual(model.df, IdfModel.from_docs(self.pool).df)
+
+        path = os.path.join(tempfile.mkdtemp(), "idf.json")
+        model.snapshot(path)
+        loaded = IdfModel.load(path)
+        self.assertEqual((loaded.df, loaded.n_docs), (model.df, model.n_docs))
+        terms = sorted(model.df)
+        all_docs = self.pool
+        self.assertEqual(loaded.idf(terms).tolist(), [compute_idf(all_docs)[t] for t in terms])
+
+    def test_sync_folds_in_only_new_documents(self):
+        model = IdfModel()
+        model = sync_pool_model([(1, [10, 11]), (2, [11])], model=model)
+        seen = []
+        model = sync_pool_model([(1, [10, 11]), (2, [11]), (5, [12])], model=model,
+                                terms_of=lambda doc: seen.append(doc) or doc)
+        self.assertEqual(seen, [[12]])
+        self.assertEqual((model.n_docs, model.watermark, model.df), (3, 5, {10: 1, 11: 2, 12: 1}))
+
+    def test_out_of_step_model_is_rebuilt_from_the_recount(self):
+        model = IdfModel({10: 2, 11: 1, 12: 1}, n_docs=3, watermark=5)   # the pool only has 2 resumes
+        reads = []
+        model = sync_pool_model(lambda after: reads.append(after) or iter([]), model=model, total=2,
+                                recount=lambda: ({10: 2, 11: 1}, 2, 7))
+        self.assertEqual(reads, [5])   # never re-read from the start
+        self.assertEqual((model.n_docs, model.watermark, model.df), (2, 7, {10: 2, 11: 1}))
+
+    def test_dense_idf_matches_per_key_lookup(self):
+        model = IdfModel.from_docs([[0, 3], [3, 4], [4]])
+        extra = [1, 0, 0, 1, 0, 0]
+        self.assertEqual(model.dense_idf(6, extra, 1).tolist(), model.idf(list(range(6)), extra, 1).tolist())
+        model.add([5])   # the cached array follows updates
+        self.assertEqual(model.dense_df(6).tolist(), [1, 0, 0, 2, 2, 1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import math
+import random
+import unittest
+from collections import Counter
+
+from core.inverted_index import InvertedIndex
+from core.tf_idf import compute_idf
+
+def random_rows(seed, n_docs=200, n_terms=300):
+    rng = random.Random(seed)
+    vocab = [f"t{i}" for i in range(n_terms)]
+    rows = [
+        (i, f"R{i}.pdf", " ".join(rng.choice(vocab[: rng.randint(20, n_terms)]) for _ in range(80)))
+        for i in range(1, n_docs + 1)
+    ]
+    return rows, [rng.choice(vocab) for _ in range(40)]
+
+class TestInvertedIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = InvertedIndex(":memory:")
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_only_matching_resumes_are_returned(self):
+        self.index.add_document(1, "A.pdf", "python flask api python".split())
+        self.index.add_document(2, "B.pdf", "excel powerpoint".split())
+        self.index.add_document(3, "C.pdf", "flask excel".split())
+
+        results = self.index.search("python flask".split(), top_k=None)
+        names = [name for name, _ in results]
+        self.assertEqual(names[0], "A.pdf")
+        self.assertNotIn("B.pdf", names)
+
+    def test_pruned_top_k_matches_full_ranking(self):
+        rows, query = random_rows(7)
+        self.index.rebuild(lambda: iter(rows))
+
+        full = self.index.search(query, top_k=None)
+        top = self.index.search(query, top_k=10)
+        self.assertEqual([n for n, _ in top], [n for n, _ in full[:10]])
+        for (_, a), (_, b) in zip(top, full):
+            self.assertAlmostEqual(a, b, places=12)
+
+    def test_incremental_inserts_match_a_rebuilt_index(self):
+        rows, query = random_rows(11)
+        rebuilt = InvertedIndex(":memory:")
+        self.addCleanup(rebuilt.close)
+        rebuilt.rebuild(lambda: iter(rows))
+        for doc_id, name, text in reversed(rows):
+            self.index.add_document(doc_id, name, text.split())
+            if doc_id % 50 == 0:
+                self.index.search(query)   # bounds kept by later inserts stay valid
+
+        for top_k in (None, 10):
+            self.assertEqual(self.index.search(query, top_k=top_k), rebuilt.search(query, top_k=top_k))
+
+    def test_scores_match_the_lnc_ltc_model(self):
+        rows, query = random_rows(3)
+        self.index.rebuild(lambda: iter(rows))
+        found = dict(self.index.search(query, top_k=None))
+
+        idf = compute_idf([query] + [text.split() for _, _, text in rows])
+        q = {t: c * idf[t] for t, c in Counter(query).items()}
+        q_norm = math.sqrt(sum(w * w for w in q.values()))
+        for _, name, text in rows:
+            d = Counter(text.split())
+            d_norm = math.sqrt(sum(c * c for c in d.values()))
+            expected = sum(w * d[t] for t, w in q.items()) / (q_norm * d_norm)
+            self.assertAlmostEqual(found.get(name, 0.0), expected, places=12)
+
+    def test_search_reads_only_the_query_terms(self):
+        rows, query = random_rows(5)
+        self.index.rebuild(lambda: iter(rows))
+        statements = []
+        self.index._conn.set_trace_callback(statements.append)
+        self.index.search(query, top_k=5)
+        self.index._conn.set_trace_callback(None)
+        reads = [s for s in statements if "FROM postings" in s or "FROM terms" in s]
+        self.assertTrue(reads)
+        # Every postings / terms read is restricted to one or a list of query terms
+        self.assertTrue(all("WHERE term = " in s or "WHERE term IN (" in s for s in reads), reads)
+
+    def test_removal_updates_bounds(self):
+        self.index.add_document(1, "A.pdf", ["python"])
+        self.index.add_document(2, "B.pdf", "python java java java".split())
+        self.index.remove_document(1)
+        df, bound = self.index._conn.execute("SELECT df, max_weight FROM terms WHERE term = 'python'").fetchone()
+        self.assertEqual((df, self.index.n_docs), (1, 1))
+        self.assertAlmostEqual(bound, 1 / math.sqrt(10))
+
+    def test_remove_document(self):
+        self.index.add_document(1, "A.pdf", ["python"])
+        self.index.remove_document(1)
+        self.assertEqual(self.index.n_docs, 0)
+        self.assertEqual(self.index.search(["python"]), [])
+
+if __name__ == "__main__":
+    unittest.main()
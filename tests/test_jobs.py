@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from core import jobs
+
+class TestJobClaims(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp(prefix="resume-jobs-test-")
+        patches = [
+            mock.patch.object(jobs, "JOB_DB_PATH", os.path.join(tmp, "jobs.db")),
+            mock.patch.object(jobs, "JOB_DIR", os.path.join(tmp, "jobs")),
+            mock.patch.object(jobs, "JOB_WORKERS", 0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.job_dir = os.path.join(jobs.JOB_DIR, "job1")
+        os.makedirs(self.job_dir)
+        jobs._insert_job("job1", 1, "screen", 1, [["a.pdf", None]])
+
+    def test_heartbeat_keeps_a_running_job_claimed(self):
+        claim = jobs._claim_next()[-1]
+        with mock.patch.object(jobs, "JOB_STALE_SECONDS", 0.3):
+            with jobs._Heartbeat("job1", claim, interval=0.05):
+                time.sleep(0.6)
+                self.assertIsNone(jobs._claim_next())
+            time.sleep(0.4)
+            reclaimed = jobs._claim_next()
+        self.assertEqual(reclaimed[0], "job1")
+        self.assertNotEqual(reclaimed[-1], claim)
+
+    def test_superseded_run_stops_and_keeps_the_job_dir(self):
+        stale = jobs._claim_next()
+        with mock.patch.object(jobs, "JOB_STALE_SECONDS", -1):
+            jobs._claim_next()   # handed to another worker
+
+        steps = []
+        def screening(jd_path, payloads, progress):
+            progress(1, None, None)
+            steps.append("kept going")
+
+        with mock.patch.object(jobs, "run_screening", side_effect=screening):
+            jobs.run_job(*stale)
+        self.assertEqual(steps, [])
+        self.assertTrue(os.path.isdir(self.job_dir))
+        self.assertEqual(jobs.get_job("job1")["status"], "running")
+
+class TestWorkerStartup(unittest.TestCase):
+    def test_importing_the_app_starts_no_workers(self):
+        tmp = tempfile.mkdtemp(prefix="resume-jobs-test-")
+        env = dict(os.environ, JOB_WORKERS="2", JOB_DB_PATH=os.path.join(tmp, "jobs.db"),
+                   JOB_DIR=os.path.join(tmp, "jobs"))
+        out = subprocess.run([sys.executable, "-c", "import asgi; from core import jobs; print(jobs._pool)"],
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "None")
+        self.assertFalse(os.path.exists(env["JOB_DB_PATH"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+
+from app import app
+from core import metrics
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        h = metrics.Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.observe(v, "x")
+        lines = h.render()
+        self.assertIn('t_seconds_bucket{stage="x",le="0.1"} 2', lines)
+        self.assertIn('t_seconds_bucket{stage="x",le="1.0"} 3', lines)
+        self.assertIn('t_seconds_bucket{stage="x",le="+Inf"} 4', lines)
+        self.assertIn('t_seconds_count{stage="x"} 4', lines)
+
+    def test_trace_sums_stages_and_worker_timings(self):
+        @metrics.timed("unit_stage")
+        def work():
+            return 42
+
+        with mock.patch.object(metrics.logger, "info") as log, metrics.trace("unit", job_id="j") as t:
+            self.assertEqual(work(), 42)
+            work()
+            metrics.replay({"unit_remote": [0.25, 0.25]})
+            metrics.count("unit_event")
+        self.assertEqual(t.stages["unit_stage"][1], 2)
+        self.assertEqual(t.stages["unit_remote"], [0.5, 2])
+        self.assertEqual(t.counts, {"unit_event": 1})
+        self.assertIn('"job_id": "j"', log.call_args[0][0])
+
+    def test_replayed_calls_are_observed_one_by_one(self):
+        with metrics.capture() as stages:
+            for _ in range(3):
+                with metrics.timed("unit_worker"):
+                    pass
+        self.assertEqual(len(stages["unit_worker"]), 3)
+
+        metrics.replay({"unit_replayed": [0.002, 0.003, 0.004, 2.0]})
+        lines = metrics.render_prometheus().splitlines()
+        self.assertIn('screening_stage_seconds_count{stage="unit_replayed"} 4', lines)
+        self.assertIn('screening_stage_seconds_bucket{stage="unit_replayed",le="0.005"} 3', lines)
+        self.assertIn('screening_stage_seconds_bucket{stage="unit_replayed",le="1.0"} 3', lines)
+
+    def test_disabled_records_nothing(self):
+        with mock.patch.object(metrics, "METRICS_ENABLED", False):
+            with metrics.trace("unit") as t, metrics.timed("unit_disabled"):
+                pass
+        self.assertIsNone(t)
+        self.assertNotIn("unit_disabled", metrics.render_prometheus())
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_requires_a_session_without_a_token(self):
+        with mock.patch.object(metrics, "METRICS_TOKEN", ""):
+            self.assertEqual(self.client.get("/metrics").status_code, 401)
+            with self.client.session_transaction() as sess:
+                sess["user_id"] = 1
+            self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_token_is_checked_when_configured(self):
+        with mock.patch.object(metrics, "METRICS_TOKEN", "s3cret"):
+            self.assertEqual(self.client.get("/metrics").status_code, 401)
+            wrong = self.client.get("/metrics", headers={"Authorization": "Bearer nope"})
+            self.assertEqual(wrong.status_code, 401)
+            ok = self.client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+            self.assertEqual(ok.status_code, 200)
+            self.assertTrue(ok.mimetype.startswith("text/plain"))
+
+if __name__ == "__main__":
+    unittest.main()
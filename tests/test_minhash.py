@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from benchmarks.corpus import make_resume
+from core.minhash import (LshIndex, jaccard_estimate, lsh_params, minhash_signature,
+                          pack_signature, unpack_signature)
+from core.preprocess import preprocess_text
+
+def _edited(tokens, n, seed=0):
+    rng = random.Random(seed)
+    tokens = list(tokens)
+    for i in rng.sample(range(len(tokens)), n):
+        tokens[i] = "edited"
+    return tokens
+
+class TestMinHash(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.docs = [preprocess_text(make_resume(rng, i)).split() for i in range(20)]
+
+    def test_signature_estimates_jaccard(self):
+        doc = self.docs[0]
+        sig = minhash_signature(doc)
+        self.assertEqual(jaccard_estimate(sig, minhash_signature(list(doc))), 1.0)
+        self.assertGreater(jaccard_estimate(sig, minhash_signature(_edited(doc, 2))), 0.8)
+        self.assertLess(jaccard_estimate(sig, minhash_signature(self.docs[1])), 0.3)
+        self.assertIsNone(minhash_signature([]))
+        self.assertEqual(unpack_signature(pack_signature(sig)).tolist(), sig.tolist())
+
+    def test_lsh_finds_edited_copies_only(self):
+        index = LshIndex(threshold=0.8)
+        for i, doc in enumerate(self.docs):
+            index.add(f"{i}.pdf", minhash_signature(doc))
+        self.assertEqual(index.near_duplicate(minhash_signature(_edited(self.docs[3], 2))), "3.pdf")
+        self.assertIsNone(index.near_duplicate(minhash_signature(_edited(self.docs[3], 60))))
+
+    def test_band_layout_fits_the_signature(self):
+        bands, rows = lsh_params(0.8, 128)
+        self.assertLessEqual(bands * rows, 128)
+        self.assertAlmostEqual((1 / bands) ** (1 / rows), 0.8, delta=0.1)
+
+if __name__ == "__main__":
+    unittest.main()
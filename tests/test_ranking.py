@@ -1,5 +1,15 @@
+import random
 import unittest
-from core.ranking import rank_resumes_simple
+from collections import Counter
+from unittest import mock
+
+import numpy as np
+
+from core import tf_idf
+from core.idf_model import IdfModel
+from core.ranking import rank_resumes_simple, rank_term_vectors
+from core.similarity import StreamingTopK
+from core.term_vectors import pack_term_vector, vectors_to_matrix
 
 class TestRanking(unittest.TestCase):
     def test_ordering_by_relevance(self):
@@ -34,5 +44,55 @@ class TestRanking(unittest.TestCase):
         for r in results:
             self.assertIsInstance(r["score"], (int, float))
 
+    def test_streaming_pipeline_matches_one_matrix(self):
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(300)]
+        term_ids = {w: i + 1 for i, w in enumerate(words)}
+        jd = Counter(rng.choice(words) for _ in range(40))
+        pool = [(doc_id, f"r{doc_id}.pdf", pack_term_vector(
+                    Counter(rng.choice(words) for _ in range(rng.randint(1, 80))), term_ids))
+                for doc_id in range(1, 60)]
+        jd_vector = pack_term_vector(jd, term_ids)
+
+        def read_after(after, size=8):
+            rows = [row for row in pool if row[0] > after]
+            return (rows[i:i + size] for i in range(0, len(rows), size))
+
+        with mock.patch.object(tf_idf, "MAX_FEATURES", 50):   # selection cuts the vocabulary
+            *_, streamed = rank_term_vectors(jd_vector, read_after, len(pool), len(words) + 1,
+                                             min_score_threshold=0.0, top_k=10, idf_model=IdfModel())
+
+            counts, col_ids = vectors_to_matrix([jd_vector] + [vec for _, _, vec in pool])
+            jd_cols = np.zeros(counts.shape[1], dtype=bool)
+            jd_cols[counts.indices[counts.indptr[0]:counts.indptr[1]]] = True
+            df = np.bincount(counts.indices, minlength=counts.shape[1])
+            matrix, _ = tf_idf.tfidf_from_counts(counts, tf_idf.idf_from_df(df, counts.shape[0]), jd_cols, 2.0)
+        ranker = StreamingTopK(matrix[0], k=10, min_score=0.0)
+        ranker.feed(matrix[1:], [name for _, name, _ in pool])
+        self.assertEqual(streamed, [(name, round(score, 2)) for name, score in ranker.results()])
+
+    def test_feature_ties_break_in_first_seen_order(self):
+        # Every resume term has the same importance, so the MAX_FEATURES cut is all ties;
+        # later documents introduce lower vocabulary ids than earlier ones
+        term_ids = {f"t{i}": i for i in range(1, 13)}
+        jd = Counter({"t12": 1, "t11": 1})
+        docs = [Counter({"t12": 1, "t9": 1, "t10": 1}), Counter({"t11": 1, "t5": 1, "t6": 1}),
+                Counter({"t12": 1, "t1": 1, "t2": 1}), Counter({"t11": 1, "t3": 1, "t4": 1})]
+        pool = [(i + 1, f"r{i + 1}.pdf", pack_term_vector(doc, term_ids)) for i, doc in enumerate(docs)]
+
+        def read_after(after):
+            return iter([[row for row in pool if row[0] > after]])
+
+        # Token lists in vocabulary id order: the order the stored vectors keep
+        tokens = [sorted(doc.elements(), key=term_ids.get) for doc in [jd] + docs]
+        with mock.patch.object(tf_idf, "MAX_FEATURES", 5):
+            *_, streamed = rank_term_vectors(pack_term_vector(jd, term_ids), read_after, len(pool), 13,
+                                             min_score_threshold=0.0, idf_model=IdfModel())
+            matrix, top_terms = tf_idf.compute_tfidf_matrix(tokens, boost_terms=set(jd))
+        self.assertEqual(top_terms, ["t11", "t12", "t9", "t10", "t5"])
+        ranker = StreamingTopK(matrix[0], min_score=0.0)
+        ranker.feed(matrix[1:], [name for _, name, _ in pool])
+        self.assertEqual(streamed, [(name, round(score, 2)) for name, score in ranker.results()])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from core.extract import extract_contacts
+from core.resume_detail import ResumeDetailCache, text_window
+
+def _row(file_name, text, doc_id=1):
+    return {"id": doc_id, "file_name": file_name, "raw_text": text, "hashed_text": "ab" * 32,
+            "email": "a@x.com", "phone": "", "linkedin": "", "created_at": None}
+
+class TestResumeDetailCache(unittest.TestCase):
+    def test_hot_documents_skip_the_loader(self):
+        calls = []
+        cache = ResumeDetailCache(loader=lambda name: calls.append(name) or _row(name, "python"))
+        first = cache.get("a.pdf")
+        self.assertIs(cache.get("a.pdf"), first)
+        self.assertEqual(calls, ["a.pdf"])
+        self.assertEqual(first["etag"], "abababababababab-1")
+
+        cache.invalidate("a.pdf")
+        cache.get("a.pdf")
+        self.assertEqual(calls, ["a.pdf", "a.pdf"])
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = ResumeDetailCache(max_bytes=1000, loader=lambda name: _row(name, "x" * 200))
+        cache.get("a.pdf")
+        cache.get("b.pdf")
+        cache.get("c.pdf")   # over budget -> evict a
+        self.assertEqual(list(cache._entries), ["b.pdf", "c.pdf"])
+
+    def test_expired_entries_are_reloaded(self):
+        calls = []
+        cache = ResumeDetailCache(ttl=0, loader=lambda name: calls.append(name) or _row(name, "python"))
+        cache.get("a.pdf")
+        cache.get("a.pdf")
+        self.assertEqual(len(calls), 2)
+
+    def test_text_window_and_contacts(self):
+        self.assertEqual(text_window("abcdef", 2, 3), ("cde", True))
+        self.assertEqual(text_window("abcdef", 2), ("cdef", False))
+        self.assertEqual(text_window("abcdef", 0, 6), ("abcdef", False))
+        self.assertEqual(extract_contacts("mail me: jane@example.com, linkedin.com/in/jane"),
+                         {"email": "jane@example.com", "phone": "", "linkedin": "linkedin.com/in/jane"})
+
+if __name__ == "__main__":
+    unittest.main()
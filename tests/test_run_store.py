@@ -0,0 +1,129 @@
+import re
+import sqlite3
+import unittest
+from unittest import mock
+
+from app import app
+from database import db_connect
+
+class SqliteConnection:
+    """The run-store tables in SQLite behind mysql.connector's cursor API (%s marks, dictionary rows)."""
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.executescript("""
+            CREATE TABLE screening_runs (id TEXT PRIMARY KEY, user_id INT, total_rows INT, errors TEXT);
+            CREATE TABLE screening_run_results (
+                run_id TEXT, sn INT, name TEXT, email TEXT, duplicate TEXT, score REAL,
+                PRIMARY KEY (run_id, sn));
+        """)
+
+    def cursor(self, dictionary=False):
+        return SqliteCursor(self.db.cursor(), dictionary)
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        pass
+
+class SqliteCursor:
+    def __init__(self, cursor, dictionary):
+        self.cursor = cursor
+        self.dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(sql.replace("%s", "?"), params)
+
+    def executemany(self, sql, rows):
+        self.cursor.executemany(sql.replace("%s", "?"), rows)
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        if not self.dictionary:
+            return rows
+        names = [d[0] for d in self.cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def close(self):
+        self.cursor.close()
+
+# Ranked rows as run_screening stores them: S.N breaks the score ties, duplicates come last
+RESULTS = [
+    {"sn": 1, "name": "b.pdf", "email": None, "duplicate": "—", "score": 0.9},
+    {"sn": 2, "name": "d.pdf", "email": None, "duplicate": "—", "score": 0.5},
+    {"sn": 3, "name": "a.pdf", "email": None, "duplicate": "—", "score": 0.5},
+    {"sn": 4, "name": "c.pdf", "email": None, "duplicate": "—", "score": 0.5},
+    {"sn": 5, "name": "a.pdf", "email": None, "duplicate": "—", "score": 0.5},
+    {"sn": 6, "name": "e.pdf", "email": None, "duplicate": "b.pdf", "score": None},
+    {"sn": 7, "name": "c.pdf", "email": None, "duplicate": "d.pdf", "score": None},
+]
+
+class RunStoreCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = SqliteConnection()
+        patcher = mock.patch.object(db_connect, "get_connection", return_value=self.conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        db_connect.save_run("run1", 7, RESULTS, ["x.pdf: not a PDF"])
+
+class TestRunResults(RunStoreCase):
+    def pages(self, limit, sort):
+        pages, after = [], None
+        while True:
+            rows = db_connect.get_run_results("run1", limit, sort=sort, after_sn=after)
+            if not rows:
+                return pages
+            pages.append([r["sn"] for r in rows])
+            after = rows[-1]["sn"]
+
+    def test_rank_pages_split_score_ties_by_sn(self):
+        self.assertEqual(self.pages(2, "rank"), [[1, 2], [3, 4], [5, 6], [7]])
+        # Every page size walks the same order, each row once
+        for limit in (1, 3, 4, 10):
+            self.assertEqual(sum(self.pages(limit, "rank"), []), [1, 2, 3, 4, 5, 6, 7])
+
+    def test_name_pages_split_name_ties_by_sn(self):
+        self.assertEqual(self.pages(2, "name"), [[3, 5], [1, 4], [7, 2], [6]])
+        for limit in (1, 3, 4, 10):
+            self.assertEqual(sum(self.pages(limit, "name"), []), [3, 5, 1, 4, 7, 2, 6])
+
+    def test_min_score_keeps_the_keyset(self):
+        rows = db_connect.get_run_results("run1", 2, after_sn=2, min_score=0.5)
+        self.assertEqual([r["sn"] for r in rows], [3, 4])
+        self.assertEqual(db_connect.get_run_results("run1", 10, after_sn=5, min_score=0.5), [])
+
+class TestResultsPage(RunStoreCase):
+    def setUp(self):
+        super().setUp()
+        job = {"id": "run1", "user_id": 7, "status": "done", "kind": "single", "files_total": 7,
+               "results": [], "errors": [], "run_stored": True}
+        patcher = mock.patch("app.get_job", return_value=job)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess["user_id"], sess["run_id"] = 7, "run1"
+
+    def walk(self, url):
+        """S.N column of each page, following the rendered "Next" links."""
+        pages = []
+        while url:
+            html = self.client.get(url).get_data(as_text=True)
+            pages.append([int(sn) for sn in re.findall(r"<tr>\s*<td>(\d+)</td>", html)])
+            more = re.search(r'<a href="([^"]+)">Next', html)
+            url = more.group(1).replace("&amp;", "&") if more else None
+        return pages
+
+    def test_next_links_round_trip_the_cursor(self):
+        self.assertEqual(self.walk("/results?top=3"), [[1, 2, 3], [4, 5, 6], [7]])
+        self.assertEqual(self.walk("/results?top=3&sort=name"), [[3, 5, 1], [4, 7, 2], [6]])
+
+    def test_unknown_sort_falls_back_to_rank(self):
+        self.assertEqual(self.walk("/results?top=4&sort=score"), [[1, 2, 3, 4], [5, 6, 7]])
+
+if __name__ == "__main__":
+    unittest.main()
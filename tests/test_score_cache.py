@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from core import score_cache as score_cache_module
+from core.score_cache import ScoreCache
+from core.similarity import cosine_similarity, cosine_similarity_batch
+from core.tf_idf import compute_idf, compute_tf, compute_tfidf_matrix, count_matrix
+
+JD = "python flask sql docker".split()
+RESUMES = {
+    "a": "python flask sql api".split(),
+    "b": "excel sales marketing python".split(),
+    "c": "sql python python docker".split(),
+}
+
+def expected_scores(hashes, boost=frozenset({"python"})):
+    matrix, _ = compute_tfidf_matrix([JD] + [RESUMES[h] for h in hashes], boost_terms=boost, boost_factor=1.5)
+    return cosine_similarity_batch(matrix[0], matrix[1:])
+
+def snapshot_score(model_hashes, resume, boost=frozenset({"python"})):
+    """Score of `resume` with the IDF and vocabulary of the corpus [JD] + model_hashes (every term selected)."""
+    idf = compute_idf([JD] + [RESUMES[h] for h in model_hashes])
+    jd = {t: w * idf[t] for t, w in compute_tf(JD).items()}
+    doc = {t: w * idf[t] * (1.5 if t in boost else 1.0) for t, w in compute_tf(RESUMES[resume]).items() if t in idf}
+    return cosine_similarity(jd, doc, set(idf))
+
+class TestScoreCache(unittest.TestCase):
+    def score(self, cache, hashes):
+        """(scores, resumes scored exactly) for one run."""
+        with mock.patch.object(score_cache_module, "cosine_similarity_batch",
+                               wraps=cosine_similarity_batch) as cosine:
+            scores = cache.scores("jd", JD, hashes, [RESUMES[h] for h in hashes], {"python"}, 1.5)
+        scored = sum(call.args[1].shape[0] for call in cosine.call_args_list)
+        return scores, scored
+
+    def test_default_is_exact(self):
+        # Same scores as with the cache disabled, whatever earlier runs left behind
+        cache = ScoreCache()
+        self.assertEqual(cache.tolerance, 0)
+        for hashes in (["a", "b"], ["a", "b", "c"], ["a", "b", "c"], ["a", "c"], ["c", "b", "a"]):
+            scores, _ = self.score(cache, hashes)
+            np.testing.assert_array_equal(scores, expected_scores(hashes))
+
+    def test_rerun_reuses_every_score(self):
+        cache = ScoreCache(tolerance=0)
+        first, scored = self.score(cache, ["a", "b"])
+        np.testing.assert_array_equal(first, expected_scores(["a", "b"]))
+        self.assertEqual(scored, 2)
+        again, scored = self.score(cache, ["a", "b"])
+        np.testing.assert_array_equal(again, first)
+        self.assertEqual(scored, 0)
+
+    def test_exact_mode_rescores_when_the_corpus_grows(self):
+        cache = ScoreCache(tolerance=0)
+        self.score(cache, ["a", "b"])
+        scores, scored = self.score(cache, ["a", "b", "c"])
+        self.assertEqual(scored, 3)
+        np.testing.assert_array_equal(scores, expected_scores(["a", "b", "c"]))
+
+    def test_tolerance_scores_only_new_resumes(self):
+        cache = ScoreCache(tolerance=0.5)
+        first, _ = self.score(cache, ["a", "b"])
+        with mock.patch.object(score_cache_module, "count_matrix", wraps=count_matrix) as counted:
+            scores, scored = self.score(cache, ["a", "b", "c"])
+        self.assertEqual(scored, 1)
+        # Only the new resume is vectorized, against the snapshot's model
+        self.assertEqual([len(call.args[0]) for call in counted.call_args_list], [1])
+        np.testing.assert_array_equal(scores[:2], first)
+        self.assertAlmostEqual(scores[2], snapshot_score(["a", "b"], "c"))
+
+    def test_resumes_leaving_the_corpus_rebuild_the_snapshot(self):
+        cache = ScoreCache(tolerance=0.5)
+        self.score(cache, ["a", "b"])
+        scores, scored = self.score(cache, ["a", "c"])
+        self.assertEqual(scored, 2)
+        np.testing.assert_allclose(scores, expected_scores(["a", "c"]))
+
+    def test_drift_past_tolerance_rescores(self):
+        cache = ScoreCache(tolerance=1e-6)
+        self.score(cache, ["a", "b"])
+        _, scored = self.score(cache, ["a", "b", "c"])
+        self.assertEqual(scored, 3)
+
+    def test_lru_bound_and_ttl(self):
+        cache = ScoreCache(max_entries=2, tolerance=0)
+        self.score(cache, ["a", "b", "c"])
+        self.assertEqual(len(cache._entries), 2)
+        cache = ScoreCache(ttl=-1, tolerance=0)
+        self.score(cache, ["a"])
+        self.assertEqual(self.score(cache, ["a"])[1], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import random
+import unittest
+from unittest import mock
+
+from benchmarks.corpus import make_resume
+from core import screening
+from core.extract_pool import Extracted
+from core.preprocess import preprocess_text
+from core.screening import rank_rows
+
+class TestRankRows(unittest.TestCase):
+    def test_scored_first_duplicates_last(self):
+        results = [
+            {"name": "A.pdf", "duplicate": "—", "score": None, "raw_hash": "a"},
+            {"name": "A copy.pdf", "duplicate": "Duplicate of A.pdf", "score": None, "raw_hash": "a"},
+            {"name": "B.pdf", "duplicate": "—", "score": None, "raw_hash": "b"},
+        ]
+        uniques = [
+            {"filename": "A.pdf", "raw_hash": "a", "tokens": ["excel", "sales"]},
+            {"filename": "B.pdf", "raw_hash": "b", "tokens": ["python", "flask"]},
+        ]
+        ranked = rank_rows(results, uniques, ["python", "flask"], set())
+
+        self.assertEqual([r["name"] for r in ranked], ["B.pdf", "A.pdf", "A copy.pdf"])
+        self.assertEqual([r["sn"] for r in ranked], [1, 2, 3])
+        self.assertIsNone(ranked[-1]["score"])
+        self.assertNotIn("raw_hash", ranked[0])
+        # input rows are left untouched for later partial rankings
+        self.assertIn("raw_hash", results[0])
+
+    def test_top_k_keeps_only_best_scored_rows(self):
+        results = [{"name": f"{h}.pdf", "duplicate": "—", "score": None, "raw_hash": h} for h in "abc"]
+        uniques = [
+            {"filename": "a.pdf", "raw_hash": "a", "tokens": ["excel"]},
+            {"filename": "b.pdf", "raw_hash": "b", "tokens": ["python", "flask"]},
+            {"filename": "c.pdf", "raw_hash": "c", "tokens": ["python", "excel"]},
+        ]
+        full = rank_rows(results, uniques, ["python", "flask"], set())
+        top = rank_rows(results, uniques, ["python", "flask"], set(), top_k=2)
+        self.assertEqual(top, full[:2])
+
+class TestRunScreening(unittest.TestCase):
+    def test_partial_rankings_are_spaced_geometrically(self):
+        def extracted(i):
+            text = f"python flask skill{i}"
+            return Extracted(text, text, f"h{i}", f"b{i}")
+
+        partials = []
+        def progress(files_extracted, files_scored, ranked):
+            if ranked is not None:
+                partials.append(files_scored)
+
+        with mock.patch.object(screening, "extract_cached", return_value=extracted("jd")), \
+                mock.patch.object(screening, "extract_many",
+                                  side_effect=lambda payloads: ((f"{i}.pdf", extracted(i), None) for i in range(250))), \
+                mock.patch.object(screening, "insert_document"), \
+                mock.patch.object(screening, "insert_documents_bulk"), \
+                mock.patch.object(screening, "NEAR_DUP_THRESHOLD", 0), \
+                mock.patch.object(screening.score_cache, "max_entries", 0):
+            ranked, errors = screening.run_screening(b"%PDF", [], progress=progress, partial_every=25)
+
+        self.assertEqual(partials, [25, 50, 100, 200, 250])
+        self.assertEqual(len(ranked), 250)
+        self.assertEqual(errors, [])
+
+    def test_near_duplicates_match_by_content_when_names_repeat(self):
+        rng = random.Random(3)
+        first, other = make_resume(rng, 0), make_resume(rng, 1)
+        words = first.split()
+        words[len(words) // 2] = "edited"
+        files = [("cv.pdf", first, "h0"), ("cv.pdf", other, "h1"), ("copy.pdf", " ".join(words), "h2")]
+
+        def extracted(text, raw_hash):
+            cleaned = preprocess_text(text)
+            return Extracted(text, cleaned, raw_hash, "b" + raw_hash)
+
+        with mock.patch.object(screening, "extract_cached", return_value=extracted("python flask", "jd")), \
+                mock.patch.object(screening, "extract_many",
+                                  side_effect=lambda payloads: ((name, extracted(text, h), None)
+                                                                for name, text, h in files)), \
+                mock.patch.object(screening, "insert_document"), \
+                mock.patch.object(screening, "insert_documents_bulk"), \
+                mock.patch.object(screening, "NEAR_DUP_THRESHOLD", 0.8), \
+                mock.patch.object(screening.score_cache, "max_entries", 0):
+            ranked, _ = screening.run_screening(b"%PDF", [])
+
+        copy = next(r for r in ranked if r["name"] == "copy.pdf")
+        self.assertEqual(copy["duplicate"], "Near-duplicate of cv.pdf")
+        self.assertIsNone(copy["score"])
+        self.assertEqual([r["duplicate"] for r in ranked if r["name"] == "cv.pdf"], ["—", "—"])
+
+if __name__ == "__main__":
+    unittest.main()
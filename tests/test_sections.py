@@ -0,0 +1,36 @@
+import random
+import re
+import unittest
+
+from benchmarks.corpus import make_jd, make_resume
+from core.extract import extract_exact_section
+from core.sections import JD_HEADINGS_FOR_BOOST, HeadingMatcher, segment
+
+def _regex_section(text, section_name):
+    """The per-heading regex the segmenter replaces."""
+    pattern = rf"(?i){re.escape(section_name)}\s*(.*?)(?=\n[A-Z][^\n]*\n|$)"
+    match = re.search(pattern, text, re.DOTALL)
+    return section_name + "\n" + match.group(1).strip() if match else ""
+
+class TestSections(unittest.TestCase):
+    def test_overlapping_and_case_insensitive_headings(self):
+        found = HeadingMatcher(["Skills", "Preferred Skills", "Perks"]).first_occurrences("PREFERRED SKILLS: sql")
+        self.assertEqual(found, {"preferred skills": (0, 16), "skills": (10, 16)})
+
+    def test_spans_end_at_the_next_lettered_line(self):
+        text = "Requirements\n  python, sql\n- docker\nBenefits\nremote\n"
+        sections = segment(text)
+        self.assertEqual(sections.section("Requirements"), "Requirements\npython, sql\n- docker")
+        self.assertEqual(sections.section("Benefits"), "Benefits\nremote")
+        self.assertEqual(sections.section("Perks"), "")
+
+    def test_matches_the_regex_on_generated_and_edge_texts(self):
+        rng = random.Random(11)
+        texts = [make_resume(rng, i) for i in range(20)] + [make_jd(rng) for _ in range(20)]
+        texts += ["", "skills", "ſkills\nA\n", "x\nSkills \n\nExperience\nb", "İ Role Overview\nz"]
+        for text in texts:
+            for heading in JD_HEADINGS_FOR_BOOST + ["skills", "experience", "Not A Heading"]:
+                self.assertEqual(extract_exact_section(text, heading), _regex_section(text, heading))
+
+if __name__ == "__main__":
+    unittest.main()
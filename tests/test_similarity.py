@@ -1,5 +1,7 @@
 import unittest
-from core.similarity import cosine_similarity  # correct name
+import numpy as np
+from scipy.sparse import csr_matrix
+from core.similarity import cosine_similarity, cosine_similarity_batch, top_k_similar, top_k_indices, StreamingTopK
 
 def u(*vecs):
     # helper: union of all keys across input dict-vectors
@@ -29,6 +31,37 @@ class TestSimilarity(unittest.TestCase):
             cosine_similarity(v2, v1, u(v1, v2)),
             places=6
         )
+    def test_batch_matches_pairwise(self):
+        terms = ["a", "b", "c"]
+        query = {"a": 1.0, "b": 2.0}
+        docs = [{"a": 2.0, "b": 1.0}, {"c": 3.0}, {}, {"a": 1.0, "b": 2.0, "c": 0.5}]
+        to_row = lambda v: [v.get(t, 0.0) for t in terms]
+
+        scores = cosine_similarity_batch(
+            csr_matrix([to_row(query)]), csr_matrix([to_row(d) for d in docs])
+        )
+        for d, score in zip(docs, scores):
+            self.assertAlmostEqual(score, cosine_similarity(query, d, set(terms)), places=12)
+
+    def test_top_k_returns_best_first(self):
+        docs = csr_matrix(np.array([[1, 0], [1, 1], [0, 1], [2, 0.1]], dtype=float))
+        idx, scores = top_k_similar(np.array([1.0, 0.0]), docs, k=2)
+        self.assertEqual(list(idx), [0, 3])
+        self.assertTrue(scores[0] >= scores[1])
+
+    def test_streaming_top_k_matches_full_scoring(self):
+        rng = np.random.default_rng(4)
+        docs = csr_matrix(rng.random((300, 40)) * (rng.random((300, 40)) < 0.1))
+        query = csr_matrix(rng.random((1, 40)) * (rng.random((1, 40)) < 0.3))
+
+        ranker = StreamingTopK(query, k=10, min_score=0.05)
+        for start in range(0, 300, 32):
+            ranker.feed(docs[start:start + 32])
+        idx, scores = top_k_indices(cosine_similarity_batch(query, docs), 10)
+
+        self.assertEqual([i for i, _ in ranker.results()], idx.tolist())
+        self.assertEqual([s for _, s in ranker.results()], scores.tolist())
+        self.assertGreater(ranker.pruned, 0)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,52 @@
+import random
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from core.term_vectors import MAX_TERM_LENGTH, count_terms, pack_term_vector, unpack_term_vector, \
+    vectors_to_matrix
+from core.tf_idf import compute_tfidf_matrix, idf_from_df, tfidf_from_counts
+from core.similarity import cosine_similarity_batch
+
+class TestTermVectors(unittest.TestCase):
+    def test_pack_round_trip(self):
+        counts = Counter("python flask python sql".split())
+        ids = {"python": 7, "flask": 2, "sql": 40}
+        term_ids, cnts = unpack_term_vector(pack_term_vector(counts, ids))
+        self.assertEqual(term_ids.tolist(), [2, 7, 40])
+        self.assertEqual(cnts.tolist(), [1, 2, 1])
+
+    def test_over_long_tokens_never_reach_the_vocabulary(self):
+        blob = "a" * (MAX_TERM_LENGTH + 1)
+        counts, length = count_terms(f"python {blob} flask python {'b' * MAX_TERM_LENGTH}")
+        self.assertEqual(counts, Counter({"python": 2, "flask": 1, "b" * MAX_TERM_LENGTH: 1}))
+        self.assertEqual(length, 4)
+
+    def test_stored_vectors_score_like_token_lists(self):
+        rng = random.Random(3)
+        words = [f"w{i}" for i in range(200)]
+        jd = [rng.choice(words) for _ in range(40)]
+        resumes = [[rng.choice(words) for _ in range(rng.randint(1, 120))] for _ in range(30)]
+
+        # What insert_document keeps (vocabulary ids, packed vectors) and the pool df of core.idf_model
+        term_ids = {}
+        for doc in [jd] + resumes:
+            for t in doc:
+                term_ids.setdefault(t, len(term_ids) + 1)
+        resume_df = Counter(t for doc in resumes for t in set(doc))
+        blobs = [pack_term_vector(Counter(doc), term_ids) for doc in [jd] + resumes]
+
+        counts, col_ids = vectors_to_matrix(blobs)
+        id_to_term = {i: t for t, i in term_ids.items()}
+        jd_cols = np.array([id_to_term[i] in set(jd) for i in col_ids.tolist()])
+        df = np.array([resume_df[id_to_term[i]] for i in col_ids.tolist()]) + jd_cols
+        matrix, _ = tfidf_from_counts(counts, idf_from_df(df, counts.shape[0]), jd_cols, 2.0)
+        stored = cosine_similarity_batch(matrix[0], matrix[1:])
+
+        expected_matrix, _ = compute_tfidf_matrix([jd] + resumes, boost_terms=set(jd), boost_factor=2.0)
+        expected = cosine_similarity_batch(expected_matrix[0], expected_matrix[1:])
+        np.testing.assert_allclose(stored, expected, rtol=0, atol=1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,14 @@
 import unittest
 
 # Adjust these imports if your names/locations differ
-from core.tf_idf import compute_idf
+from unittest import mock
+
+import numpy as np
+
+from core import tf_idf
+from core.idf_model import IdfModel
+from core.interner import TermInterner, term_interner
+from core.tf_idf import compute_idf, compute_tfidf, compute_tfidf_matrix
 
 class TestTFIDF(unittest.TestCase):
     def test_idf_monotonicity(self):
@@ -25,6 +32,53 @@ class TestTFIDF(unittest.TestCase):
         idf = compute_idf(docs)
         for term, value in idf.items():
             self.assertGreaterEqual(value, 0.0, f"IDF for {term} should be >= 0")
+    def test_matrix_matches_dict_vectors(self):
+        docs = [
+            ["python", "flask", "python"],
+            ["python", "django"],
+            ["excel", "flask"],
+        ]
+        vectors, terms = compute_tfidf(docs, boost_terms={"flask"}, boost_factor=1.5)
+        matrix, columns = compute_tfidf_matrix(docs, boost_terms={"flask"}, boost_factor=1.5)
+
+        self.assertEqual(set(columns), terms)
+        self.assertEqual(matrix.shape, (3, len(columns)))
+        for i, vec in enumerate(vectors):
+            row = dict(zip(columns, matrix.getrow(i).toarray().ravel()))
+            for term, value in vec.items():
+                self.assertAlmostEqual(row[term], value, places=12)
+
+    def test_boost_skips_job_description(self):
+        docs = [["flask", "python"], ["flask", "python"]]
+        vectors, _ = compute_tfidf(docs, boost_terms={"flask"}, boost_factor=2.0)
+        # JD (index 0) is never boosted; resumes are
+        self.assertAlmostEqual(vectors[0]["flask"], vectors[0]["python"])
+        self.assertAlmostEqual(vectors[1]["flask"], 2.0 * vectors[1]["python"])
+
+    def test_token_ids_match_term_lists(self):
+        docs = [
+            ["python", "flask", "python", "sql"],
+            ["sql", "python", "django", "sql"],
+            ["excel", "flask"],
+            [],
+        ]
+        encoded = [term_interner.encode(doc) for doc in docs]
+        for kwargs in ({}, {"idf_model": IdfModel.from_docs(docs[1:])}):
+            # MAX_FEATURES=2 cuts between tied terms: column order must match too
+            with mock.patch.object(tf_idf, "MAX_FEATURES", 2):
+                expected, expected_terms = compute_tfidf_matrix(docs, {"flask"}, 1.5, **kwargs)
+                matrix, terms = compute_tfidf_matrix(encoded, {"flask"}, 1.5, **kwargs)
+            self.assertEqual(terms, expected_terms)
+            self.assertEqual((matrix != expected).nnz, 0)
+
+    def test_interner_ids_are_stable(self):
+        interner = TermInterner()
+        first = interner.encode(["b", "a", "b"])
+        self.assertEqual(first.dtype, np.int32)
+        self.assertEqual(first.tolist(), [first[0], first[1], first[0]])
+        self.assertEqual(interner.encode_text("a c").tolist()[0], first[1])
+        self.assertEqual(interner.decode(interner.encode_text("c b a")), ["c", "b", "a"])
+        self.assertEqual(len(interner), 3)
 
 if __name__ == "__main__":
     unittest.main()